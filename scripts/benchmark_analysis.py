@@ -0,0 +1,485 @@
+"""
+Benchmarks for the n8nmermaid V2 analyzer on synthetic workflows.
+
+Generates large, agent-heavy n8n workflows in memory and measures analysis
+latency and peak memory. Run from the project root, e.g.:
+
+    python scripts/benchmark_analysis.py analysis --nodes 5000
+"""
+
+import argparse
+import copy
+import gc
+import json
+import logging
+import statistics
+import sys
+import tempfile
+import time
+import tracemalloc
+from pathlib import Path
+from typing import Any
+
+sys.path.insert(0, str(Path(__file__).resolve().parents[1] / "src"))
+
+from n8nmermaid.core.analysis_cache import AnalysisCache  # noqa: E402
+from n8nmermaid.core.analyzer_v2 import WorkflowAnalyzerV2, WorkflowGraph  # noqa: E402
+from n8nmermaid.core.analyzer_v2.constants import WORKFLOW_INPUT_KEYS  # noqa: E402
+from n8nmermaid.core.analyzer_v2.phase_1_initial_parse import (  # noqa: E402
+    parse_initial_nodes,
+)
+from n8nmermaid.core.analyzer_v2.phase_2_connection_mapping import (  # noqa: E402
+    map_connections,
+)
+from n8nmermaid.core.analyzer_v2.phase_3_cluster_analysis import (  # noqa: E402
+    analyze_clusters,
+)
+from n8nmermaid.core.generators.mermaid_v2 import (  # noqa: E402
+    generate_mermaid_v2,
+    generate_mermaid_variants_v2,
+)
+from n8nmermaid.core.orchestrator_v2 import process_v2  # noqa: E402
+from n8nmermaid.models_v2 import (  # noqa: E402
+    AnalysisRequestV2,
+    MermaidGenerationParamsV2,
+)
+from n8nmermaid.utils import json_codec, loaders  # noqa: E402
+
+
+def build_synthetic_workflow(
+    total_nodes: int,
+    tools_per_agent: int = 4,
+    agent_every: int = 5,
+    shared_tools: int = 0,
+) -> dict[str, Any]:
+    """
+    Builds a synthetic n8n workflow with a main chain and many AI agents.
+
+    Every `agent_every`-th node on the main chain is an agent with a language
+    model, a memory node and `tools_per_agent` tools attached; every 7th chain
+    node is an IF router with two outputs. `shared_tools` extra tool nodes are
+    attached to every agent, merging all agents into one large cluster.
+
+    Args:
+        total_nodes: Approximate number of nodes to generate.
+        tools_per_agent: Number of ai_tool nodes attached to each agent.
+        agent_every: Place an agent on every n-th main chain node.
+        shared_tools: Number of tool nodes shared by all agents.
+
+    Returns:
+        The workflow as a dictionary in n8n export format.
+    """
+    nodes: list[dict[str, Any]] = []
+    connections: dict[str, Any] = {}
+
+    def add_node(name: str, node_type: str, params: dict[str, Any]) -> None:
+        index = len(nodes)
+        nodes.append(
+            {
+                "id": f"node-{index:06d}",
+                "name": name,
+                "type": node_type,
+                "typeVersion": 1,
+                "position": [index * 20 % 4000, index * 40 // 4000 * 200],
+                "parameters": params,
+            }
+        )
+
+    def connect(source: str, target: str, conn_type: str, port: int = 0) -> None:
+        ports = connections.setdefault(source, {}).setdefault(conn_type, [])
+        while len(ports) <= port:
+            ports.append([])
+        ports[port].append({"node": target, "type": conn_type, "index": 0})
+
+    add_node("Trigger", "n8n-nodes-base.manualTrigger", {})
+    shared_tool_names = [f"Shared Tool {i}" for i in range(shared_tools)]
+    for tool in shared_tool_names:
+        add_node(tool, "@n8n/n8n-nodes-langchain.toolCalculator", {})
+    previous = "Trigger"
+    step = 0
+    while len(nodes) < total_nodes:
+        step += 1
+        if step % agent_every == 0:
+            agent = f"Agent {step}"
+            add_node(
+                agent,
+                "@n8n/n8n-nodes-langchain.agent",
+                {"options": {"systemMessage": f"You are agent {step}."}},
+            )
+            model = f"Model {step}"
+            add_node(
+                model,
+                "@n8n/n8n-nodes-langchain.lmChatOpenAi",
+                {"model": "gpt-4o-mini", "options": {"temperature": 0.2}},
+            )
+            connect(model, agent, "ai_languageModel")
+            memory = f"Memory {step}"
+            add_node(memory, "@n8n/n8n-nodes-langchain.memoryBufferWindow", {})
+            connect(memory, agent, "ai_memory")
+            for tool_index in range(tools_per_agent):
+                tool = f"Tool {step}.{tool_index}"
+                add_node(
+                    tool,
+                    "@n8n/n8n-nodes-langchain.toolHttpRequest",
+                    {
+                        "url": f"https://example.com/api/{tool_index}",
+                        "sendHeaders": True,
+                        "headerParameters": {
+                            "parameters": [{"name": "Accept", "value": "json"}]
+                        },
+                    },
+                )
+                connect(tool, agent, "ai_tool")
+            for tool in shared_tool_names:
+                connect(tool, agent, "ai_tool")
+            connect(previous, agent, "main")
+            previous = agent
+        elif step % 7 == 0:
+            router = f"If {step}"
+            add_node(
+                router,
+                "n8n-nodes-base.if",
+                {"conditions": {"boolean": [{"value1": "={{$json.ok}}"}]}},
+            )
+            connect(previous, router, "main")
+            branch = f"Branch {step}"
+            add_node(branch, "n8n-nodes-base.noOp", {})
+            connect(router, branch, "main", port=1)
+            previous = router
+        else:
+            action = f"Set {step}"
+            add_node(
+                action,
+                "n8n-nodes-base.set",
+                {"values": {"string": [{"name": "field", "value": str(step)}]}},
+            )
+            connect(previous, action, "main")
+            previous = action
+
+    return {
+        "name": f"Synthetic {total_nodes}",
+        "nodes": nodes,
+        "connections": connections,
+    }
+
+
+def _measure(func, repeats: int) -> tuple[float, float]:
+    """Returns (median seconds, peak MiB) for calling func repeatedly."""
+    timings = []
+    for _ in range(repeats):
+        gc.collect()
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+
+    gc.collect()
+    tracemalloc.start()
+    func()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return statistics.median(timings), peak / (1024 * 1024)
+
+
+def bench_analysis(args: argparse.Namespace) -> None:
+    """Compares graph-only analysis against materializing the Pydantic view."""
+    print(f"{'nodes':>8} {'variant':<22} {'median ms':>10} {'peak MiB':>9}")
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total)
+        variants = {
+            "graph": lambda wf=workflow: WorkflowAnalyzerV2(wf).analyze_graph(),
+            "graph + pydantic view": lambda wf=workflow: WorkflowAnalyzerV2(
+                wf
+            ).analyze(),
+        }
+        for label, func in variants.items():
+            seconds, peak = _measure(func, args.repeats)
+            print(f"{total:>8} {label:<22} {seconds * 1000:>10.1f} {peak:>9.1f}")
+
+
+def bench_clusters(args: argparse.Namespace) -> None:
+    """Measures Phase 3 cluster detection alone to show how it scales."""
+    print(
+        f"{'nodes':>8} {'shared tools':>12} {'clusters':>9} "
+        f"{'median ms':>10} {'us/node':>8}"
+    )
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total, shared_tools=args.shared_tools)
+        graph = WorkflowGraph()
+        name_to_id, _ = parse_initial_nodes(workflow, graph)
+        map_connections(graph.nodes, name_to_id, workflow["connections"])
+
+        seconds, _ = _measure(lambda g=graph: analyze_clusters(g.nodes), args.repeats)
+        clusters = sum(
+            1 for node in graph.nodes.values() if node.cluster_root_id == node.id
+        )
+        print(
+            f"{total:>8} {args.shared_tools:>12} {clusters:>9} "
+            f"{seconds * 1000:>10.1f} {seconds * 1e6 / total:>8.2f}"
+        )
+
+
+def bench_incremental(args: argparse.Namespace) -> None:
+    """Compares a full re-analysis with an incremental one after a small edit."""
+    print(f"{'nodes':>8} {'variant':<22} {'median ms':>10} {'peak MiB':>9}")
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total)
+        previous = WorkflowAnalyzerV2(workflow).analyze_graph()
+
+        edited = copy.deepcopy(workflow)
+        for node in edited["nodes"][total // 2 : total // 2 + args.edits]:
+            node["parameters"]["notes"] = "edited"
+
+        variants = {
+            "full": lambda wf=edited: WorkflowAnalyzerV2(wf).analyze_graph(),
+            "incremental": lambda wf=edited, prev=previous: WorkflowAnalyzerV2(
+                wf
+            ).analyze_incremental(prev),
+        }
+        for label, func in variants.items():
+            seconds, peak = _measure(func, args.repeats)
+            print(f"{total:>8} {label:<22} {seconds * 1000:>10.1f} {peak:>9.1f}")
+
+
+def bench_parse(args: argparse.Namespace) -> None:
+    """Compares validated and trusted Phase 1 parsing."""
+    print(f"{'nodes':>8} {'variant':<22} {'median ms':>10} {'peak MiB':>9}")
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total)
+        variants = {
+            "validated": lambda wf=workflow: parse_initial_nodes(wf, WorkflowGraph()),
+            "trusted": lambda wf=workflow: parse_initial_nodes(
+                wf, WorkflowGraph(), trusted=True
+            ),
+        }
+        for label, func in variants.items():
+            seconds, peak = _measure(func, args.repeats)
+            print(f"{total:>8} {label:<22} {seconds * 1000:>10.1f} {peak:>9.1f}")
+
+
+def bench_request(args: argparse.Namespace) -> None:
+    """Compares the default request path with the one-shot (CLI) path."""
+
+    def default_path(wf: dict[str, Any]) -> None:
+        process_v2(AnalysisRequestV2(workflow_data=wf), cache=AnalysisCache())
+
+    def one_shot_path(wf: dict[str, Any]) -> None:
+        process_v2(
+            AnalysisRequestV2.from_workflow(wf), cache=AnalysisCache(max_entries=0)
+        )
+
+    print(f"{'workflow':<16} {'variant':<22} {'median ms':>10} {'peak MiB':>9}")
+    for path in args.files:
+        workflow = json.loads(Path(path).read_text(encoding="utf-8"))
+        variants = {
+            "validated + cache": lambda wf=workflow: default_path(wf),
+            "from_workflow": lambda wf=workflow: one_shot_path(wf),
+        }
+        for label, func in variants.items():
+            seconds, peak = _measure(func, args.repeats)
+            print(
+                f"{Path(path).name:<16} {label:<22} "
+                f"{seconds * 1000:>10.2f} {peak:>9.1f}"
+            )
+
+
+def bench_json(args: argparse.Namespace) -> None:
+    """Compares the JSON codec backends on the I/O paths that use them."""
+    backends = ["json"]
+    if json_codec.orjson is not None:
+        backends.append("orjson")
+    else:
+        print("orjson is not installed; measuring the standard library only.")
+
+    print(f"{'nodes':>8} {'operation':<22} {'backend':<8} {'median ms':>10}")
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total)
+        document = json.dumps(workflow).encode("utf-8")
+        analysis = WorkflowAnalyzerV2(workflow).analyze()
+        parameters = [node["parameters"] for node in workflow["nodes"]]
+        operations = {
+            "load workflow": lambda doc=document: json_codec.loads(doc),
+            "cache key": lambda wf=workflow: json_codec.dumps_bytes(
+                wf, sort_keys=True, default=str
+            ),
+            "node_parameters": lambda params=parameters: [
+                json_codec.dumps(p, indent=True, sort_keys=True) for p in params
+            ],
+        }
+        for label, func in operations.items():
+            for backend in backends:
+                json_codec.set_backend(backend)
+                seconds, _ = _measure(func, args.repeats)
+                print(f"{total:>8} {label:<22} {backend:<8} {seconds * 1000:>10.1f}")
+
+        # Pydantic's native serializer is used with either backend
+        seconds, _ = _measure(
+            lambda model=analysis: json_codec.dumps_model(model, indent=True),
+            args.repeats,
+        )
+        print(
+            f"{total:>8} {'analysis_json':<22} {'pydantic':<8} {seconds * 1000:>10.1f}"
+        )
+    json_codec.set_backend("auto")
+
+
+def bench_load(args: argparse.Namespace) -> None:
+    """Compares full and selective loading of workflow files with pinData."""
+    print(
+        f"{'nodes':>8} {'pinData MB':>10} {'variant':<22} "
+        f"{'median ms':>10} {'peak MiB':>9}"
+    )
+    for total in args.nodes:
+        workflow = build_synthetic_workflow(total)
+        item = {"json": {"id": 1, "text": "lorem ipsum dolor sit amet " * 4}}
+        items = int(args.pin_mb * 1024 * 1024 / len(json.dumps(item, indent=2)))
+        workflow["pinData"] = {"Start": [item] * items}
+        with tempfile.TemporaryDirectory() as tmp:
+            path = Path(tmp) / "workflow.json"
+            path.write_text(json.dumps(workflow, indent=2), encoding="utf-8")
+            variants = {
+                "full": lambda p=path: loaders.load_workflow_from_file(p),
+                "selective": lambda p=path: loaders.load_workflow_from_file(
+                    p, keys=WORKFLOW_INPUT_KEYS
+                ),
+            }
+            for label, func in variants.items():
+                seconds, peak = _measure(func, args.repeats)
+                print(
+                    f"{total:>8} {args.pin_mb:>10.1f} {label:<22} "
+                    f"{seconds * 1000:>10.1f} {peak:>9.1f}"
+                )
+
+
+def bench_mermaid(args: argparse.Namespace) -> None:
+    """Measures diagram generation per subgraph display mode."""
+    print(f"{'nodes':>8} {'mode':<22} {'median ms':>10} {'peak MiB':>9}")
+    for total in args.nodes:
+        graph = WorkflowAnalyzerV2(build_synthetic_workflow(total)).analyze_graph()
+        for mode in ("subgraph", "simple_node", "separate_clusters"):
+            params = MermaidGenerationParamsV2(subgraph_display_mode=mode)
+            seconds, peak = _measure(
+                lambda g=graph, p=params: generate_mermaid_v2(g, p), args.repeats
+            )
+            print(f"{total:>8} {mode:<22} {seconds * 1000:>10.1f} {peak:>9.1f}")
+
+
+def bench_variants(args: argparse.Namespace) -> None:
+    """Measures rendering parameter variants from one compiled diagram."""
+    print(
+        f"{'nodes':>8} {'mode':<22} {'variant':<10} {'median ms':>10} {'peak MiB':>9}"
+    )
+    for total in args.nodes:
+        graph = WorkflowAnalyzerV2(build_synthetic_workflow(total)).analyze_graph()
+        for mode in ("subgraph", "simple_node", "separate_clusters"):
+            variants = [
+                MermaidGenerationParamsV2(
+                    subgraph_display_mode=mode,
+                    direction=direction,
+                    show_credentials=creds,
+                    show_key_parameters=key_params,
+                )
+                for direction in ("LR", "TD")
+                for creds in (False, True)
+                for key_params in (False, True)
+            ]
+            paths = {
+                "separate": lambda g=graph, vs=variants: [
+                    generate_mermaid_v2(g, p) for p in vs
+                ],
+                "compiled": lambda g=graph, vs=variants: generate_mermaid_variants_v2(
+                    g, vs
+                ),
+            }
+            for label, func in paths.items():
+                seconds, peak = _measure(func, args.repeats)
+                print(
+                    f"{total:>8} {mode:<22} {label:<10} "
+                    f"{seconds * 1000:>10.1f} {peak:>9.1f}"
+                )
+
+
+def main() -> None:
+    """Parses arguments and runs the selected benchmark."""
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    subparsers = parser.add_subparsers(dest="benchmark", required=True)
+
+    analysis = subparsers.add_parser(
+        "analysis", help="Analysis latency and peak memory."
+    )
+    analysis.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    analysis.add_argument("--repeats", type=int, default=3)
+    analysis.set_defaults(func=bench_analysis)
+
+    clusters = subparsers.add_parser(
+        "clusters", help="Phase 3 cluster detection scaling."
+    )
+    clusters.add_argument(
+        "--nodes", type=int, nargs="+", default=[2500, 5000, 10000, 20000]
+    )
+    clusters.add_argument("--shared-tools", type=int, default=0)
+    clusters.add_argument("--repeats", type=int, default=3)
+    clusters.set_defaults(func=bench_clusters)
+
+    incremental = subparsers.add_parser(
+        "incremental", help="Incremental vs. full re-analysis after an edit."
+    )
+    incremental.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    incremental.add_argument("--edits", type=int, default=2)
+    incremental.add_argument("--repeats", type=int, default=3)
+    incremental.set_defaults(func=bench_incremental)
+
+    parse = subparsers.add_parser(
+        "parse", help="Phase 1 parsing, validated vs. trusted input."
+    )
+    parse.add_argument("--nodes", type=int, nargs="+", default=[5000, 20000])
+    parse.add_argument("--repeats", type=int, default=5)
+    parse.set_defaults(func=bench_parse)
+
+    request = subparsers.add_parser(
+        "request", help="Request overhead, default vs. one-shot path."
+    )
+    request.add_argument(
+        "--files",
+        nargs="+",
+        default=sorted(str(p) for p in Path("example").glob("*.json")),
+    )
+    request.add_argument("--repeats", type=int, default=50)
+    request.set_defaults(func=bench_request)
+
+    json_bench = subparsers.add_parser(
+        "json", help="JSON codec backends, standard library vs. orjson."
+    )
+    json_bench.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    json_bench.add_argument("--repeats", type=int, default=5)
+    json_bench.set_defaults(func=bench_json)
+
+    load = subparsers.add_parser(
+        "load", help="Workflow file loading, full vs. selective (skips pinData)."
+    )
+    load.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    load.add_argument("--pin-mb", type=float, default=20.0)
+    load.add_argument("--repeats", type=int, default=5)
+    load.set_defaults(func=bench_load)
+
+    mermaid = subparsers.add_parser(
+        "mermaid", help="Diagram generation per subgraph display mode."
+    )
+    mermaid.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    mermaid.add_argument("--repeats", type=int, default=5)
+    mermaid.set_defaults(func=bench_mermaid)
+
+    variants = subparsers.add_parser(
+        "variants",
+        help="Eight Mermaid parameter variants: separate runs vs. one compile.",
+    )
+    variants.add_argument("--nodes", type=int, nargs="+", default=[1000, 5000])
+    variants.add_argument("--repeats", type=int, default=3)
+    variants.set_defaults(func=bench_variants)
+
+    args = parser.parse_args()
+    logging.disable(logging.CRITICAL)
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -2,38 +2,112 @@
 """Helper functions specifically for the FastAPI endpoints."""
 
 import logging
+from collections.abc import Awaitable, Callable, Coroutine, Iterator
+from typing import Any, TypeVar
 
-from fastapi import HTTPException, status
+from fastapi import HTTPException, Request, Response, status
+from fastapi.routing import APIRoute
+from pydantic import BaseModel, ValidationError
 
-from n8nmermaid.api.schemas import ApiMermaidRequest, ApiReportRequest
-from n8nmermaid.core.orchestrator_v2 import OrchestratorErrorV2, process_v2
+from n8nmermaid.api.schemas import (
+    ApiCombinedRequest,
+    ApiMermaidRequest,
+    ApiMermaidVariantsRequest,
+    ApiReportRequest,
+)
+from n8nmermaid.api.workers import (
+    WorkerPoolFullError,
+    WorkerTimeoutError,
+    get_worker_pool,
+)
+from n8nmermaid.core.orchestrator_v2 import OrchestratorErrorV2
 from n8nmermaid.models_v2.request_v2_models import (
     AnalysisRequestV2,
+    CombinedResultV2,
     MermaidGenerationParamsV2,
     ReportGenerationParamsV2,
     RequestCommand,
 )
+from n8nmermaid.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+# Header carrying the JSON parameters of the raw-body endpoints
+PARAMS_HEADER = "X-N8nmermaid-Params"
+
+ParamsT = TypeVar("ParamsT", bound=BaseModel)
+ResultT = TypeVar("ResultT")
+
+# OpenAPI request body of the raw-body endpoints: the workflow JSON itself
+RAW_WORKFLOW_BODY = {
+    "requestBody": {
+        "required": True,
+        "content": {
+            "application/json": {
+                "schema": {
+                    "type": "object",
+                    "description": "The raw n8n workflow JSON object.",
+                }
+            }
+        },
+    }
+}
+
+
+class CodecJSONRequest(Request):
+    """Request whose JSON body is parsed with the project's JSON codec."""
+
+    async def json(self) -> Any:
+        if not hasattr(self, "_json"):
+            self._json = json_codec.loads(await self.body())
+        return self._json
+
+
+class CodecJSONRoute(APIRoute):
+    """
+    Route class that parses JSON request bodies with utils.json_codec.
+
+    FastAPI parses bodies with the standard library; routers created with
+    `APIRouter(route_class=CodecJSONRoute)` use orjson instead when it is
+    installed. Invalid JSON still yields FastAPI's 422 validation error, as
+    orjson's decode error subclasses json.JSONDecodeError.
+    """
+
+    def get_route_handler(self) -> Callable[[Request], Coroutine[Any, Any, Response]]:
+        route_handler = super().get_route_handler()
+
+        async def codec_route_handler(request: Request) -> Response:
+            return await route_handler(CodecJSONRequest(request.scope, request.receive))
+
+        return codec_route_handler
+
 
 async def run_api_orchestration_v2(
-    request_body: ApiMermaidRequest | ApiReportRequest,
-    command: RequestCommand
-) -> str | dict[str, str]:
+    request_body: ApiMermaidRequest | ApiReportRequest | ApiCombinedRequest,
+    command: RequestCommand,
+    raw_body: bytes | None = None,
+    wait: bool = False,
+) -> str | dict[str, str] | CombinedResultV2:
     """
     Runs the V2 orchestration process based on API request data.
 
     Constructs the core AnalysisRequestV2 from the API request body,
-    invokes the process_v2 function, and handles potential errors by
-    raising appropriate HTTPExceptions.
+    runs it in the worker pool (see api/workers.py) so the event loop stays
+    responsive, and handles potential errors by raising appropriate
+    HTTPExceptions.
 
     Args:
-        request_body: The parsed request body (ApiMermaidRequest or ApiReportRequest).
+        request_body: The parsed request body (ApiMermaidRequest,
+            ApiReportRequest or ApiCombinedRequest).
         command: The specific command being executed.
+        raw_body: The raw JSON request body, handed to worker processes
+            instead of the parsed workflow data.
+        wait: Wait for a free worker pool slot instead of failing with 503
+            when the pool is full (see WorkerPool.run).
 
     Returns:
-        The result from the orchestrator (Mermaid dict or report string).
+        The result from the orchestrator (Mermaid dict, report string or
+        CombinedResultV2).
 
     Raises:
         HTTPException: If validation, orchestration, or unexpected errors occur.
@@ -47,6 +121,9 @@ async def run_api_orchestration_v2(
         mermaid_params = request_body.params
     elif isinstance(request_body, ApiReportRequest):
         report_params = request_body.params
+    elif isinstance(request_body, ApiCombinedRequest):
+        mermaid_params = request_body.mermaid_params
+        report_params = request_body.report_params
     else:
         logger.error("Invalid request body type passed to API helper: %s",
                   type(request_body).__name__)
@@ -55,7 +132,7 @@ async def run_api_orchestration_v2(
             detail="Internal server error: Invalid request data.",
         )
 
-    try:
+    def submit() -> Awaitable[str | dict[str, str] | CombinedResultV2]:
         analysis_request = AnalysisRequestV2(
             workflow_data=request_body.workflow_data,
             command=command,
@@ -63,12 +140,171 @@ async def run_api_orchestration_v2(
                        else MermaidGenerationParamsV2(),
             report_params=report_params,
         )
-        logger.debug("Constructed AnalysisRequestV2, calling process_v2...")
+        logger.debug("Constructed AnalysisRequestV2, dispatching to worker pool...")
+        return get_worker_pool().run(analysis_request, raw_body, wait)
+
+    return await _run_in_worker_pool(submit, command)
+
+
+async def run_api_raw_orchestration_v2(
+    raw_workflow: bytes,
+    command: RequestCommand,
+    mermaid_params: MermaidGenerationParamsV2 | None = None,
+    report_params: ReportGenerationParamsV2 | None = None,
+) -> str | dict[str, str] | CombinedResultV2:
+    """
+    Runs the V2 orchestration process for a raw workflow JSON body.
+
+    The workflow is parsed once, in the worker pool, and handed to the
+    analyzer without pydantic validation of its content.
+
+    Args:
+        raw_workflow: The HTTP request body, the n8n workflow JSON itself.
+        command: The specific command being executed.
+        mermaid_params: Mermaid parameters (defaults if None).
+        report_params: Report parameters (required for reports).
+
+    Returns:
+        The result from the orchestrator (Mermaid dict, report string or
+        CombinedResultV2).
+
+    Raises:
+        HTTPException: If validation, orchestration, or unexpected errors occur.
+    """
+    logger.debug("Running raw API orchestration helper for command: %s", command)
+
+    def submit() -> Awaitable[str | dict[str, str] | CombinedResultV2]:
+        analysis_request = AnalysisRequestV2(
+            workflow_data={},
+            command=command,
+            mermaid_params=mermaid_params if mermaid_params is not None
+                       else MermaidGenerationParamsV2(),
+            report_params=report_params,
+        )
+        return get_worker_pool().run_raw(raw_workflow, analysis_request)
+
+    return await _run_in_worker_pool(submit, command)
+
+
+async def run_api_mermaid_stream_v2(
+    request_body: ApiMermaidRequest,
+) -> list[tuple[str, Iterator[str]]]:
+    """
+    Analyzes a workflow for a streaming Mermaid response.
+
+    The analysis and the diagram compilation run in the worker pool (in a
+    thread, see WorkerPool.run_stream); the diagram lines are rendered while
+    the returned iterators are consumed.
+
+    Args:
+        request_body: The parsed Mermaid request body.
+
+    Returns:
+        The diagrams, as (key, iterator of diagram lines) pairs.
+
+    Raises:
+        HTTPException: If validation, analysis, or unexpected errors occur.
+    """
+    logger.debug("Running streaming API orchestration helper.")
+
+    def submit() -> Awaitable[list[tuple[str, Iterator[str]]]]:
+        analysis_request = AnalysisRequestV2(
+            workflow_data=request_body.workflow_data,
+            command="generate_mermaid",
+            mermaid_params=request_body.params,
+        )
+        return get_worker_pool().run_stream(analysis_request)
+
+    return await _run_in_worker_pool(submit, "generate_mermaid")
+
+
+async def run_api_mermaid_variants_v2(
+    request_body: ApiMermaidVariantsRequest,
+) -> list[dict[str, str]]:
+    """
+    Renders several Mermaid variants of a workflow from a single analysis.
+
+    Args:
+        request_body: The parsed variants request body.
+
+    Returns:
+        The diagrams of each variant, in the order requested.
+
+    Raises:
+        HTTPException: If validation, analysis, or unexpected errors occur.
+    """
+    logger.debug("Running API variants orchestration helper.")
+
+    def submit() -> Awaitable[list[dict[str, str]]]:
+        analysis_request = AnalysisRequestV2(
+            workflow_data=request_body.workflow_data,
+            command="generate_mermaid",
+            mermaid_params=request_body.variants[0],
+            mermaid_variants=request_body.variants,
+        )
+        return get_worker_pool().run_variants(analysis_request)
+
+    return await _run_in_worker_pool(submit, "generate_mermaid")
+
+
+def parse_params_header(value: str | None, model: type[ParamsT]) -> ParamsT:
+    """
+    Parses the JSON parameters envelope of a raw-body endpoint.
+
+    Args:
+        value: The PARAMS_HEADER value, or None if the header is absent.
+        model: The parameters model to validate against.
 
-        result = process_v2(request=analysis_request)
+    Returns:
+        The validated parameters (the model's defaults if absent).
+
+    Raises:
+        HTTPException: 422 if the header is not valid JSON for the model.
+    """
+    try:
+        if value is None:
+            return model.model_validate({})
+        return model.model_validate_json(value)
+    except ValidationError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid {PARAMS_HEADER} header: {e}",
+        ) from e
+
+
+async def _run_in_worker_pool(
+    submit: Callable[[], Awaitable[ResultT]], command: RequestCommand
+) -> ResultT:
+    """
+    Awaits a worker pool submission and maps errors to HTTPExceptions.
+
+    Args:
+        submit: Builds the analysis request and submits it to the pool.
+        command: The command being executed, for logging.
+
+    Returns:
+        The result from the orchestrator.
+
+    Raises:
+        HTTPException: If validation, orchestration, or unexpected errors occur.
+    """
+    try:
+        result = await submit()
         logger.info("API Orchestration successful for command: %s", command)
         return result
 
+    except WorkerPoolFullError as e:
+        logger.warning("Rejecting request, worker pool is full: %s", e)
+        raise HTTPException(
+            status_code=status.HTTP_503_SERVICE_UNAVAILABLE,
+            detail=f"Server busy: {e}",
+            headers={"Retry-After": "1"},
+        ) from e
+    except WorkerTimeoutError as e:
+        raise HTTPException(
+            status_code=status.HTTP_504_GATEWAY_TIMEOUT, detail=f"Timeout: {e}"
+        ) from e
+
     except OrchestratorErrorV2 as e:
         logger.error("Orchestration failed: %s", e, exc_info=False)
         logger.debug("Orchestration error details:", exc_info=True)
@@ -13,8 +13,11 @@ from fastapi.responses import JSONResponse
 from n8nmermaid.core.orchestrator_v2 import OrchestratorErrorV2
 from n8nmermaid.utils.logging import setup_logging
 
+from .routers import batch as batch_router_v2
+from .routers import combined as combined_router_v2
 from .routers import mermaid as mermaid_router_v2
 from .routers import report as report_router_v2
+from .workers import shutdown_worker_pool
 
 logger = logging.getLogger(__name__)
 
@@ -55,6 +58,7 @@ async def lifespan(app: FastAPI):
     setup_logging()
     logger.info("FastAPI application startup sequence initiated via lifespan.")
     yield
+    shutdown_worker_pool()
     logger.info("FastAPI application shutdown complete.")
 
 
@@ -95,6 +99,16 @@ def create_app() -> FastAPI:
         prefix="/v2/report",
         tags=["V2 - Report Generation"],
     )
+    app.include_router(
+        combined_router_v2.router,
+        prefix="/v2/combined",
+        tags=["V2 - Combined Generation"],
+    )
+    app.include_router(
+        batch_router_v2.router,
+        prefix="/v2/batch",
+        tags=["V2 - Batch Processing"],
+    )
 
     @app.get("/", tags=["Status"], summary="API Root/Health Check")
     async def read_root():
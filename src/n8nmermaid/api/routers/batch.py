@@ -0,0 +1,254 @@
+# src/n8nmermaid/api/routers/batch.py
+"""API Router for V2 batch processing with streamed NDJSON results."""
+
+import asyncio
+import logging
+from collections.abc import AsyncIterator
+from typing import Any
+
+from fastapi import APIRouter, HTTPException, Request, status
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from pydantic import ValidationError
+
+from n8nmermaid.api.helpers import run_api_orchestration_v2
+from n8nmermaid.api.schemas import (
+    ApiBatchItemHeader,
+    ApiBatchResult,
+    ApiCombinedRequest,
+    ApiErrorDetail,
+    ApiMermaidRequest,
+    ApiReportRequest,
+)
+from n8nmermaid.api.workers import get_worker_pool
+from n8nmermaid.models_v2.request_v2_models import CombinedResultV2, RequestCommand
+from n8nmermaid.utils import json_codec
+from n8nmermaid.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+router = APIRouter()
+
+DEFAULT_BATCH_MAX_ITEMS = 1000
+NDJSON_MEDIA_TYPE = "application/x-ndjson"
+_NDJSON_CONTENT_TYPES = (NDJSON_MEDIA_TYPE, "application/ndjson", "application/jsonl")
+
+
+class _BatchEntry:
+    """A parsed batch item with its raw JSON line (NDJSON only) or parse error."""
+
+    __slots__ = ("item", "raw", "error")
+
+    def __init__(self, item: Any, raw: bytes | None = None, error: str | None = None):
+        self.item = item
+        self.raw = raw
+        self.error = error
+
+
+def _parse_batch(body: bytes, content_type: str) -> list[_BatchEntry]:
+    """
+    Splits a batch request body into items.
+
+    Parsing is CPU-bound and grows with the body, so it runs in a thread
+    (see process_batch_endpoint) rather than on the event loop.
+
+    Args:
+        body: The raw request body.
+        content_type: The request's Content-Type header.
+
+    Returns:
+        The batch entries, in request order. Unparseable NDJSON lines become
+        entries carrying an error instead of failing the whole batch.
+
+    Raises:
+        HTTPException: If a JSON body is malformed or lacks an 'items' list.
+    """
+    if content_type.split(";")[0].strip().lower() in _NDJSON_CONTENT_TYPES:
+        entries = []
+        for line in body.splitlines():
+            if not line.strip():
+                continue
+            try:
+                entries.append(_BatchEntry(json_codec.loads(line), raw=line))
+            except json_codec.JSONDecodeError as e:
+                entries.append(_BatchEntry(None, error=f"Invalid JSON: {e}"))
+        return entries
+
+    try:
+        data = json_codec.loads(body)
+    except json_codec.JSONDecodeError as e:
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail=f"Invalid JSON: {e}",
+        ) from e
+    items = data.get("items") if isinstance(data, dict) else None
+    if not isinstance(items, list):
+        raise HTTPException(
+            status_code=status.HTTP_422_UNPROCESSABLE_ENTITY,
+            detail="Batch body must be a JSON object with an 'items' list.",
+        )
+    return [_BatchEntry(item) for item in items]
+
+
+def _validate_item(
+    item: dict[str, Any],
+) -> tuple[RequestCommand, ApiMermaidRequest | ApiReportRequest | ApiCombinedRequest]:
+    """
+    Validates a batch item as a request for its command.
+
+    Args:
+        item: The parsed batch item.
+
+    Returns:
+        The item's command and its validated request body.
+
+    Raises:
+        ValidationError: If the item is not a valid request.
+    """
+    header = ApiBatchItemHeader.model_validate(item)
+    request_body: ApiMermaidRequest | ApiReportRequest | ApiCombinedRequest
+    if header.command == "generate_mermaid":
+        request_body = ApiMermaidRequest.model_validate(item)
+    elif header.command == "generate_report":
+        request_body = ApiReportRequest.model_validate(item)
+    else:
+        request_body = ApiCombinedRequest.model_validate(item)
+    return header.command, request_body
+
+
+async def _process_item(
+    index: int, entry: _BatchEntry, slots: asyncio.Semaphore
+) -> ApiBatchResult:
+    """
+    Validates and processes a single batch item, capturing any error.
+
+    Validation runs in a thread, and the item waits for a free worker pool
+    slot instead of failing when other requests keep the pool full.
+    """
+    item = entry.item
+    item_id = item.get("id") if isinstance(item, dict) else None
+    result = ApiBatchResult(
+        index=index,
+        id=item_id if isinstance(item_id, str) else None,
+        status=status.HTTP_200_OK,
+    )
+
+    if entry.error is not None or not isinstance(item, dict):
+        result.status = status.HTTP_422_UNPROCESSABLE_ENTITY
+        result.detail = entry.error or "Batch item must be a JSON object."
+        return result
+
+    async with slots:
+        try:
+            command, request_body = await run_in_threadpool(_validate_item, item)
+        except ValidationError as e:
+            result.status = status.HTTP_422_UNPROCESSABLE_ENTITY
+            result.detail = f"Invalid input: {e}"
+            return result
+
+        try:
+            output = await run_api_orchestration_v2(
+                request_body=request_body,
+                command=command,
+                raw_body=entry.raw,
+                wait=True,
+            )
+        except HTTPException as e:
+            result.status = e.status_code
+            result.detail = str(e.detail)
+            return result
+
+    if isinstance(output, CombinedResultV2):
+        result.diagrams = output.diagrams
+        result.report = output.report
+    elif isinstance(output, dict):
+        result.diagrams = output
+    else:
+        result.report = output
+    return result
+
+
+async def _stream_results(entries: list[_BatchEntry]) -> AsyncIterator[bytes]:
+    """Processes all entries concurrently, yielding NDJSON lines as they finish."""
+    # Keep at most one item per worker in flight, so a large batch neither
+    # floods the pool's queue nor starves other requests; items that still
+    # find the pool full (it is shared) wait for a slot
+    slots = asyncio.Semaphore(get_worker_pool().max_workers)
+    tasks = [
+        asyncio.create_task(_process_item(index, entry, slots))
+        for index, entry in enumerate(entries)
+    ]
+    completed = 0
+    try:
+        for next_result in asyncio.as_completed(tasks):
+            result = await next_result
+            completed += 1
+            yield result.model_dump_json(exclude_none=True).encode("utf-8") + b"\n"
+    finally:
+        for task in tasks:
+            task.cancel()
+        logger.info(
+            "Batch finished: %d of %d item(s) streamed.", completed, len(entries)
+        )
+
+
+@router.post(
+    "/",
+    summary="Process a Batch of Workflows",
+    description="""
+Processes many workflows in one call and streams the results back as NDJSON
+(`application/x-ndjson`), one line per item in completion order.
+
+The request body is either a JSON object `{"items": [...]}` or, with
+`Content-Type: application/x-ndjson`, one item per line. Each item holds:
+
+- **id**: Optional client-chosen ID, echoed in the item's result.
+- **command**: `generate_mermaid` (default), `generate_report` or
+  `generate_combined`.
+- **workflow_data**: The complete JSON object of the n8n workflow.
+- **params**: Parameters as for `/v2/mermaid` or `/v2/report` (required for
+  reports), or `mermaid_params` and `report_params` as for `/v2/combined`.
+
+Each result line holds the item's `index` and `id`, an HTTP-style `status`
+and either `diagrams`, `report` or an error `detail`. Failing items don't
+abort the batch. The number of items is limited by
+`N8NMERMAID_API_BATCH_MAX_ITEMS` (default 1000).
+""",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {
+            "content": {NDJSON_MEDIA_TYPE: {}},
+            "description": "One ApiBatchResult JSON object per line.",
+        },
+        status.HTTP_413_REQUEST_ENTITY_TOO_LARGE: {"model": ApiErrorDetail,
+                                             "description": "Too Many Items"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Batch Body"},
+    },
+)
+async def process_batch_endpoint(request: Request) -> StreamingResponse:
+    """
+    Handles batch requests.
+
+    Args:
+        request: The HTTP request with a JSON or NDJSON batch body.
+
+    Returns:
+        A StreamingResponse yielding one NDJSON result line per item.
+
+    Raises:
+        HTTPException: If the batch body is malformed or has too many items.
+    """
+    logger.info("Received request for /v2/batch endpoint.")
+    entries = await run_in_threadpool(
+        _parse_batch, await request.body(), request.headers.get("content-type", "")
+    )
+
+    max_items = env_int("N8NMERMAID_API_BATCH_MAX_ITEMS", DEFAULT_BATCH_MAX_ITEMS)
+    if len(entries) > max_items:
+        raise HTTPException(
+            status_code=status.HTTP_413_REQUEST_ENTITY_TOO_LARGE,
+            detail=f"Batch has {len(entries)} items, the limit is {max_items}.",
+        )
+
+    logger.info("Processing batch of %d item(s).", len(entries))
+    return StreamingResponse(_stream_results(entries), media_type=NDJSON_MEDIA_TYPE)
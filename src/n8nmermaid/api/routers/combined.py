@@ -0,0 +1,166 @@
+# src/n8nmermaid/api/routers/combined.py
+"""API Router for V2 combined diagram and report generation."""
+
+import logging
+from typing import Annotated
+
+from fastapi import APIRouter, Header, HTTPException, Request, status
+
+from n8nmermaid.api.helpers import (
+    PARAMS_HEADER,
+    RAW_WORKFLOW_BODY,
+    CodecJSONRoute,
+    parse_params_header,
+    run_api_orchestration_v2,
+    run_api_raw_orchestration_v2,
+)
+from n8nmermaid.api.schemas import (
+    ApiCombinedParams,
+    ApiCombinedRequest,
+    ApiCombinedResponse,
+    ApiErrorDetail,
+)
+from n8nmermaid.models_v2.request_v2_models import CombinedResultV2
+
+logger = logging.getLogger(__name__)
+router = APIRouter(route_class=CodecJSONRoute)
+
+
+@router.post(
+    "/",
+    response_model=ApiCombinedResponse,
+    summary="Generate Diagram(s) and Report Together",
+    description="""
+Analyzes the provided n8n workflow JSON once and generates both Mermaid
+diagrams and an analysis report from that single analysis. Equivalent to
+calling `/v2/mermaid` and `/v2/report`, at the cost of one call.
+
+- **workflow_data**: The complete JSON object of your n8n workflow.
+- **mermaid_params**: Optional diagram parameters, as `params` for `/v2/mermaid`.
+- **report_params**: Report parameters, as `params` for `/v2/report`
+  (`report_types` is required).
+
+Returns the diagrams (key `main` holds the primary diagram) and the report.
+""",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+)
+async def generate_combined_endpoint(
+    request_body: ApiCombinedRequest, request: Request
+) -> ApiCombinedResponse:
+    """
+    Handles requests for diagrams and a report from a single analysis.
+
+    Args:
+        request_body: The request body containing workflow data and the
+            mermaid and report parameters.
+        request: The raw HTTP request, whose body is passed to worker processes.
+
+    Returns:
+        An ApiCombinedResponse containing the diagram(s) and the report.
+
+    Raises:
+        HTTPException: If errors occur during processing.
+    """
+    logger.info("Received request for /v2/combined endpoint.")
+    try:
+        result = await run_api_orchestration_v2(
+            request_body=request_body,
+            command="generate_combined",
+            raw_body=await request.body(),
+        )
+
+        if not isinstance(result, CombinedResultV2):
+            logger.error("Combined generation returned unexpected type: %s",
+                      type(result).__name__)
+            raise HTTPException(
+                status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+                detail="Internal server error: Generator returned unexpected format.",
+            )
+
+        return ApiCombinedResponse(diagrams=result.diagrams, report=result.report)
+
+    except HTTPException as http_exc:
+        raise http_exc
+    except Exception as e:
+        logger.exception("Unexpected error in /v2/combined endpoint.")
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail=f"An internal server error occurred: {e}",
+        ) from e
+
+
+@router.post(
+    "/raw",
+    response_model=ApiCombinedResponse,
+    summary="Generate Diagram(s) and Report from a Raw Workflow Body",
+    description=f"""
+Same as `/v2/combined`, but the request body is the n8n workflow JSON itself.
+The body is parsed once, in the worker pool, and is not validated field by
+field, which makes this variant faster for large workflows.
+
+Parameters are passed as a JSON object in the required `{PARAMS_HEADER}`
+header, with the `mermaid_params` and `report_params` fields of `/v2/combined`
+(e.g. `{{"report_params": {{"report_types": ["stats"]}}}}`).
+""",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+    openapi_extra=RAW_WORKFLOW_BODY,
+)
+async def generate_combined_raw_endpoint(
+    request: Request,
+    params: Annotated[str | None, Header(
+        alias=PARAMS_HEADER,
+        description="JSON object with mermaid_params and report_params.")] = None,
+) -> ApiCombinedResponse:
+    """
+    Handles raw-body requests for diagrams and a report from one analysis.
+
+    Args:
+        request: The HTTP request, whose body is the workflow JSON.
+        params: The JSON parameters envelope header.
+
+    Returns:
+        An ApiCombinedResponse containing the diagram(s) and the report.
+
+    Raises:
+        HTTPException: If errors occur during processing.
+    """
+    logger.info("Received request for /v2/combined/raw endpoint.")
+    combined_params = parse_params_header(params, ApiCombinedParams)
+    result = await run_api_raw_orchestration_v2(
+        raw_workflow=await request.body(),
+        command="generate_combined",
+        mermaid_params=combined_params.mermaid_params,
+        report_params=combined_params.report_params,
+    )
+
+    if not isinstance(result, CombinedResultV2):
+        logger.error("Combined generation returned unexpected type: %s",
+                  type(result).__name__)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: Generator returned unexpected format.",
+        )
+
+    return ApiCombinedResponse(diagrams=result.diagrams, report=result.report)
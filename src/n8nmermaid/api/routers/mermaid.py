@@ -2,18 +2,64 @@
 """API Router for V2 Mermaid diagram generation."""
 
 import logging
+from collections.abc import Iterable, Iterator
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Query, Request, status
+from fastapi.responses import StreamingResponse
 
-from n8nmermaid.api.helpers import run_api_orchestration_v2
+from n8nmermaid.api.helpers import (
+    PARAMS_HEADER,
+    RAW_WORKFLOW_BODY,
+    CodecJSONRoute,
+    parse_params_header,
+    run_api_mermaid_stream_v2,
+    run_api_mermaid_variants_v2,
+    run_api_orchestration_v2,
+    run_api_raw_orchestration_v2,
+)
 from n8nmermaid.api.schemas import (
+    MAX_MERMAID_VARIANTS,
     ApiErrorDetail,
     ApiMermaidRequest,
     ApiMermaidResponse,
+    ApiMermaidVariantsRequest,
+    ApiMermaidVariantsResponse,
+)
+from n8nmermaid.models_v2.request_v2_models import (
+    DiagramFormat,
+    MermaidGenerationParamsV2,
 )
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CodecJSONRoute)
+
+# Diagram lines are sent in blocks of about this size: each block handed to
+# the response costs a thread hand-off, so sending single lines would be slow
+STREAM_CHUNK_BYTES = 64 * 1024
+
+# Content type of a streamed diagram, by output format
+STREAM_MEDIA_TYPES: dict[DiagramFormat, str] = {
+    "mermaid": "text/plain; charset=utf-8",
+    "dot": "text/vnd.graphviz; charset=utf-8",
+    "json": "application/json",
+    "alias_table": "application/json",
+}
+
+
+def _iter_chunks(lines: Iterable[str]) -> Iterator[bytes]:
+    """Joins diagram lines into UTF-8 blocks of about STREAM_CHUNK_BYTES."""
+    buffer: list[str] = []
+    size = 0
+    for line in lines:
+        buffer.append(line)
+        size += len(line)
+        if size >= STREAM_CHUNK_BYTES:
+            yield "".join(buffer).encode("utf-8")
+            buffer.clear()
+            size = 0
+    if buffer:
+        yield "".join(buffer).encode("utf-8")
 
 
 @router.post(
@@ -32,6 +78,11 @@ Analyzes the provided n8n workflow JSON and generates Mermaid flowchart syntax.
       Default: false.
     - `subgraph_display_mode`: How to handle clusters ('subgraph', 'simple_node',
       'separate_clusters'). Default: 'subgraph'.
+    - `output_format`: 'mermaid' (flowchart syntax), 'dot' (Graphviz), 'json'
+      (a node/edge graph, serialized as a string) or 'alias_table' (the
+      compact mode aliases mapped to the original IDs). Default: 'mermaid'.
+    - `compact`: If true, Mermaid output uses short node aliases and leaves out
+      comments and indentation, for very large diagrams. Default: false.
 
 Returns a dictionary where the key `main` holds the primary diagram.
 If `subgraph_display_mode` is 'separate_clusters', additional keys will contain
@@ -44,16 +95,21 @@ diagrams for each cluster root.
                                          "description": "Invalid Input Data"},
         status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
                                           "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
     },
 )
 async def generate_mermaid_endpoint(
-    request_body: ApiMermaidRequest
+    request_body: ApiMermaidRequest, request: Request
 ) -> ApiMermaidResponse:
     """
     Handles requests to generate Mermaid diagrams.
 
     Args:
         request_body: The request body containing workflow data and parameters.
+        request: The raw HTTP request, whose body is passed to worker processes.
 
     Returns:
         An ApiMermaidResponse containing the generated diagram(s).
@@ -64,7 +120,9 @@ async def generate_mermaid_endpoint(
     logger.info("Received request for /v2/mermaid endpoint.")
     try:
         result = await run_api_orchestration_v2(
-            request_body=request_body, command="generate_mermaid"
+            request_body=request_body,
+            command="generate_mermaid",
+            raw_body=await request.body(),
         )
 
         if not isinstance(result, dict):
@@ -85,3 +143,193 @@ async def generate_mermaid_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An internal server error occurred: {e}",
         ) from e
+
+
+@router.post(
+    "/stream",
+    summary="Stream a Mermaid Diagram",
+    description="""
+Same request as `/v2/mermaid`, but a single diagram is returned as plain text
+(`text/plain`; `text/vnd.graphviz` for DOT, `application/json` for the JSON
+graph) and streamed while it is generated, instead of being built in full and
+wrapped in JSON. The streamed text equals the diagram's value in the
+`/v2/mermaid` response.
+
+- **diagram** (query): Key of the diagram to return. Default: `main`. In
+  'separate_clusters' mode the cluster diagrams have the keys listed by
+  `/v2/mermaid`.
+
+Errors found during analysis are returned as for `/v2/mermaid`; once
+streaming has started, a failure aborts the response.
+""",
+    response_class=StreamingResponse,
+    responses={
+        status.HTTP_200_OK: {"content": {"text/plain": {},
+                                         "text/vnd.graphviz": {},
+                                         "application/json": {}},
+                             "description": "The diagram."},
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_404_NOT_FOUND: {"model": ApiErrorDetail,
+                             "description": "Unknown Diagram Key"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+)
+async def generate_mermaid_stream_endpoint(
+    request_body: ApiMermaidRequest,
+    diagram: Annotated[str, Query(
+        description="Key of the diagram to stream.")] = "main",
+) -> StreamingResponse:
+    """
+    Handles requests to stream a Mermaid diagram.
+
+    Args:
+        request_body: The request body containing workflow data and parameters.
+        diagram: The key of the diagram to stream.
+
+    Returns:
+        A StreamingResponse yielding the diagram text.
+
+    Raises:
+        HTTPException: If the analysis fails or the diagram key is unknown.
+    """
+    logger.info("Received request for /v2/mermaid/stream endpoint.")
+    diagrams = await run_api_mermaid_stream_v2(request_body)
+
+    # The diagrams are compiled; skipped ones are never rendered
+    lines = next((lines for key, lines in diagrams if key == diagram), None)
+    if lines is None:
+        raise HTTPException(
+            status_code=status.HTTP_404_NOT_FOUND,
+            detail=f"No diagram with key '{diagram}' was generated.",
+        )
+    return StreamingResponse(
+        _iter_chunks(lines),
+        media_type=STREAM_MEDIA_TYPES[request_body.params.output_format],
+    )
+
+
+@router.post(
+    "/variants",
+    response_model=ApiMermaidVariantsResponse,
+    summary="Generate Several Variants of the Mermaid Diagram(s)",
+    description=f"""
+Renders the same workflow with several parameter sets in one call. The
+workflow is analyzed once and its diagrams are compiled once per
+`subgraph_display_mode`; the variants only differ in rendering, so e.g.
+trying out directions or label options, or producing Mermaid, DOT and the
+JSON graph of a workflow at once (one variant per `output_format`), costs
+little more than a single diagram.
+
+- **workflow_data**: The complete JSON object of your n8n workflow.
+- **variants**: A list of 1 to {MAX_MERMAID_VARIANTS} parameter objects, each
+  with the fields of `params` for `/v2/mermaid`.
+
+Returns one entry per variant, in order, each shaped like the `/v2/mermaid`
+response.
+""",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+)
+async def generate_mermaid_variants_endpoint(
+    request_body: ApiMermaidVariantsRequest,
+) -> ApiMermaidVariantsResponse:
+    """
+    Handles requests to generate several variants of the Mermaid diagrams.
+
+    Args:
+        request_body: The request body containing workflow data and variants.
+
+    Returns:
+        An ApiMermaidVariantsResponse with the diagrams of each variant.
+
+    Raises:
+        HTTPException: If errors occur during processing.
+    """
+    logger.info("Received request for /v2/mermaid/variants endpoint.")
+    results = await run_api_mermaid_variants_v2(request_body)
+    return ApiMermaidVariantsResponse(
+        variants=[ApiMermaidResponse(diagrams=diagrams) for diagrams in results]
+    )
+
+
+@router.post(
+    "/raw",
+    response_model=ApiMermaidResponse,
+    summary="Generate Mermaid Diagram(s) from a Raw Workflow Body",
+    description=f"""
+Same as `/v2/mermaid`, but the request body is the n8n workflow JSON itself.
+The body is parsed once, in the worker pool, and is not validated field by
+field, which makes this variant faster for large workflows.
+
+Parameters are passed as a JSON object in the `{PARAMS_HEADER}` header, with
+the fields of `params` for `/v2/mermaid` (e.g. `{{"direction": "TD"}}`).
+Without the header, defaults are used.
+""",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+    openapi_extra=RAW_WORKFLOW_BODY,
+)
+async def generate_mermaid_raw_endpoint(
+    request: Request,
+    params: Annotated[str | None, Header(
+        alias=PARAMS_HEADER,
+        description="JSON object with Mermaid generation parameters.")] = None,
+) -> ApiMermaidResponse:
+    """
+    Handles raw-body requests to generate Mermaid diagrams.
+
+    Args:
+        request: The HTTP request, whose body is the workflow JSON.
+        params: The JSON parameters envelope header.
+
+    Returns:
+        An ApiMermaidResponse containing the generated diagram(s).
+
+    Raises:
+        HTTPException: If errors occur during processing.
+    """
+    logger.info("Received request for /v2/mermaid/raw endpoint.")
+    mermaid_params = parse_params_header(params, MermaidGenerationParamsV2)
+    result = await run_api_raw_orchestration_v2(
+        raw_workflow=await request.body(),
+        command="generate_mermaid",
+        mermaid_params=mermaid_params,
+    )
+
+    if not isinstance(result, dict):
+        logger.error("Mermaid generation returned unexpected type: %s",
+                  type(result).__name__)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: Generator returned unexpected format.",
+        )
+
+    return ApiMermaidResponse(diagrams=result)
@@ -2,18 +2,27 @@
 """API Router for V2 analysis report generation."""
 
 import logging
+from typing import Annotated
 
-from fastapi import APIRouter, HTTPException, status
+from fastapi import APIRouter, Header, HTTPException, Request, status
 
-from n8nmermaid.api.helpers import run_api_orchestration_v2
+from n8nmermaid.api.helpers import (
+    PARAMS_HEADER,
+    RAW_WORKFLOW_BODY,
+    CodecJSONRoute,
+    parse_params_header,
+    run_api_orchestration_v2,
+    run_api_raw_orchestration_v2,
+)
 from n8nmermaid.api.schemas import (
     ApiErrorDetail,
     ApiReportRequest,
     ApiReportResponse,
 )
+from n8nmermaid.models_v2.request_v2_models import ReportGenerationParamsV2
 
 logger = logging.getLogger(__name__)
-router = APIRouter()
+router = APIRouter(route_class=CodecJSONRoute)
 
 
 @router.post(
@@ -43,16 +52,21 @@ Returns the generated report content as a single string
                                          "description": "Invalid Input Data"},
         status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
                                           "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
     },
 )
 async def generate_report_endpoint(
-    request_body: ApiReportRequest
+    request_body: ApiReportRequest, request: Request
 ) -> ApiReportResponse:
     """
     Handles requests to generate analysis reports.
 
     Args:
         request_body: The request body containing workflow data and report parameters.
+        request: The raw HTTP request, whose body is passed to worker processes.
 
     Returns:
         An ApiReportResponse containing the generated report string.
@@ -63,7 +77,9 @@ async def generate_report_endpoint(
     logger.info("Received request for /v2/report endpoint.")
     try:
         result: str | dict[str, str] = await run_api_orchestration_v2(
-            request_body=request_body, command="generate_report"
+            request_body=request_body,
+            command="generate_report",
+            raw_body=await request.body(),
         )
 
         if not isinstance(result, str):
@@ -85,3 +101,69 @@ async def generate_report_endpoint(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"An internal server error occurred: {e}",
         ) from e
+
+
+@router.post(
+    "/raw",
+    response_model=ApiReportResponse,
+    summary="Generate Analysis Report from a Raw Workflow Body",
+    description=f"""
+Same as `/v2/report`, but the request body is the n8n workflow JSON itself.
+The body is parsed once, in the worker pool, and is not validated field by
+field, which makes this variant faster for large workflows.
+
+Parameters are passed as a JSON object in the required `{PARAMS_HEADER}`
+header, with the fields of `params` for `/v2/report`
+(e.g. `{{"report_types": ["stats"]}}`).
+""",
+    responses={
+        status.HTTP_400_BAD_REQUEST: {"model": ApiErrorDetail,
+                               "description": "Analysis or Orchestration Error"},
+        status.HTTP_422_UNPROCESSABLE_ENTITY: {"model": ApiErrorDetail,
+                                         "description": "Invalid Input Data"},
+        status.HTTP_500_INTERNAL_SERVER_ERROR: {"model": ApiErrorDetail,
+                                          "description": "Internal Server Error"},
+        status.HTTP_503_SERVICE_UNAVAILABLE: {"model": ApiErrorDetail,
+                                        "description": "Too Many Pending Requests"},
+        status.HTTP_504_GATEWAY_TIMEOUT: {"model": ApiErrorDetail,
+                                    "description": "Request Timed Out"},
+    },
+    openapi_extra=RAW_WORKFLOW_BODY,
+)
+async def generate_report_raw_endpoint(
+    request: Request,
+    params: Annotated[str | None, Header(
+        alias=PARAMS_HEADER,
+        description="JSON object with report generation parameters.")] = None,
+) -> ApiReportResponse:
+    """
+    Handles raw-body requests to generate analysis reports.
+
+    Args:
+        request: The HTTP request, whose body is the workflow JSON.
+        params: The JSON parameters envelope header.
+
+    Returns:
+        An ApiReportResponse containing the generated report string.
+
+    Raises:
+        HTTPException: If errors occur during processing.
+    """
+    logger.info("Received request for /v2/report/raw endpoint.")
+    report_params = parse_params_header(params, ReportGenerationParamsV2)
+    result = await run_api_raw_orchestration_v2(
+        raw_workflow=await request.body(),
+        command="generate_report",
+        report_params=report_params,
+    )
+
+    if not isinstance(result, str):
+        logger.error("Report generation returned unexpected type: %s",
+                  type(result).__name__)
+        raise HTTPException(
+            status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
+            detail="Internal server error: "
+            "Report generator returned unexpected format.",
+        )
+
+    return ApiReportResponse(report=result)
@@ -6,6 +6,10 @@ from typing import Any
 from pydantic import BaseModel, Field
 
 from n8nmermaid.models_v2 import MermaidGenerationParamsV2, ReportGenerationParamsV2
+from n8nmermaid.models_v2.request_v2_models import RequestCommand
+
+# Upper bound on the parameter sets of one /mermaid/variants request
+MAX_MERMAID_VARIANTS = 32
 
 
 class ApiMermaidRequest(BaseModel):
@@ -16,6 +20,14 @@ class ApiMermaidRequest(BaseModel):
         default_factory=MermaidGenerationParamsV2,
         description="Mermaid generation parameters.")
 
+class ApiMermaidVariantsRequest(BaseModel):
+    """Request body schema for the /mermaid/variants endpoint."""
+    workflow_data: dict[str, Any] = Field(
+        ..., description="The raw n8n workflow JSON object.")
+    variants: list[MermaidGenerationParamsV2] = Field(
+        ..., min_length=1, max_length=MAX_MERMAID_VARIANTS,
+        description="Mermaid generation parameters of each variant to render.")
+
 class ApiReportRequest(BaseModel):
     """Request body schema for the /report endpoint."""
     workflow_data: dict[str, Any] = Field(
@@ -23,16 +35,64 @@ class ApiReportRequest(BaseModel):
     params: ReportGenerationParamsV2 = Field(
         ..., description="Report generation parameters.")
 
+class ApiCombinedParams(BaseModel):
+    """Parameters of a /combined request (the /combined/raw header envelope)."""
+    mermaid_params: MermaidGenerationParamsV2 = Field(
+        default_factory=MermaidGenerationParamsV2,
+        description="Mermaid generation parameters.")
+    report_params: ReportGenerationParamsV2 = Field(
+        ..., description="Report generation parameters.")
+
+class ApiCombinedRequest(ApiCombinedParams):
+    """Request body schema for the /combined endpoint."""
+    workflow_data: dict[str, Any] = Field(
+        ..., description="The raw n8n workflow JSON object.")
+
 class ApiMermaidResponse(BaseModel):
     """Response schema for the /mermaid endpoint."""
     diagrams: dict[str, str] = Field(
-        description="Dictionary of generated Mermaid diagrams. "
-        "Key 'main' holds the primary diagram.")
+        description="Dictionary of generated diagrams, as text in the requested "
+        "output format. Key 'main' holds the primary diagram.")
+
+class ApiMermaidVariantsResponse(BaseModel):
+    """Response schema for the /mermaid/variants endpoint."""
+    variants: list[ApiMermaidResponse] = Field(
+        description="The diagrams of each variant, in the order requested.")
 
 class ApiReportResponse(BaseModel):
     """Response schema for the /report endpoint."""
     report: str = Field(description="The generated report content as a string.")
 
+class ApiCombinedResponse(BaseModel):
+    """Response schema for the /combined endpoint."""
+    diagrams: dict[str, str] = Field(
+        description="Dictionary of generated Mermaid diagrams. "
+        "Key 'main' holds the primary diagram.")
+    report: str = Field(description="The generated report content as a string.")
+
+class ApiBatchItemHeader(BaseModel):
+    """Identifying fields of a /batch item; the rest is a request for its command."""
+    id: str | None = Field(
+        default=None, description="Client-chosen ID echoed in the item's result.")
+    command: RequestCommand = Field(
+        default="generate_mermaid",
+        description="'generate_mermaid' (body as for /mermaid), "
+        "'generate_report' (as for /report) or 'generate_combined' "
+        "(as for /combined).")
+
+class ApiBatchResult(BaseModel):
+    """One NDJSON line of the /batch response."""
+    index: int = Field(description="Position of the item in the request.")
+    id: str | None = Field(default=None, description="The item's ID, if given.")
+    status: int = Field(description="HTTP-style status code of the item.")
+    diagrams: dict[str, str] | None = Field(
+        default=None,
+        description="Generated diagrams (generate_mermaid/generate_combined).")
+    report: str | None = Field(
+        default=None,
+        description="Generated report (generate_report/generate_combined).")
+    detail: str | None = Field(default=None, description="Error message.")
+
 class ApiErrorDetail(BaseModel):
     """Schema for error responses."""
     detail: str
@@ -0,0 +1,425 @@
+# src/n8nmermaid/api/workers.py
+"""
+Worker pool that runs CPU-bound V2 orchestration off the API event loop.
+
+Analysis and generation are synchronous and can take seconds on large
+workflows. Endpoints hand requests to a WorkerPool instead, which runs them
+in a thread pool and/or a process pool, bounds the number of requests queued
+or in flight, and enforces a per-request timeout. Requests sent to worker
+processes carry the raw JSON request body rather than a pickled workflow
+dict, which is both smaller and faster to transfer. Raw-workflow requests
+(see run_raw) are only parsed inside the worker.
+"""
+
+import asyncio
+import logging
+import multiprocessing
+import os
+import threading
+from collections import deque
+from collections.abc import Callable, Iterator
+from concurrent.futures import Executor, Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Literal, get_args
+
+from n8nmermaid.core.orchestrator_v2 import (
+    process_mermaid_variants_v2,
+    process_v2,
+    stream_mermaid_v2,
+)
+from n8nmermaid.models_v2.request_v2_models import (
+    AnalysisRequestV2,
+    CombinedResultV2,
+)
+from n8nmermaid.utils import json_codec
+from n8nmermaid.utils.env import env_float, env_int
+
+logger = logging.getLogger(__name__)
+
+WorkerMode = Literal["thread", "process", "auto"]
+
+DEFAULT_WORKER_MODE: WorkerMode = "thread"
+DEFAULT_MAX_WORKERS = min(4, os.cpu_count() or 1)
+DEFAULT_MAX_PENDING = 32
+DEFAULT_TIMEOUT_SECONDS = 60.0
+DEFAULT_PROCESS_MIN_KB = 1024
+
+
+class WorkerPoolFullError(Exception):
+    """Raised when the worker pool already has its maximum of pending requests."""
+
+    pass
+
+
+class WorkerTimeoutError(Exception):
+    """Raised when a request does not complete within the pool's timeout."""
+
+    pass
+
+
+def _process_raw_request(
+    raw_body: bytes, request_fields: dict[str, Any], enveloped: bool = True
+) -> str | dict[str, str] | CombinedResultV2:
+    """
+    Processes a request in a worker from its raw JSON body.
+
+    The body is parsed once here and the workflow dict is handed to the
+    orchestrator without revalidation.
+
+    Args:
+        raw_body: The HTTP request body: a JSON object with 'workflow_data'
+            (already validated by the API process) if `enveloped`, else the
+            workflow JSON itself.
+        request_fields: The remaining AnalysisRequestV2 fields (command and
+            validated parameter models).
+        enveloped: Whether the workflow is wrapped in a request envelope.
+
+    Returns:
+        The orchestrator output.
+
+    Raises:
+        ValueError: If a raw workflow body is not a JSON object.
+    """
+    workflow_data = json_codec.loads(raw_body)
+    if enveloped:
+        workflow_data = workflow_data["workflow_data"]
+    elif not isinstance(workflow_data, dict):
+        raise ValueError("Expected a JSON object holding the n8n workflow.")
+    request = AnalysisRequestV2.model_construct(
+        workflow_data=workflow_data, **request_fields
+    )
+    return process_v2(request=request)
+
+
+def _request_fields(request: AnalysisRequestV2) -> dict[str, Any]:
+    """Returns the fields of a validated request other than workflow_data."""
+    return {
+        name: getattr(request, name)
+        for name in AnalysisRequestV2.model_fields
+        if name != "workflow_data"
+    }
+
+
+class WorkerPool:
+    """
+    Bounded executor for V2 orchestration requests.
+
+    In 'thread' mode requests run in a thread pool (cheap hand-off, shares the
+    analysis cache, but pure-Python analysis still contends for the GIL). In
+    'process' mode they run in a process pool. 'auto' uses threads for small
+    payloads and processes for raw bodies of at least `process_min_bytes`.
+    Streaming requests (see run_stream) always run in the thread pool.
+    """
+
+    def __init__(
+        self,
+        mode: WorkerMode = DEFAULT_WORKER_MODE,
+        max_workers: int = DEFAULT_MAX_WORKERS,
+        max_pending: int = DEFAULT_MAX_PENDING,
+        timeout: float | None = DEFAULT_TIMEOUT_SECONDS,
+        process_min_bytes: int = DEFAULT_PROCESS_MIN_KB * 1024,
+    ):
+        """
+        Initializes the pool. Executors are started on first use.
+
+        Args:
+            mode: 'thread', 'process' or 'auto' (see class docstring).
+            max_workers: Number of worker threads/processes per executor.
+            max_pending: Maximum requests queued or running at once; further
+                requests are rejected with WorkerPoolFullError or, if they
+                ask to (see run()), wait for a free slot.
+            timeout: Seconds a request may take, or None for no limit.
+            process_min_bytes: Raw body size from which 'auto' mode uses the
+                process pool.
+
+        Raises:
+            ValueError: If the mode is unknown.
+        """
+        if mode not in get_args(WorkerMode):
+            raise ValueError(f"Unknown worker mode: '{mode}'")
+        self.mode = mode
+        self.max_workers = max(max_workers, 1)
+        self.max_pending = max(max_pending, 1)
+        self.timeout = timeout or None
+        self.process_min_bytes = process_min_bytes
+        self.pending = 0
+        self._lock = threading.Lock()
+        # Requests waiting for a free slot (see _admit), woken on release
+        self._waiters: deque[tuple[asyncio.AbstractEventLoop, asyncio.Future]] = deque()
+        self._threads: ThreadPoolExecutor | None = None
+        self._processes: ProcessPoolExecutor | None = None
+
+    def _thread_executor(self) -> Executor:
+        with self._lock:
+            if self._threads is None:
+                self._threads = ThreadPoolExecutor(
+                    max_workers=self.max_workers, thread_name_prefix="n8nmermaid"
+                )
+            return self._threads
+
+    def _process_executor(self) -> Executor:
+        with self._lock:
+            if self._processes is None:
+                # Forking the server process (event loop and worker threads
+                # running) can deadlock children on inherited locks
+                self._processes = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=multiprocessing.get_context("spawn"),
+                )
+            return self._processes
+
+    def _uses_processes(self, raw_body: bytes | None) -> bool:
+        """Decides which executor a request goes to."""
+        if self.mode == "process":
+            return True
+        if self.mode == "auto":
+            return raw_body is not None and len(raw_body) >= self.process_min_bytes
+        return False
+
+    def _release(self, _future: Future | None = None) -> None:
+        with self._lock:
+            self.pending -= 1
+            waiters = list(self._waiters)
+            self._waiters.clear()
+        # Called from worker threads; every waiter re-checks for a free slot
+        for loop, waiter in waiters:
+            loop.call_soon_threadsafe(_wake, waiter)
+
+    def _submit(self, request: AnalysisRequestV2, raw_body: bytes | None) -> Future:
+        """Submits a request to the selected executor."""
+        if not self._uses_processes(raw_body):
+            return self._thread_executor().submit(process_v2, request)
+        if raw_body is None:
+            return self._process_executor().submit(process_v2, request)
+        return self._process_executor().submit(
+            _process_raw_request, raw_body, _request_fields(request)
+        )
+
+    async def run(
+        self,
+        request: AnalysisRequestV2,
+        raw_body: bytes | None = None,
+        wait: bool = False,
+    ) -> str | dict[str, str] | CombinedResultV2:
+        """
+        Runs a request in the pool without blocking the event loop.
+
+        Args:
+            request: The validated analysis request.
+            raw_body: The raw JSON request body (an object holding
+                'workflow_data'), sent to worker processes instead of the
+                parsed workflow dict.
+            wait: Wait for a free slot instead of raising WorkerPoolFullError
+                when max_pending requests are already queued (the timeout
+                only starts once the request is admitted).
+
+        Returns:
+            The orchestrator output.
+
+        Raises:
+            WorkerPoolFullError: If max_pending requests are already queued
+                (unless `wait` is set).
+            WorkerTimeoutError: If the request exceeds the timeout. A request
+                that already started keeps its worker busy until it finishes
+                and still counts as pending until then.
+            OrchestratorErrorV2: Errors raised by the orchestration itself.
+        """
+        return await self._run(
+            lambda: self._submit(request, raw_body), request.command, wait
+        )
+
+    async def run_raw(
+        self, raw_workflow: bytes, request: AnalysisRequestV2
+    ) -> str | dict[str, str] | CombinedResultV2:
+        """
+        Runs a request whose workflow is still an unparsed JSON document.
+
+        The document is parsed in the worker (thread or process), so neither
+        parsing nor validation of the workflow happens on the event loop.
+
+        Args:
+            raw_workflow: The n8n workflow JSON as bytes.
+            request: The request parameters, with empty `workflow_data`.
+
+        Returns:
+            The orchestrator output.
+
+        Raises:
+            ValueError: If the document is not a JSON object.
+            WorkerPoolFullError, WorkerTimeoutError, OrchestratorErrorV2: As
+                for run().
+        """
+        executor = (
+            self._process_executor
+            if self._uses_processes(raw_workflow)
+            else self._thread_executor
+        )
+        return await self._run(
+            lambda: executor().submit(
+                _process_raw_request, raw_workflow, _request_fields(request), False
+            ),
+            request.command,
+        )
+
+    async def run_stream(
+        self, request: AnalysisRequestV2
+    ) -> list[tuple[str, Iterator[str]]]:
+        """
+        Analyzes and compiles a Mermaid request in the pool for streaming.
+
+        The analysis and the diagram compilation run in the pool, so the
+        event loop is only left with rendering lines from the compiled
+        diagrams, outside the pool's pending count and timeout. This always
+        uses the thread pool, whatever the pool's mode: the returned line
+        generators can't cross process boundaries.
+
+        Args:
+            request: The validated analysis request.
+
+        Returns:
+            The diagrams, as returned by stream_mermaid_v2().
+
+        Raises:
+            WorkerPoolFullError, WorkerTimeoutError, OrchestratorErrorV2: As
+                for run().
+        """
+        return await self._run(
+            lambda: self._thread_executor().submit(stream_mermaid_v2, request),
+            request.command,
+        )
+
+    async def run_variants(self, request: AnalysisRequestV2) -> list[dict[str, str]]:
+        """
+        Renders the Mermaid variants of a request in the pool.
+
+        Args:
+            request: The validated analysis request, with `mermaid_variants`.
+
+        Returns:
+            The diagrams of each variant, as returned by
+            process_mermaid_variants_v2().
+
+        Raises:
+            WorkerPoolFullError, WorkerTimeoutError, OrchestratorErrorV2: As
+                for run().
+        """
+        executor = (
+            self._process_executor
+            if self._uses_processes(None)
+            else self._thread_executor
+        )
+        return await self._run(
+            lambda: executor().submit(process_mermaid_variants_v2, request),
+            request.command,
+        )
+
+    async def _admit(self, wait: bool) -> None:
+        """Takes a pending slot, waiting for one to free up if `wait` is set."""
+        while True:
+            with self._lock:
+                if self.pending < self.max_pending:
+                    self.pending += 1
+                    return
+                if not wait:
+                    raise WorkerPoolFullError(
+                        "Too many pending requests "
+                        f"({self.pending}/{self.max_pending})."
+                    )
+                loop = asyncio.get_running_loop()
+                waiter = loop.create_future()
+                self._waiters.append((loop, waiter))
+            await waiter
+
+    async def _run(
+        self, submit: Callable[[], Future], command: str, wait: bool = False
+    ) -> Any:
+        """Admits a request, submits it and awaits the result (see run())."""
+        await self._admit(wait)
+
+        try:
+            future = submit()
+        except BaseException:
+            self._release()
+            raise
+        future.add_done_callback(self._release)
+
+        try:
+            return await asyncio.wait_for(asyncio.wrap_future(future), self.timeout)
+        except TimeoutError:
+            logger.warning(
+                "Request for command '%s' timed out after %ss.",
+                command,
+                self.timeout,
+            )
+            raise WorkerTimeoutError(
+                f"Request did not complete within {self.timeout} seconds."
+            ) from None
+
+    def shutdown(self) -> None:
+        """Stops the executors, cancelling requests that have not started."""
+        with self._lock:
+            executors = [e for e in (self._threads, self._processes) if e]
+            self._threads = self._processes = None
+        for executor in executors:
+            executor.shutdown(wait=False, cancel_futures=True)
+
+
+def _wake(waiter: asyncio.Future) -> None:
+    """Wakes a request waiting for a pool slot, unless it was cancelled."""
+    if not waiter.done():
+        waiter.set_result(None)
+
+
+_worker_pool: WorkerPool | None = None
+_worker_pool_lock = threading.Lock()
+
+
+def get_worker_pool() -> WorkerPool:
+    """
+    Returns the process-wide worker pool, creating it on first use.
+
+    Reads N8NMERMAID_API_WORKER_MODE (thread, process or auto; default
+    thread), N8NMERMAID_API_WORKERS (default min(4, CPU count)),
+    N8NMERMAID_API_MAX_PENDING (default 32), N8NMERMAID_API_TIMEOUT_SECONDS
+    (default 60, 0 disables) and N8NMERMAID_API_PROCESS_MIN_KB (default 1024)
+    from the environment.
+
+    Returns:
+        The shared WorkerPool instance.
+    """
+    global _worker_pool
+    if _worker_pool is None:
+        with _worker_pool_lock:
+            if _worker_pool is None:
+                mode = os.getenv("N8NMERMAID_API_WORKER_MODE", DEFAULT_WORKER_MODE)
+                mode = mode.strip().lower()
+                if mode not in get_args(WorkerMode):
+                    logger.warning(
+                        "Invalid N8NMERMAID_API_WORKER_MODE '%s'. Defaulting to %s.",
+                        mode,
+                        DEFAULT_WORKER_MODE,
+                    )
+                    mode = DEFAULT_WORKER_MODE
+                _worker_pool = WorkerPool(
+                    mode=mode,
+                    max_workers=env_int("N8NMERMAID_API_WORKERS", DEFAULT_MAX_WORKERS),
+                    max_pending=env_int(
+                        "N8NMERMAID_API_MAX_PENDING", DEFAULT_MAX_PENDING
+                    ),
+                    timeout=env_float(
+                        "N8NMERMAID_API_TIMEOUT_SECONDS", DEFAULT_TIMEOUT_SECONDS
+                    ),
+                    process_min_bytes=env_int(
+                        "N8NMERMAID_API_PROCESS_MIN_KB", DEFAULT_PROCESS_MIN_KB
+                    )
+                    * 1024,
+                )
+    return _worker_pool
+
+
+def shutdown_worker_pool() -> None:
+    """Shuts down the shared worker pool, if it was created."""
+    global _worker_pool
+    with _worker_pool_lock:
+        pool, _worker_pool = _worker_pool, None
+    if pool is not None:
+        pool.shutdown()
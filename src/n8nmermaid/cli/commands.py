@@ -1,6 +1,7 @@
 # src/n8nmermaid/cli/commands.py
 """Typer command definitions for the n8nmermaid V2 CLI."""
 
+import os
 import subprocess
 from pathlib import Path
 from typing import Annotated
@@ -16,12 +17,18 @@ from n8nmermaid.models_v2.request_v2_models import (
 from n8nmermaid.utils.logging import setup_logging
 
 from .enums import (
+    CliDiagramFormat,
     CliMermaidDirection,
     CliReportFormat,
     CliReportType,
     CliSubgraphDisplayMode,
 )
-from .helpers import run_orchestration_v2
+from .helpers import (
+    parse_mermaid_variants,
+    run_batch_v2,
+    run_mermaid_variants_v2,
+    run_orchestration_v2,
+)
 
 app = typer.Typer(
     name="n8nmermaid",
@@ -45,7 +52,11 @@ def generate_mermaid_diagram_v2(
             dir_okay=False,
             readable=True,
             resolve_path=True,
-            help="Path to the n8n workflow JSON file.",
+            help=(
+                "Path to the n8n workflow JSON file. A .json.gz file, JSON array"
+                " or archive is read if it holds exactly one workflow (use"
+                " batch for more)."
+            ),
         ),
     ],
     direction: Annotated[
@@ -73,6 +84,16 @@ def generate_mermaid_diagram_v2(
             help="Display key parameters (e.g., model names) on nodes.",
         ),
     ] = False,
+    compact: Annotated[
+        bool,
+        typer.Option(
+            "--compact",
+            help=(
+                "Compact Mermaid output for large diagrams: short node aliases, "
+                "no comments or indentation (see --diagram-format alias_table)."
+            ),
+        ),
+    ] = False,
     subgraph_display_mode: Annotated[
         CliSubgraphDisplayMode,
         typer.Option(
@@ -99,6 +120,41 @@ def generate_mermaid_diagram_v2(
             ),
         ),
     ] = None,
+    diagram_formats: Annotated[
+        list[CliDiagramFormat] | None,
+        typer.Option(
+            "--diagram-format",
+            case_sensitive=False,
+            help=(
+                "Output format: 'mermaid' (default, .mmd), 'dot' (Graphviz, .dot), "
+                "'json' (node/edge graph, .json) or 'alias_table' (the --compact "
+                "aliases, .aliases.json). Repeat to write several formats from "
+                "one analysis (requires --output-dir)."
+            ),
+        ),
+    ] = None,
+    trusted: Annotated[
+        bool,
+        typer.Option(
+            "--trusted",
+            help=(
+                "Treat the workflow file as known-good (e.g. from an n8n export "
+                "pipeline) and skip per-node validation for faster parsing."
+            ),
+        ),
+    ] = False,
+    variant: Annotated[
+        list[str] | None,
+        typer.Option(
+            "--variant",
+            help=(
+                "JSON object of Mermaid parameters overriding the options above, "
+                "e.g. '{\"direction\": \"TD\"}'. Repeat to render several variants "
+                "from one analysis into <output-dir>/variant_<n>/ "
+                "(requires --output-dir)."
+            ),
+        ),
+    ] = None,
 ):
     """
     Generates V2 Mermaid flowchart syntax from an n8n workflow file.
@@ -106,7 +162,19 @@ def generate_mermaid_diagram_v2(
     Outputs the main diagram to stdout by default. If --output-dir is specified,
     saves the main diagram and any separate cluster diagrams (if using
     --subgraph-mode separate_clusters) to individual .mmd files in that directory.
+    With --variant, saves each variant to its own subdirectory.
     """
+    formats = [f.value for f in diagram_formats or [CliDiagramFormat.MERMAID]]
+    if variant and not output_dir:
+        typer.echo("Error: --variant requires --output-dir to be set.", err=True)
+        raise typer.Exit(code=1)
+    if len(formats) > 1 and not output_dir:
+        typer.echo(
+            "Error: Several --diagram-format values require --output-dir to be set.",
+            err=True,
+        )
+        raise typer.Exit(code=1)
+
     if (
         subgraph_display_mode == CliSubgraphDisplayMode.SEPARATE_CLUSTERS
         and not output_dir
@@ -122,14 +190,38 @@ def generate_mermaid_diagram_v2(
         subgraph_direction=subgraph_direction.value,
         show_credentials=show_credentials,
         show_key_parameters=show_key_parameters,
+        compact=compact,
         subgraph_display_mode=subgraph_display_mode.value,
+        output_format=formats[0],
     )
 
+    if (variant or len(formats) > 1) and output_dir:
+        variants = (
+            parse_mermaid_variants(variant, mermaid_params)
+            if variant
+            else [mermaid_params]
+        )
+        # Several formats render every variant in each; a single one is
+        # already set on the variants (which may override it)
+        targets = [
+            (
+                output_dir / f"variant_{number}" if variant else output_dir,
+                params.model_copy(update={"output_format": output_format})
+                if len(formats) > 1
+                else params,
+            )
+            for number, params in enumerate(variants, start=1)
+            for output_format in formats
+        ]
+        run_mermaid_variants_v2(filepath=filepath, targets=targets, trusted=trusted)
+        return
+
     run_orchestration_v2(
         filepath=filepath,
         command="generate_mermaid",
         mermaid_params=mermaid_params,
         output_dir=output_dir,
+        trusted=trusted,
     )
 
 
@@ -143,7 +235,11 @@ def generate_analysis_report_v2(
             dir_okay=False,
             readable=True,
             resolve_path=True,
-            help="Path to the n8n workflow JSON file.",
+            help=(
+                "Path to the n8n workflow JSON file. A .json.gz file, JSON array"
+                " or archive is read if it holds exactly one workflow (use"
+                " batch for more)."
+            ),
         ),
     ],
     report_types: Annotated[
@@ -168,6 +264,16 @@ def generate_analysis_report_v2(
             help="Output format for the report.",
         ),
     ] = CliReportFormat.TEXT.value,
+    trusted: Annotated[
+        bool,
+        typer.Option(
+            "--trusted",
+            help=(
+                "Treat the workflow file as known-good (e.g. from an n8n export "
+                "pipeline) and skip per-node validation for faster parsing."
+            ),
+        ),
+    ] = False,
 ):
     """
     Generates one or more V2 analysis reports from an n8n workflow file.
@@ -195,6 +301,322 @@ def generate_analysis_report_v2(
         filepath=filepath,
         command="generate_report",
         report_params=report_params,
+        trusted=trusted,
+    )
+
+
+@app.command("combined")
+def generate_combined_v2(
+    filepath: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            file_okay=True,
+            dir_okay=False,
+            readable=True,
+            resolve_path=True,
+            help=(
+                "Path to the n8n workflow JSON file. A .json.gz file, JSON array"
+                " or archive is read if it holds exactly one workflow (use"
+                " batch for more)."
+            ),
+        ),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Option(
+            "--output-dir",
+            "-o",
+            file_okay=False,
+            dir_okay=True,
+            writable=True,
+            resolve_path=True,
+            help="Directory to save the diagram(s) and the report into.",
+        ),
+    ],
+    report_types: Annotated[
+        list[CliReportType],
+        typer.Option(
+            "--type",
+            "-t",
+            case_sensitive=False,
+            help="Type(s) of V2 report to generate alongside the diagram(s).",
+        ),
+    ],
+    output_format: Annotated[
+        CliReportFormat,
+        typer.Option(
+            "--format",
+            "-f",
+            case_sensitive=False,
+            help="Output format for the report.",
+        ),
+    ] = CliReportFormat.TEXT.value,
+    direction: Annotated[
+        CliMermaidDirection,
+        typer.Option(
+            "--direction", "-d", case_sensitive=False, help="Flowchart direction."
+        ),
+    ] = DEFAULT_DIRECTION_V2,
+    subgraph_direction: Annotated[
+        CliMermaidDirection,
+        typer.Option(
+            "--subgraph-direction",
+            case_sensitive=False,
+            help="Direction within subgraphs.",
+        ),
+    ] = DEFAULT_SUBGRAPH_DIRECTION_V2,
+    show_credentials: Annotated[
+        bool,
+        typer.Option("--show-creds", help="Display used credential names on nodes."),
+    ] = False,
+    show_key_parameters: Annotated[
+        bool,
+        typer.Option(
+            "--show-params",
+            help="Display key parameters (e.g., model names) on nodes.",
+        ),
+    ] = False,
+    compact: Annotated[
+        bool,
+        typer.Option(
+            "--compact",
+            help=(
+                "Compact Mermaid output for large diagrams: short node aliases, "
+                "no comments or indentation (see --diagram-format alias_table)."
+            ),
+        ),
+    ] = False,
+    subgraph_display_mode: Annotated[
+        CliSubgraphDisplayMode,
+        typer.Option(
+            "--subgraph-mode",
+            case_sensitive=False,
+            help="How to display clustered nodes (see the mermaid command).",
+        ),
+    ] = CliSubgraphDisplayMode.SUBGRAPH.value,
+    diagram_format: Annotated[
+        CliDiagramFormat,
+        typer.Option(
+            "--diagram-format",
+            case_sensitive=False,
+            help="Diagram output format (see the mermaid command).",
+        ),
+    ] = CliDiagramFormat.MERMAID.value,
+    trusted: Annotated[
+        bool,
+        typer.Option(
+            "--trusted",
+            help="Skip per-node validation for known-good workflow files.",
+        ),
+    ] = False,
+):
+    """
+    Generates Mermaid diagram(s) and a report from a single analysis.
+
+    Analyzes the workflow once and saves the diagram(s) (main.mmd plus any
+    cluster files, or other suffixes with --diagram-format) and the report
+    (report.txt, .md or .json, depending on --format) to --output-dir.
+    """
+    if not report_types:
+        typer.echo("Error: No report types specified. Use the --type option.", err=True)
+        raise typer.Exit(code=1)
+
+    mermaid_params = MermaidGenerationParamsV2(
+        direction=direction.value,
+        subgraph_direction=subgraph_direction.value,
+        show_credentials=show_credentials,
+        show_key_parameters=show_key_parameters,
+        compact=compact,
+        subgraph_display_mode=subgraph_display_mode.value,
+        output_format=diagram_format.value,
+    )
+
+    try:
+        report_params = ReportGenerationParamsV2(
+            report_types=[rt.value for rt in report_types],
+            output_format=output_format.value,
+        )
+    except ValueError as e:
+        typer.echo(f"Error: Invalid report type combination: {e}", err=True)
+        raise typer.Exit(code=1) from e
+
+    run_orchestration_v2(
+        filepath=filepath,
+        command="generate_combined",
+        mermaid_params=mermaid_params,
+        report_params=report_params,
+        output_dir=output_dir,
+        trusted=trusted,
+    )
+
+
+@app.command("batch")
+def process_batch_v2(
+    input_dir: Annotated[
+        Path,
+        typer.Argument(
+            exists=True,
+            file_okay=False,
+            dir_okay=True,
+            readable=True,
+            resolve_path=True,
+            help="Directory containing n8n workflow files or archives.",
+        ),
+    ],
+    output_dir: Annotated[
+        Path,
+        typer.Option(
+            "--output-dir",
+            "-o",
+            file_okay=False,
+            dir_okay=True,
+            writable=True,
+            resolve_path=True,
+            help="Root directory of the output tree, mirroring the input tree.",
+        ),
+    ],
+    pattern: Annotated[
+        str,
+        typer.Option(
+            "--glob",
+            "-g",
+            help=(
+                "Glob pattern selecting workflow files, relative to INPUT_DIR. "
+                "Files other than .json, .json.gz, zip and tar are ignored."
+            ),
+        ),
+    ] = "**/*",
+    jobs: Annotated[
+        int,
+        typer.Option(
+            "--jobs",
+            "-j",
+            min=1,
+            help="Number of worker processes (default: CPU count).",
+        ),
+    ] = os.cpu_count() or 1,
+    report_types: Annotated[
+        list[CliReportType] | None,
+        typer.Option(
+            "--type",
+            "-t",
+            case_sensitive=False,
+            help="Write these report type(s) per workflow instead of diagrams.",
+        ),
+    ] = None,
+    output_format: Annotated[
+        CliReportFormat,
+        typer.Option(
+            "--format",
+            "-f",
+            case_sensitive=False,
+            help="Output format for reports.",
+        ),
+    ] = CliReportFormat.TEXT.value,
+    direction: Annotated[
+        CliMermaidDirection,
+        typer.Option(
+            "--direction", "-d", case_sensitive=False, help="Flowchart direction."
+        ),
+    ] = DEFAULT_DIRECTION_V2,
+    subgraph_direction: Annotated[
+        CliMermaidDirection,
+        typer.Option(
+            "--subgraph-direction",
+            case_sensitive=False,
+            help="Direction within subgraphs.",
+        ),
+    ] = DEFAULT_SUBGRAPH_DIRECTION_V2,
+    show_credentials: Annotated[
+        bool,
+        typer.Option("--show-creds", help="Display used credential names on nodes."),
+    ] = False,
+    show_key_parameters: Annotated[
+        bool,
+        typer.Option(
+            "--show-params",
+            help="Display key parameters (e.g., model names) on nodes.",
+        ),
+    ] = False,
+    compact: Annotated[
+        bool,
+        typer.Option(
+            "--compact",
+            help=(
+                "Compact Mermaid output for large diagrams: short node aliases, "
+                "no comments or indentation (see --diagram-format alias_table)."
+            ),
+        ),
+    ] = False,
+    subgraph_display_mode: Annotated[
+        CliSubgraphDisplayMode,
+        typer.Option(
+            "--subgraph-mode",
+            case_sensitive=False,
+            help="How to display clustered nodes (see the mermaid command).",
+        ),
+    ] = CliSubgraphDisplayMode.SUBGRAPH.value,
+    diagram_format: Annotated[
+        CliDiagramFormat,
+        typer.Option(
+            "--diagram-format",
+            case_sensitive=False,
+            help="Diagram output format (see the mermaid command).",
+        ),
+    ] = CliDiagramFormat.MERMAID.value,
+    trusted: Annotated[
+        bool,
+        typer.Option(
+            "--trusted",
+            help="Skip per-node validation for known-good workflow files.",
+        ),
+    ] = False,
+):
+    """
+    Processes a directory of n8n workflow files in parallel.
+
+    Generates diagrams (or reports, with --type) for every workflow in the
+    files matching --glob and writes them to a tree under --output-dir
+    mirroring INPUT_DIR: diagrams of 'a/b.json' go to 'a/b/main.mmd' (plus
+    cluster files; other suffixes with --diagram-format), reports to
+    'a/b.txt', '.md' or '.json'. Files may hold an array of workflows (a
+    multi-workflow export), be gzipped, or be zip/tar archives of such
+    files; these are read without extracting to disk and get one more
+    output level per array index and archive entry (e.g.
+    'a/b/3/main.mmd', 'a/c.zip/x/main.mmd'). Prints per-workflow timing and
+    a summary, and exits non-zero if any workflow failed.
+    """
+    mermaid_params = MermaidGenerationParamsV2(
+        direction=direction.value,
+        subgraph_direction=subgraph_direction.value,
+        show_credentials=show_credentials,
+        show_key_parameters=show_key_parameters,
+        compact=compact,
+        subgraph_display_mode=subgraph_display_mode.value,
+        output_format=diagram_format.value,
+    )
+
+    report_params = None
+    if report_types:
+        try:
+            report_params = ReportGenerationParamsV2(
+                report_types=[rt.value for rt in report_types],
+                output_format=output_format.value,
+            )
+        except ValueError as e:
+            typer.echo(f"Error: Invalid report type combination: {e}", err=True)
+            raise typer.Exit(code=1) from e
+
+    run_batch_v2(
+        input_dir=input_dir,
+        pattern=pattern,
+        output_dir=output_dir,
+        command="generate_report" if report_params else "generate_mermaid",
+        mermaid_params=mermaid_params,
+        report_params=report_params,
+        jobs=jobs,
+        trusted=trusted,
     )
 
 
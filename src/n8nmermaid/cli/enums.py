@@ -22,6 +22,15 @@ class CliSubgraphDisplayMode(str, Enum):
     SEPARATE_CLUSTERS = "separate_clusters"
 
 
+class CliDiagramFormat(str, Enum):
+    """CLI choices for diagram output formats."""
+
+    MERMAID = "mermaid"
+    DOT = "dot"
+    JSON = "json"
+    ALIAS_TABLE = "alias_table"
+
+
 class CliReportType(str, Enum):
     """CLI choices for report types."""
 
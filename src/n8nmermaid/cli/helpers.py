@@ -2,24 +2,59 @@
 """Helper functions for the V2 CLI commands."""
 
 import logging
+import os
 import sys
-from pathlib import Path
-from typing import Any
+import time
+from collections.abc import Iterable, Iterator, Mapping
+from concurrent.futures import (
+    FIRST_COMPLETED,
+    Future,
+    ProcessPoolExecutor,
+    as_completed,
+    wait,
+)
+from pathlib import Path, PurePath, PurePosixPath
+from typing import Any, NamedTuple
 
 import typer
+from pydantic import ValidationError
 
+from n8nmermaid.core.analysis_cache import AnalysisCache
+from n8nmermaid.core.analyzer_v2.constants import WORKFLOW_INPUT_KEYS
+from n8nmermaid.core.generators.mermaid_v2.constants import DIAGRAM_FORMAT_SUFFIXES
 from n8nmermaid.core.generators.mermaid_v2.helpers import sanitize_filename
-from n8nmermaid.core.orchestrator_v2 import OrchestratorErrorV2, process_v2
+from n8nmermaid.core.orchestrator_v2 import (
+    OrchestratorErrorV2,
+    process_mermaid_variants_v2,
+    process_v2,
+    stream_mermaid_v2,
+)
 from n8nmermaid.models_v2.request_v2_models import (
     AnalysisRequestV2,
+    CombinedResultV2,
     MermaidGenerationParamsV2,
     ReportGenerationParamsV2,
     RequestCommand,
 )
-from n8nmermaid.utils import loaders
+from n8nmermaid.utils import json_codec, loaders
 
 logger = logging.getLogger(__name__)
 
+REPORT_FORMAT_SUFFIXES = {"text": ".txt", "markdown": ".md", "json": ".json"}
+
+# A CLI run analyzes each workflow once, so hashing workflows for the shared
+# analysis cache would be pure overhead
+_NO_CACHE = AnalysisCache(max_entries=0)
+
+
+class BatchFileResult(NamedTuple):
+    """Outcome of processing one workflow (file or archive entry) in a batch."""
+
+    path: str
+    seconds: float
+    outputs: int
+    error: str | None = None
+
 
 def _handle_orchestration_error(err: Exception, context: str):
     """Logs and reports orchestration errors."""
@@ -40,7 +75,9 @@ def _load_workflow_data(filepath: Path) -> dict[str, Any]:
     """Loads workflow data from a file, handling errors."""
     logger.debug("Loading workflow file: %s", filepath)
     try:
-        workflow_data = loaders.load_workflow_from_file(filepath)
+        workflow_data = loaders.load_workflow_from_file(
+            filepath, keys=WORKFLOW_INPUT_KEYS
+        )
         if workflow_data is None:
             logger.critical(
                 "Failed to load workflow JSON from %s (returned None).", filepath
@@ -67,6 +104,7 @@ def _build_analysis_request(
     command: RequestCommand,
     mermaid_params: MermaidGenerationParamsV2 | None,
     report_params: ReportGenerationParamsV2 | None,
+    trusted: bool = False,
 ) -> AnalysisRequestV2:
     """Constructs the V2 analysis request."""
     logger.debug("Constructing AnalysisRequestV2...")
@@ -76,11 +114,12 @@ def _build_analysis_request(
             if mermaid_params is not None
             else MermaidGenerationParamsV2()
         )
-        request = AnalysisRequestV2(
-            workflow_data=workflow_data,
+        request = AnalysisRequestV2.from_workflow(
+            workflow_data,
             command=command,
             mermaid_params=effective_mermaid_params,
             report_params=report_params,
+            trusted_input=trusted,
         )
         return request
     except Exception as e:
@@ -91,33 +130,42 @@ def _build_analysis_request(
         raise typer.Exit(code=1) from e
 
 
-def _handle_mermaid_output(result: str | dict[str, str], output_dir: Path | None):
-    """Handles output for the generate_mermaid command."""
-    if not isinstance(result, dict):
-        logger.error(
-            "OrchestratorV2 returned unexpected type (%s) for generate_mermaid.",
-            type(result).__name__,
-        )
-        typer.echo("Error: Unexpected output format from generator.", err=True)
-        raise typer.Exit(code=1)
+def _handle_mermaid_output(
+    diagrams: Iterator[tuple[str, Iterator[str]]],
+    output_dir: Path | None,
+    suffix: str = ".mmd",
+):
+    """
+    Handles output for the generate_mermaid command.
 
+    Diagram lines are written as they are generated, so the diagram text is
+    never held in memory as a whole. Without an output directory only the
+    main diagram is generated, and written to stdout; if stdout is closed
+    early (e.g. piped into `head`) the command exits quietly with code 1.
+    """
     if output_dir:
-        save_diagrams_to_dir(result, output_dir)
-    else:
-        main_diagram = result.get("main", "")
-        if main_diagram:
-            typer.echo(main_diagram.strip())
-        else:
-            logger.warning(
-                "OrchestratorV2 returned dict, but 'main' key missing/empty."
-            )
-            typer.echo(
-                "Error: Failed to retrieve main diagram content.", err=True
-            )
-            raise typer.Exit(code=1)
-
+        save_diagrams_to_dir(diagrams, output_dir, suffix=suffix)
+        return
 
-def _handle_report_output(result: str | dict[str, str]):
+    for key, lines in diagrams:
+        if key == "main":
+            try:
+                sys.stdout.writelines(lines)
+                sys.stdout.flush()
+            except BrokenPipeError:
+                # The reader went away (e.g. `| head`): point stdout at
+                # devnull so the flush at exit doesn't fail again, and stop
+                devnull = os.open(os.devnull, os.O_WRONLY)
+                os.dup2(devnull, sys.stdout.fileno())
+                logger.debug("Stdout closed while writing the diagram.")
+                raise typer.Exit(code=1) from None
+            return
+    logger.warning("OrchestratorV2 returned no 'main' diagram.")
+    typer.echo("Error: Failed to retrieve main diagram content.", err=True)
+    raise typer.Exit(code=1)
+
+
+def _handle_report_output(result: str | dict[str, str] | CombinedResultV2):
     """Handles output for the generate_report command."""
     if isinstance(result, str):
         typer.echo(result.strip())
@@ -130,12 +178,43 @@ def _handle_report_output(result: str | dict[str, str]):
         raise typer.Exit(code=1)
 
 
+def _handle_combined_output(
+    result: str | dict[str, str] | CombinedResultV2,
+    output_dir: Path | None,
+    report_params: ReportGenerationParamsV2 | None,
+    diagram_suffix: str = ".mmd",
+):
+    """Handles output for the generate_combined command."""
+    if not isinstance(result, CombinedResultV2) or output_dir is None:
+        logger.error(
+            "Unexpected output (%s) or missing output directory for "
+            "generate_combined.",
+            type(result).__name__,
+        )
+        typer.echo("Error: Unexpected output format from generator.", err=True)
+        raise typer.Exit(code=1)
+
+    save_diagrams_to_dir(result.diagrams, output_dir, suffix=diagram_suffix)
+    suffix = REPORT_FORMAT_SUFFIXES.get(
+        report_params.output_format if report_params else "text", ".txt"
+    )
+    report_file = output_dir / f"report{suffix}"
+    try:
+        report_file.write_text(result.report, encoding="utf-8")
+    except OSError as io_err:
+        logger.error("Failed to write report file %s: %s", report_file, io_err)
+        typer.echo(f"Error: Could not write file {report_file}", err=True)
+        raise typer.Exit(code=1) from io_err
+    typer.echo(f"Saved report to '{report_file}'", file=sys.stderr)
+
+
 def run_orchestration_v2(
     filepath: Path,
     command: RequestCommand,
     mermaid_params: MermaidGenerationParamsV2 | None = None,
     report_params: ReportGenerationParamsV2 | None = None,
     output_dir: Path | None = None,
+    trusted: bool = False,
 ):
     """
     Handles the core V2 process: load data, build request, run orchestrator.
@@ -145,10 +224,13 @@ def run_orchestration_v2(
 
     Args:
         filepath: Path to the input workflow JSON file.
-        command: The command to execute ('generate_mermaid' or 'generate_report').
+        command: The command to execute ('generate_mermaid', 'generate_report'
+            or 'generate_combined').
         mermaid_params: Parameters for V2 Mermaid generation (if applicable).
         report_params: Parameters for V2 report generation (if applicable).
-        output_dir: Optional directory to save output files to (Mermaid only).
+        output_dir: Optional directory to save output files to (Mermaid only;
+            required for 'generate_combined').
+        trusted: Whether to skip per-node validation of the workflow data.
 
     Raises:
         typer.Exit: On critical errors like file loading or orchestration failure.
@@ -156,60 +238,164 @@ def run_orchestration_v2(
     workflow_data = _load_workflow_data(filepath)
 
     request = _build_analysis_request(
-        workflow_data, command, mermaid_params, report_params
+        workflow_data, command, mermaid_params, report_params, trusted
     )
 
     logger.debug("Calling V2 core process function...")
     try:
-        result: str | dict[str, str] = process_v2(request=request)
+        diagram_suffix = DIAGRAM_FORMAT_SUFFIXES[request.mermaid_params.output_format]
+        if command == "generate_mermaid":
+            diagrams = stream_mermaid_v2(request=request, cache=_NO_CACHE)
+            logger.info("OrchestrationV2 analysis successful, streaming diagrams.")
+            _handle_mermaid_output(diagrams, output_dir, diagram_suffix)
+            return
+
+        result = process_v2(request=request, cache=_NO_CACHE)
         logger.info("OrchestrationV2 successful.")
 
-        if command == "generate_mermaid":
-            _handle_mermaid_output(result, output_dir)
-        elif command == "generate_report":
+        if command == "generate_report":
             _handle_report_output(result)
+        elif command == "generate_combined":
+            _handle_combined_output(
+                result, output_dir, report_params, diagram_suffix
+            )
         else:
             logger.error("Reached unexpected state in V2 output handling.")
             raise typer.Exit(code=1)
 
+    except typer.Exit:
+        raise
+    except OrchestratorErrorV2 as e:
+        _handle_orchestration_error(e, "OrchestrationV2")
+    except Exception as e:
+        _handle_unexpected_error(e, "V2 orchestration")
+
+
+def parse_mermaid_variants(
+    values: list[str], base: MermaidGenerationParamsV2
+) -> list[MermaidGenerationParamsV2]:
+    """
+    Parses the --variant options of the mermaid command.
+
+    Args:
+        values: JSON objects with Mermaid parameters, one per variant.
+        base: The parameters set by the other options, which each variant
+            overrides field by field.
+
+    Returns:
+        The parameters of each variant.
+
+    Raises:
+        typer.Exit: If a value is not a valid JSON parameters object.
+    """
+    defaults = base.model_dump()
+    variants = []
+    for value in values:
+        try:
+            override = json_codec.loads(value)
+            if not isinstance(override, dict):
+                raise ValueError("expected a JSON object")
+            variants.append(
+                MermaidGenerationParamsV2.model_validate({**defaults, **override})
+            )
+        except (ValueError, ValidationError) as e:
+            typer.echo(f"Error: Invalid --variant '{value}': {e}", err=True)
+            raise typer.Exit(code=1) from e
+    return variants
+
+
+def run_mermaid_variants_v2(
+    filepath: Path,
+    targets: list[tuple[Path, MermaidGenerationParamsV2]],
+    trusted: bool = False,
+):
+    """
+    Renders several diagram variants of a workflow from a single analysis.
+
+    Each variant's diagrams are saved to its directory, named as for a
+    single run, with the file suffix of its output format. Variants in
+    different formats may share a directory.
+
+    Args:
+        filepath: Path to the input workflow JSON file.
+        targets: Pairs of (output directory, diagram parameters), one per
+            variant.
+        trusted: Whether to skip per-node validation of the workflow data.
+
+    Raises:
+        typer.Exit: On critical errors like file loading or orchestration failure.
+    """
+    workflow_data = _load_workflow_data(filepath)
+    variants = [params for _, params in targets]
+    request = _build_analysis_request(
+        workflow_data, "generate_mermaid", variants[0], None, trusted
+    )
+    request.mermaid_variants = variants
+
+    try:
+        results = process_mermaid_variants_v2(request=request, cache=_NO_CACHE)
+        logger.info("OrchestrationV2 successful for %d variant(s).", len(results))
+        for (output_dir, params), diagrams in zip(targets, results, strict=True):
+            save_diagrams_to_dir(
+                diagrams,
+                output_dir,
+                suffix=DIAGRAM_FORMAT_SUFFIXES[params.output_format],
+            )
     except OrchestratorErrorV2 as e:
         _handle_orchestration_error(e, "OrchestrationV2")
     except Exception as e:
         _handle_unexpected_error(e, "V2 orchestration")
 
 
-def save_diagrams_to_dir(diagrams: dict[str, str], output_dir: Path):
+def save_diagrams_to_dir(
+    diagrams: Mapping[str, str] | Iterable[tuple[str, Iterable[str]]],
+    output_dir: Path,
+    quiet: bool = False,
+    suffix: str = ".mmd",
+) -> int:
     """
-    Saves multiple Mermaid diagrams to files in a specified directory.
+    Saves multiple diagrams to files in a specified directory.
 
     Uses sanitize_filename helper to create safe filenames from dict keys.
     Ensures directory exists and handles potential write errors.
 
     Args:
         diagrams: Dictionary where keys are identifiers (e.g., "main", sanitized
-            cluster names) and values are Mermaid diagram strings.
+            cluster names) and values are Mermaid diagram strings, or an
+            iterable of (identifier, diagram lines) pairs as returned by
+            stream_mermaid_v2, whose lines are written as they are produced.
         output_dir: The directory Path object to save files into.
+        quiet: Don't report successful saves (errors are still reported).
+        suffix: File suffix of the diagrams' output format (see
+            DIAGRAM_FORMAT_SUFFIXES).
+
+    Returns:
+        The number of diagram files written.
 
     Raises:
         typer.Exit: If the directory cannot be created or files written.
     """
+    items = diagrams.items() if isinstance(diagrams, Mapping) else diagrams
     try:
         output_dir.mkdir(parents=True, exist_ok=True)
         logger.info("Saving output diagrams to directory: %s", output_dir)
         saved_files = 0
         write_errors = 0
 
-        for key, diagram_string in diagrams.items():
-            if not diagram_string or not diagram_string.strip():
+        for key, diagram in items:
+            if isinstance(diagram, str) and not diagram.strip():
                 logger.warning("Skipping empty diagram string for key '%s'.", key)
                 continue
 
             safe_filename_base = sanitize_filename(key, default=f"diagram_{key}")
-            output_file = output_dir / f"{safe_filename_base}.mmd"
+            output_file = output_dir / f"{safe_filename_base}{suffix}"
 
             try:
                 with open(output_file, "w", encoding="utf-8") as f:
-                    f.write(diagram_string)
+                    if isinstance(diagram, str):
+                        f.write(diagram)
+                    else:
+                        f.writelines(diagram)
                 logger.debug("Saved diagram to %s", output_file)
                 saved_files += 1
             except OSError as io_err:
@@ -219,7 +405,9 @@ def save_diagrams_to_dir(diagrams: dict[str, str], output_dir: Path):
                 typer.echo(f"Error: Could not write file {output_file}", err=True)
                 write_errors += 1
 
-        if write_errors == 0 and saved_files > 0:
+        if quiet and write_errors == 0:
+            pass
+        elif write_errors == 0 and saved_files > 0:
             typer.echo(
                 f"Successfully saved {saved_files} diagram(s) to '{output_dir}/'",
                 file=sys.stderr,
@@ -242,6 +430,7 @@ def save_diagrams_to_dir(diagrams: dict[str, str], output_dir: Path):
 
         if write_errors > 0:
             raise typer.Exit(code=1)
+        return saved_files
 
     except Exception as dir_err:
         logger.exception(
@@ -253,3 +442,231 @@ def save_diagrams_to_dir(diagrams: dict[str, str], output_dir: Path):
             err=True,
         )
         raise typer.Exit(code=1) from dir_err
+
+
+def _process_batch_file(
+    source: str,
+    document: bytes,
+    output_path: Path,
+    request_fields: dict[str, Any],
+) -> BatchFileResult:
+    """
+    Processes one workflow document of a batch and writes its output.
+
+    Runs in a worker process, so all failures are returned instead of raised.
+
+    Args:
+        source: Display name of the workflow (file path and archive entry).
+        document: The workflow JSON as bytes.
+        output_path: Directory for diagrams, or file path for a report.
+        request_fields: AnalysisRequestV2 fields other than workflow_data.
+
+    Returns:
+        The BatchFileResult for the workflow.
+    """
+    start = time.perf_counter()
+    outputs = 0
+    error = None
+    try:
+        workflow_data = loaders.parse_workflow(document, keys=WORKFLOW_INPUT_KEYS)
+        request = AnalysisRequestV2.from_workflow(workflow_data, **request_fields)
+        if request.command == "generate_mermaid":
+            outputs = save_diagrams_to_dir(
+                stream_mermaid_v2(request=request, cache=_NO_CACHE),
+                output_path,
+                quiet=True,
+                suffix=DIAGRAM_FORMAT_SUFFIXES[request.mermaid_params.output_format],
+            )
+        else:
+            result = process_v2(request=request, cache=_NO_CACHE)
+            output_path.parent.mkdir(parents=True, exist_ok=True)
+            output_path.write_text(result, encoding="utf-8")
+            outputs = 1
+    except typer.Exit:
+        error = f"Could not write output to {output_path}."
+    except Exception as e:
+        logger.debug("Batch processing of %s failed.", source, exc_info=True)
+        error = str(e) or type(e).__name__
+    return BatchFileResult(source, time.perf_counter() - start, outputs, error)
+
+
+def _strip_json_suffix(path: PurePath) -> PurePath:
+    """
+    Removes a '.json' suffix. Other suffixes are kept, so the outputs of
+    'x.json', 'x.json.gz' and 'x.zip' don't collide.
+    """
+    return path.with_suffix("") if path.suffix.lower() == ".json" else path
+
+
+def _batch_output_path(base: Path, label: str, suffix: str | None) -> Path:
+    """
+    Returns the output path of a workflow document in a batch.
+
+    Args:
+        base: The output path of the input file, without suffix.
+        label: The document's label within the file (see
+            loaders.iter_workflow_documents), e.g. 'team/flows.json[3]'.
+        suffix: The report file suffix, or None for a diagram directory.
+
+    Returns:
+        `base` extended by the archive entry (without '..' parts) and array
+        index.
+    """
+    member, index = label, ""
+    if label.endswith("]"):
+        member, _, index = label[:-1].rpartition("[")
+    if member:
+        parts = _strip_json_suffix(PurePosixPath(member)).parts
+        base = base.joinpath(*(part for part in parts if part not in ("/", "..")))
+    if index:
+        base = base / index
+    return base if suffix is None else base.with_name(base.name + suffix)
+
+
+def _iter_batch_tasks(
+    files: list[Path], input_dir: Path, output_dir: Path, suffix: str | None
+) -> Iterator[tuple[str, bytes, Path] | BatchFileResult]:
+    """
+    Lazily yields (source, document, output path) for every workflow in the
+    files, or a failed BatchFileResult for a file that can't be read.
+    """
+    for filepath in files:
+        base = output_dir / _strip_json_suffix(filepath.relative_to(input_dir))
+        start = time.perf_counter()
+        try:
+            for label, document in loaders.iter_workflow_documents(filepath):
+                source = f"{filepath}:{label}" if label else str(filepath)
+                yield source, document, _batch_output_path(base, label, suffix)
+                start = time.perf_counter()
+        except (ValueError, OSError) as e:
+            logger.error("Could not read workflows from %s: %s", filepath, e)
+            yield BatchFileResult(
+                str(filepath), time.perf_counter() - start, 0, str(e)
+            )
+
+
+def _echo_batch_result(result: BatchFileResult):
+    """Prints the status line of one processed batch file."""
+    status = "ok" if result.error is None else "FAILED"
+    typer.echo(f"{status:<6} {result.seconds:8.3f}s  {result.path}")
+    if result.error is not None:
+        typer.echo(f"       {result.error}", err=True)
+
+
+def run_batch_v2(
+    input_dir: Path,
+    pattern: str,
+    output_dir: Path,
+    command: RequestCommand,
+    mermaid_params: MermaidGenerationParamsV2 | None = None,
+    report_params: ReportGenerationParamsV2 | None = None,
+    jobs: int = 1,
+    trusted: bool = False,
+):
+    """
+    Processes all workflow files matching a pattern, in parallel.
+
+    Matching files are read with loaders.iter_workflow_documents: plain or
+    gzipped JSON holding one workflow or an array of them, and zip or tar
+    archives of such files. Workflows are decoded one at a time as workers
+    become free, so memory stays bounded however large the archives are.
+
+    Output mirrors the input tree: diagrams of `<input_dir>/a/b.json` go to
+    the directory `<output_dir>/a/b/`, a report to `<output_dir>/a/b.<ext>`.
+    Only a '.json' suffix is dropped, so other files keep their full name.
+    Workflows in arrays and archives get one more level: the array index
+    and/or the archive entry's path (e.g. `<output_dir>/a/corpus.zip/x/3/`
+    for element 3 of `x.json` in `a/corpus.zip`). Prints one status line
+    with timing per workflow and a summary.
+
+    Args:
+        input_dir: Directory to search for workflow files.
+        pattern: Glob pattern relative to `input_dir` (e.g. '**/*'). Files
+            without a supported suffix (loaders.WORKFLOW_FILE_SUFFIXES) are
+            ignored.
+        output_dir: Root directory of the mirrored output tree.
+        command: The command to execute ('generate_mermaid' or 'generate_report').
+        mermaid_params: Parameters for V2 Mermaid generation (if applicable).
+        report_params: Parameters for V2 report generation (if applicable).
+        jobs: Number of worker processes (1 processes workflows in this process).
+        trusted: Whether to skip per-node validation of the workflow data.
+
+    Raises:
+        typer.Exit: If no files match or any workflow failed.
+    """
+    files = sorted(
+        path
+        for path in input_dir.glob(pattern)
+        if path.is_file() and loaders.is_workflow_file(path)
+    )
+    if not files:
+        typer.echo(
+            f"Error: No workflow files match '{pattern}' in {input_dir}", err=True
+        )
+        raise typer.Exit(code=1)
+
+    request_fields: dict[str, Any] = {
+        "command": command,
+        "mermaid_params": mermaid_params or MermaidGenerationParamsV2(),
+        "report_params": report_params,
+        "trusted_input": trusted,
+    }
+    suffix = None
+    if command != "generate_mermaid":
+        suffix = REPORT_FORMAT_SUFFIXES.get(
+            report_params.output_format if report_params else "text", ".txt"
+        )
+    tasks = _iter_batch_tasks(files, input_dir, output_dir, suffix)
+
+    jobs = max(1, jobs)
+    logger.info("Batch processing %d file(s) with %d job(s).", len(files), jobs)
+    start = time.perf_counter()
+    results: list[BatchFileResult] = []
+
+    def record(result: BatchFileResult):
+        results.append(result)
+        _echo_batch_result(result)
+
+    if jobs == 1:
+        for task in tasks:
+            if isinstance(task, BatchFileResult):
+                record(task)
+            else:
+                record(_process_batch_file(*task, request_fields))
+    else:
+        executor = ProcessPoolExecutor(max_workers=jobs)
+        pending: set[Future] = set()
+        try:
+            for task in tasks:
+                if isinstance(task, BatchFileResult):
+                    record(task)
+                    continue
+                # Keep a bounded number of decoded workflows queued
+                if len(pending) >= 2 * jobs:
+                    done, pending = wait(pending, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        record(future.result())
+                pending.add(
+                    executor.submit(_process_batch_file, *task, request_fields)
+                )
+            for future in as_completed(pending):
+                record(future.result())
+        finally:
+            executor.shutdown(cancel_futures=True)
+    elapsed = time.perf_counter() - start
+
+    failed = [result for result in results if result.error is not None]
+    typer.echo(
+        f"Processed {len(results)} workflow(s) in {elapsed:.2f}s with {jobs} "
+        f"job(s): {len(results) - len(failed)} succeeded, {len(failed)} failed."
+    )
+    slowest = sorted(results, key=lambda result: result.seconds, reverse=True)[:5]
+    typer.echo(
+        "Slowest: "
+        + ", ".join(f"{Path(r.path).name} ({r.seconds:.2f}s)" for r in slowest)
+    )
+    if failed:
+        typer.echo("Failed workflows:", err=True)
+        for result in failed:
+            typer.echo(f"  {result.path}: {result.error}", err=True)
+        raise typer.Exit(code=1)
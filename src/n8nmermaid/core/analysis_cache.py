@@ -0,0 +1,222 @@
+# src/n8nmermaid/core/analysis_cache.py
+"""
+Content-addressed LRU cache for V2 workflow analyses.
+
+Analyses are keyed by a hash of the workflow's canonical JSON content, the
+analyzer version and whether the input was trusted, so the same workflow
+requested for a diagram and then for several reports is analyzed only once.
+A cached analysis that lacks phases needed by a later request is completed
+on a copy, which then replaces it: graphs already handed out are never
+changed.
+"""
+
+import hashlib
+import logging
+import threading
+from collections import OrderedDict
+from collections.abc import Iterable
+from typing import Any
+
+from n8nmermaid.core.analyzer_v2 import (
+    AnalysisField,
+    WorkflowAnalyzerV2,
+    WorkflowGraph,
+)
+from n8nmermaid.core.analyzer_v2.constants import ANALYZER_VERSION
+from n8nmermaid.core.analyzer_v2.planner import plan_phases
+from n8nmermaid.utils import json_codec
+from n8nmermaid.utils.env import env_int
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CACHE_MAX_ENTRIES = 128
+DEFAULT_CACHE_MAX_MB = 256
+
+
+def workflow_cache_key(
+    workflow_data: dict[str, Any], trusted: bool = False
+) -> tuple[str, int]:
+    """
+    Computes the content hash of a workflow for cache lookups.
+
+    Args:
+        workflow_data: The raw n8n workflow structure as a dictionary.
+        trusted: Whether the workflow is analyzed as trusted input.
+
+    Returns:
+        A tuple of (hex digest, size in bytes of the canonical JSON), the
+        latter serving as the entry's approximate size.
+    """
+    canonical = json_codec.dumps_bytes(workflow_data, sort_keys=True, default=str)
+    digest = hashlib.blake2b(canonical, digest_size=20)
+    digest.update(ANALYZER_VERSION.encode("utf-8"))
+    if trusted:
+        digest.update(b"trusted")
+    return digest.hexdigest(), len(canonical)
+
+
+class _CacheEntry:
+    """A cached analysis graph with its approximate size."""
+
+    __slots__ = ("graph", "size", "lock")
+
+    def __init__(self, graph: WorkflowGraph, size: int):
+        self.graph = graph
+        self.size = size
+        self.lock = threading.Lock()
+
+
+class AnalysisCache:
+    """
+    Thread-safe LRU cache of WorkflowGraph analyses.
+
+    Bounded by entry count and by approximate size (the canonical JSON size
+    of the cached workflows). Cached graphs keep references to the request's
+    workflow dict, which must not be mutated afterwards.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = DEFAULT_CACHE_MAX_ENTRIES,
+        max_bytes: int = DEFAULT_CACHE_MAX_MB * 1024 * 1024,
+    ):
+        """
+        Initializes the cache.
+
+        Args:
+            max_entries: Maximum number of cached analyses (0 disables caching).
+            max_bytes: Maximum total approximate size of cached analyses.
+        """
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        self._entries: OrderedDict[str, _CacheEntry] = OrderedDict()
+        self._lock = threading.Lock()
+        self.total_bytes = 0
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+
+    @property
+    def enabled(self) -> bool:
+        """True if the cache may hold any entry."""
+        return self.max_entries > 0 and self.max_bytes > 0
+
+    def analyze(
+        self,
+        workflow_data: dict[str, Any],
+        fields: Iterable[AnalysisField] | None = None,
+        trusted: bool = False,
+    ) -> WorkflowGraph:
+        """
+        Returns the analysis of a workflow, from the cache when possible.
+
+        Trusted and validated analyses of the same content are cached
+        separately, as they can differ for input that isn't well-formed.
+
+        Args:
+            workflow_data: The raw n8n workflow structure as a dictionary.
+            fields: The analysis fields the caller needs, or None for all.
+            trusted: Skip Phase 1 per-field validation for known-good input.
+
+        Returns:
+            The WorkflowGraph, populated at least for the requested fields.
+        """
+        if not self.enabled:
+            return WorkflowAnalyzerV2(workflow_data, trusted).analyze_graph(fields)
+
+        key, size = workflow_cache_key(workflow_data, trusted)
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+
+        if entry is not None:
+            logger.debug("Analysis cache hit for workflow %s.", key[:12])
+            with entry.lock:
+                graph = entry.graph
+                if not plan_phases(fields, completed=graph.completed_phases):
+                    return graph
+                # Other callers may be reading the cached graph
+                analyzer = WorkflowAnalyzerV2(workflow_data, trusted)
+                analyzer.graph = graph.copy()
+                entry.graph = analyzer.analyze_graph(fields)
+                return entry.graph
+
+        logger.debug("Analysis cache miss for workflow %s.", key[:12])
+        graph = WorkflowAnalyzerV2(workflow_data, trusted).analyze_graph(fields)
+        if size <= self.max_bytes:
+            self._store(key, _CacheEntry(graph, size))
+        return graph
+
+    def _store(self, key: str, entry: _CacheEntry) -> None:
+        """Inserts an entry and evicts least recently used ones over the bounds."""
+        with self._lock:
+            previous = self._entries.pop(key, None)
+            if previous is not None:
+                self.total_bytes -= previous.size
+            self._entries[key] = entry
+            self.total_bytes += entry.size
+            while self._entries and (
+                len(self._entries) > self.max_entries
+                or self.total_bytes > self.max_bytes
+            ):
+                _, evicted = self._entries.popitem(last=False)
+                self.total_bytes -= evicted.size
+                self.evictions += 1
+
+    def clear(self) -> None:
+        """Removes all entries (counters are kept)."""
+        with self._lock:
+            self._entries.clear()
+            self.total_bytes = 0
+
+    def stats(self) -> dict[str, int]:
+        """
+        Returns the cache counters.
+
+        Returns:
+            A dictionary with entries, bytes, hits, misses and evictions.
+        """
+        with self._lock:
+            return {
+                "entries": len(self._entries),
+                "bytes": self.total_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+            }
+
+
+_analysis_cache: AnalysisCache | None = None
+_analysis_cache_lock = threading.Lock()
+
+
+def get_analysis_cache() -> AnalysisCache:
+    """
+    Returns the process-wide analysis cache, creating it on first use.
+
+    Reads N8NMERMAID_ANALYSIS_CACHE_ENTRIES (default 128, 0 disables the
+    cache) and N8NMERMAID_ANALYSIS_CACHE_MAX_MB (default 256) from the
+    environment.
+
+    Returns:
+        The shared AnalysisCache instance.
+    """
+    global _analysis_cache
+    if _analysis_cache is None:
+        with _analysis_cache_lock:
+            if _analysis_cache is None:
+                _analysis_cache = AnalysisCache(
+                    max_entries=env_int(
+                        "N8NMERMAID_ANALYSIS_CACHE_ENTRIES", DEFAULT_CACHE_MAX_ENTRIES
+                    ),
+                    max_bytes=env_int(
+                        "N8NMERMAID_ANALYSIS_CACHE_MAX_MB", DEFAULT_CACHE_MAX_MB
+                    )
+                    * 1024
+                    * 1024,
+                )
+    return _analysis_cache
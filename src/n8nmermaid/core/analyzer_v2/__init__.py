@@ -4,8 +4,19 @@ Workflow analysis module (V2). Processes raw n8n JSON into structured analysis r
 """
 
 import logging
+from collections.abc import Iterable
 from typing import Any
 
+from .diagnostics import AnalysisWarning, WarningCollector
+from .graph import (
+    CredentialRef,
+    EdgeRecord,
+    GraphIndex,
+    NodeRecord,
+    WorkflowGraph,
+    as_workflow_graph,
+)
+from .incremental import analyze_incremental
 from .models import WorkflowAnalysisV2
 from .phase_1_initial_parse import parse_initial_nodes
 from .phase_2_connection_mapping import map_connections
@@ -13,6 +24,7 @@ from .phase_3_cluster_analysis import analyze_clusters
 from .phase_4_node_classification import classify_nodes
 from .phase_5_parameter_extraction import extract_parameters
 from .phase_6_parameter_categorization import categorize_parameters
+from .planner import AnalysisField, plan_phases
 
 logger = logging.getLogger(__name__)
 
@@ -22,78 +34,154 @@ class WorkflowAnalyzerV2:
     Orchestrates the V2 analysis of n8n workflow data.
 
     Takes raw workflow JSON (as dict) and runs analysis phases sequentially
-    to produce a WorkflowAnalysisV2 object.
+    over a compact WorkflowGraph. The Pydantic WorkflowAnalysisV2 view is
+    materialized from the graph only when requested.
     """
 
-    def __init__(self, workflow_data: dict[str, Any]):
+    def __init__(self, workflow_data: dict[str, Any], trusted: bool = False):
         """
         Initializes the V2 analyzer.
 
         Args:
             workflow_data: The raw n8n workflow structure as a dictionary.
+            trusted: Whether the workflow data is known-good, letting Phase 1
+                skip per-field validation (see parse_initial_nodes).
         """
         if not isinstance(workflow_data, dict):
             raise TypeError("WorkflowAnalyzerV2 requires workflow_data as a dict.")
         self.raw_workflow_data = workflow_data
-        self.analysis_result = WorkflowAnalysisV2()
+        self.trusted = trusted
+        self.graph = WorkflowGraph()
 
     def analyze(self) -> WorkflowAnalysisV2:
         """
-        Performs the full V2 workflow analysis sequence.
-
-        Runs phases for initial parsing, connection mapping, cluster analysis,
-        node classification, parameter extraction, and parameter categorization.
+        Performs the full V2 workflow analysis and returns the Pydantic view.
 
         Returns:
             The completed WorkflowAnalysisV2 object.
         """
-        logger.info("Starting V2 workflow analysis...")
-        all_warnings: list[str] = []
+        return self.analyze_graph().to_analysis()
 
-        logger.info("Running Phase 1: Initial Node Parsing...")
-        name_to_id, phase1_warnings = parse_initial_nodes(
-            self.raw_workflow_data, self.analysis_result
-        )
-        all_warnings.extend(phase1_warnings)
+    def analyze_graph(
+        self, fields: Iterable[AnalysisField] | None = None
+    ) -> WorkflowGraph:
+        """
+        Performs the V2 workflow analysis sequence.
 
-        if not self.analysis_result.nodes:
-            logger.error("Phase 1 resulted in no valid nodes. Aborting analysis.")
-            self.analysis_result.analysis_warnings = all_warnings
-            return self.analysis_result
+        Runs phases for initial parsing, connection mapping, cluster analysis,
+        node classification, parameter extraction, and parameter categorization.
+        When `fields` is given, only the phases needed to populate those fields
+        run. Calling again with more fields resumes the analysis, running just
+        the phases that are still missing.
 
-        nodes_dict = self.analysis_result.nodes
-        raw_connections = self.raw_workflow_data.get("connections", {})
+        Args:
+            fields: The analysis fields the caller needs, or None for all.
 
-        logger.info("Running Phase 2: Detailed Connection Mapping...")
-        phase2_warnings = map_connections(nodes_dict, name_to_id, raw_connections)
-        all_warnings.extend(phase2_warnings)
+        Returns:
+            The WorkflowGraph, populated at least for the requested fields.
+        """
+        phases = plan_phases(fields, completed=self.graph.completed_phases)
+        if not phases:
+            return self.graph
+
+        logger.info("Starting V2 workflow analysis (phases %s)...", phases)
+        new_warnings = WarningCollector()
+        for phase in phases:
+            if phase > 1 and not self.graph.nodes:
+                logger.error("Phase 1 resulted in no valid nodes. Aborting analysis.")
+                break
+            phase_warnings = self.run_phase(phase)
+            self.graph.phase_warnings.setdefault(phase, WarningCollector()).extend(
+                phase_warnings
+            )
+            new_warnings.extend(phase_warnings)
+            self.graph.completed_phases.add(phase)
+
+        self._finish(new_warnings)
+        return self.graph
+
+    def analyze_incremental(
+        self,
+        previous: WorkflowGraph | WorkflowAnalysisV2,
+        fields: Iterable[AnalysisField] | None = None,
+    ) -> WorkflowGraph:
+        """
+        Re-analyzes the workflow, reusing results of a previous analysis.
 
-        logger.info("Running Phase 3: Cluster Analysis...")
-        phase3_warnings = analyze_clusters(nodes_dict)
-        all_warnings.extend(phase3_warnings)
+        Only nodes affected by changes since `previous` (added or edited nodes,
+        changed connections and the clusters they touch) are recomputed. Falls
+        back to a full run when the change touches too much of the graph.
 
-        logger.info("Running Phase 4: Node Classification...")
-        phase4_warnings = classify_nodes(nodes_dict)
-        all_warnings.extend(phase4_warnings)
+        Args:
+            previous: The analysis of an earlier version of this workflow.
+            fields: The analysis fields the caller needs, or None for all.
 
-        logger.info("Running Phase 5: Generic Parameter Extraction...")
-        phase5_warnings = extract_parameters(nodes_dict)
-        all_warnings.extend(phase5_warnings)
+        Returns:
+            The WorkflowGraph for the current workflow data.
+        """
+        return analyze_incremental(self, as_workflow_graph(previous), fields)
 
-        logger.info("Running Phase 6: Parameter Categorization...")
-        phase6_warnings = categorize_parameters(nodes_dict)
-        all_warnings.extend(phase6_warnings)
+    def run_phase(
+        self, phase: int, nodes: dict[str, NodeRecord] | None = None
+    ) -> WarningCollector:
+        """
+        Runs a single analysis phase.
 
-        self.analysis_result.analysis_warnings = all_warnings
-        logger.info(
-            "V2 Workflow analysis complete. Found %d warnings.", len(all_warnings)
-        )
-        if all_warnings:
-            logger.warning("Analysis completed with warnings:")
-            for warning in all_warnings:
-                logger.warning("  - %s", warning)
+        Args:
+            phase: The phase number (1-6).
+            nodes: Optional subset of graph nodes to run phases 3-6 on.
 
-        return self.analysis_result
+        Returns:
+            The warnings generated by the phase.
+        """
+        nodes_dict = self.graph.nodes if nodes is None else nodes
+        match phase:
+            case 1:
+                logger.info("Running Phase 1: Initial Node Parsing...")
+                self.graph.name_to_id, warnings = parse_initial_nodes(
+                    self.raw_workflow_data, self.graph, trusted=self.trusted
+                )
+                return warnings
+            case 2:
+                logger.info("Running Phase 2: Detailed Connection Mapping...")
+                raw_connections = self.raw_workflow_data.get("connections", {})
+                return map_connections(
+                    nodes_dict, self.graph.name_to_id, raw_connections
+                )
+            case 3:
+                logger.info("Running Phase 3: Cluster Analysis...")
+                return analyze_clusters(nodes_dict)
+            case 4:
+                logger.info("Running Phase 4: Node Classification...")
+                return classify_nodes(nodes_dict)
+            case 5:
+                logger.info("Running Phase 5: Generic Parameter Extraction...")
+                return extract_parameters(nodes_dict)
+            case 6:
+                logger.info("Running Phase 6: Parameter Categorization...")
+                return categorize_parameters(nodes_dict)
+            case _:
+                raise ValueError(f"Unknown analysis phase: {phase}")
+
+    def _finish(self, new_warnings: WarningCollector) -> None:
+        """Records warnings of a completed run and drops the cached views."""
+        # Keep warnings in phase order, also when phases ran in separate calls
+        warnings = WarningCollector()
+        for phase in sorted(self.graph.phase_warnings):
+            warnings.extend(self.graph.phase_warnings[phase])
+        self.graph.warnings = warnings
+        self.graph.reset_views()
+        logger.info("V2 Workflow analysis complete. Found %d warnings.", len(warnings))
+        if new_warnings:
+            logger.warning(
+                "Analysis completed with warnings: %s",
+                ", ".join(
+                    f"{code} x{count}" for code, count in new_warnings.counts.items()
+                ),
+            )
+            if logger.isEnabledFor(logging.DEBUG):
+                for message in new_warnings.messages():
+                    logger.debug("  - %s", message)
 
 
 def analyze_workflow_v2(workflow_data: dict[str, Any]) -> WorkflowAnalysisV2:
@@ -118,3 +206,49 @@ def analyze_workflow_v2(workflow_data: dict[str, Any]) -> WorkflowAnalysisV2:
     except Exception as e:
         logger.exception("Critical error during V2 workflow analysis.")
         raise e
+
+
+def analyze_workflow_graph_v2(
+    workflow_data: dict[str, Any],
+    fields: Iterable[AnalysisField] | None = None,
+    trusted: bool = False,
+) -> WorkflowGraph:
+    """
+    Functional entry point returning the compact graph form of the analysis.
+
+    Args:
+        workflow_data: The raw n8n workflow structure as a dictionary.
+        fields: Optional analysis fields to limit which phases run.
+        trusted: Skip Phase 1 per-field validation for known-good input.
+
+    Returns:
+        The completed WorkflowGraph.
+
+    Raises:
+        TypeError: If workflow_data is not a dictionary.
+        Exception: For any unexpected errors during analysis.
+    """
+    try:
+        analyzer = WorkflowAnalyzerV2(workflow_data=workflow_data, trusted=trusted)
+        return analyzer.analyze_graph(fields)
+    except Exception as e:
+        logger.exception("Critical error during V2 workflow analysis.")
+        raise e
+
+
+__all__ = [
+    "WorkflowAnalyzerV2",
+    "WorkflowAnalysisV2",
+    "WorkflowGraph",
+    "NodeRecord",
+    "EdgeRecord",
+    "CredentialRef",
+    "GraphIndex",
+    "analyze_workflow_v2",
+    "analyze_workflow_graph_v2",
+    "as_workflow_graph",
+    "AnalysisField",
+    "plan_phases",
+    "AnalysisWarning",
+    "WarningCollector",
+]
@@ -3,6 +3,9 @@
 
 from typing import Literal
 
+# Bump whenever analysis results change, so cached analyses are not reused
+ANALYZER_VERSION = "2.2"
+
 N8nConnectionLiteral = Literal[
     "ai_agent",
     "ai_chain",
@@ -18,9 +21,91 @@ N8nConnectionLiteral = Literal[
     "main",
 ]
 
+# Connection type of the regular data flow; every other type is an AI/cluster link
+MAIN_CONNECTION_TYPE = "main"
+
+# Top-level workflow keys the analyzer reads (Phase 1 metadata, nodes and
+# connections); loaders may skip all others, such as 'pinData' or 'staticData'
+WORKFLOW_INPUT_KEYS = frozenset(
+    {"name", "id", "versionId", "tags", "nodes", "connections"}
+)
+
 # Node type for Sticky Notes
 STICKY_NODE_TYPE = "n8n-nodes-base.stickyNote"
 
+# Limits for parameter flattening in Phase 5 (per node)
+PARAM_FLATTEN_MAX_DEPTH = 64
+PARAM_FLATTEN_MAX_ENTRIES = 10_000
+
+# Incremental re-analysis falls back to a full run above this share of
+# added, removed, edited or rewired nodes
+INCREMENTAL_MAX_CHANGED_FRACTION = 0.3
+
+# Message templates of analysis warnings, keyed by warning code. Templates are
+# filled with the warning's positional args (str.format) only on output.
+WARNING_TEMPLATES: dict[str, str] = {
+    # Phase 1
+    "nodes_not_list": "Workflow 'nodes' data is not a list (found {0}). "
+    "Treating as empty.",
+    "node_not_dict": "Skipping non-dictionary item in nodes list at index {0}.",
+    "node_invalid_id": "Node '{0}' (index {1}) missing or invalid 'id'. Skipping.",
+    "node_invalid_type": "Node '{0}' (ID: {1}) missing or invalid 'type'. Skipping.",
+    "duplicate_node_id": "Duplicate node ID '{0}' found for node '{1}'. "
+    "Skipping duplicate.",
+    "duplicate_node_name": "Duplicate node name '{0}'. Connections will use "
+    "first encountered ID: {1}.",
+    "default_name_conflict": "Default node name '{0}' conflicted, renaming to "
+    "'{1}' for internal mapping.",
+    "credentials_not_dict": "Node '{0}' (ID: {1}): Credentials field is not a "
+    "dictionary, skipping credential parsing.",
+    "credential_invalid": "Node '{0}' (ID: {1}): Validation error parsing "
+    "credential type '{2}': {3}",
+    "credential_not_dict": "Node '{0}' (ID: {1}): Unexpected format for "
+    "credential type '{2}', expected dict.",
+    "node_invalid": "Validation error creating node record for '{0}' "
+    "(ID: {1}): {2}. Skipping.",
+    # Phase 2
+    "connections_not_dict": "Workflow 'connections' data is not a dict "
+    "(found {0}). Skipping connection analysis.",
+    "missing_source_node": "Skipping connection involving source node '{0}': "
+    "Node not found/valid (check name, duplicates, or earlier errors).",
+    "source_connections_not_dict": "Connections data for source node '{0}' "
+    "(ID: {1}) is not a dict. Skipping.",
+    "unknown_connection_type": "Unknown connection type '{0}' from node '{1}'. "
+    "Skipping.",
+    "connection_ports_not_list": "Connection type '{0}' from '{1}' expected "
+    "list, got {2}. Skipping.",
+    "connection_target_not_dict": "Connection target from '{0}' (port {1}, "
+    "type {2}) is not a dictionary. Skipping.",
+    "connection_missing_target": "Connection from '{0}' (port {1}, type {2}) "
+    "missing target node name. Skipping.",
+    "missing_target_node": "Connection from '{0}': Skipping connection "
+    "involving target node '{1}': Node not found/valid (check name, "
+    "duplicates, or earlier errors).",
+    "connection_issues": "{0} connection issues found during mapping "
+    "(see logs/previous warnings).",
+    # Phase 4
+    "clustered_without_role": "Node {0} is clustered but has no role assigned.",
+    "unknown_classification": "Found {0} nodes with Unknown classification: {1}",
+    # Phase 5
+    "parameters_too_deep": "Node {0} ('{1}') has parameters nested deeper than "
+    "{2} levels. Deeper values were skipped.",
+    "parameters_truncated": "Node {0} ('{1}') has more than {2} parameters. "
+    "Extraction was truncated.",
+    "parameters_not_dict": "Node {0} ('{1}') has non-dict raw_parameters type: "
+    "{2}. Skipping extraction.",
+    "parameter_extraction_error": "Error flattening parameters for node {0} "
+    "('{1}'): {2}",
+    # Pre-formatted message, e.g. restored from a serialized analysis
+    "message": "{0}",
+}
+
+# Distinct warnings kept per code; further ones are only counted
+WARNINGS_MAX_PER_CODE = 50
+
+# Appended to the warning messages for each code that exceeded the cap
+WARNINGS_SUPPRESSED_TEMPLATE = "... and {0} more '{1}' warning(s) suppressed."
+
 # Parameter Categories for Phase 6
 PARAM_CATEGORIES: dict[str, list[str]] = {
     "database": ["query", "sql", "table", "database", "postgres", "mysql", "db"],
@@ -45,3 +130,6 @@ PARAM_CATEGORIES: dict[str, list[str]] = {
     "control_flow": ["if", "switch", "router", "loop", "wait"],
     "credentials": ["credential", "auth", "token", "key", "secret"],
 }
+
+# Max number of parameter keys whose category is memoized across workflows
+PARAM_CATEGORY_CACHE_SIZE = 8192
@@ -0,0 +1,173 @@
+# filename: src/n8nmermaid/core/analyzer_v2/diagnostics.py
+"""
+Structured analysis warnings.
+
+Phases record warnings as (code, node ID, args) records instead of formatted
+strings. A WarningCollector deduplicates them, keeps at most a fixed number
+per code and only counts the rest, so broken workflows with thousands of
+dangling connections stay cheap to diagnose. Messages are formatted from the
+templates in `constants.WARNING_TEMPLATES` only when they are output.
+"""
+
+from collections.abc import Hashable, Iterator
+from typing import Any
+
+from .constants import (
+    WARNING_TEMPLATES,
+    WARNINGS_MAX_PER_CODE,
+    WARNINGS_SUPPRESSED_TEMPLATE,
+)
+
+
+class AnalysisWarning:
+    """A single analysis warning, formatted lazily from its code's template."""
+
+    __slots__ = ("code", "node_id", "args")
+
+    def __init__(
+        self, code: str, args: tuple[Any, ...] = (), node_id: str | None = None
+    ):
+        if code not in WARNING_TEMPLATES:
+            raise ValueError(f"Unknown analysis warning code: '{code}'")
+        self.code = code
+        self.args = args
+        self.node_id = node_id
+
+    @property
+    def message(self) -> str:
+        """The human-readable warning message."""
+        return WARNING_TEMPLATES[self.code].format(*self.args)
+
+    def key(self) -> Hashable:
+        """Identity used for deduplication (the record itself if unhashable)."""
+        key = (self.code, self.node_id, self.args)
+        try:
+            hash(key)
+        except TypeError:
+            return id(self)
+        return key
+
+    def __str__(self) -> str:
+        return self.message
+
+    def __repr__(self) -> str:
+        return (
+            f"AnalysisWarning(code={self.code!r}, node_id={self.node_id!r}, "
+            f"args={self.args!r})"
+        )
+
+
+class WarningCollector:
+    """
+    Collects analysis warnings, deduplicated and capped per code.
+
+    The first `max_per_code` distinct warnings of each code are kept as
+    records; later ones only increase the code's count. Counts therefore
+    include every kept warning plus all suppressed ones (which are not
+    deduplicated, to keep memory bounded).
+    """
+
+    __slots__ = ("max_per_code", "records", "counts", "_kept", "_seen", "_messages")
+
+    def __init__(self, max_per_code: int | None = WARNINGS_MAX_PER_CODE):
+        """
+        Initializes an empty collector.
+
+        Args:
+            max_per_code: Distinct warnings kept per code, or None for no cap.
+        """
+        self.max_per_code = max_per_code
+        self.records: list[AnalysisWarning] = []
+        self.counts: dict[str, int] = {}
+        self._kept: dict[str, int] = {}
+        self._seen: set[Hashable] = set()
+        self._messages: list[str] | None = None
+
+    def add(self, code: str, *args: Any, node_id: str | None = None) -> None:
+        """
+        Records a warning.
+
+        Args:
+            code: The warning code (a key of WARNING_TEMPLATES).
+            *args: Values for the code's message template.
+            node_id: The ID of the node the warning is about, if any.
+        """
+        self.add_record(AnalysisWarning(code, args, node_id))
+
+    def add_record(self, record: AnalysisWarning) -> None:
+        """Records an existing AnalysisWarning."""
+        code = record.code
+        kept = self._kept.get(code, 0)
+        if self.max_per_code is None or kept < self.max_per_code:
+            key = record.key()
+            if key in self._seen:
+                return
+            self._seen.add(key)
+            self.records.append(record)
+            self._kept[code] = kept + 1
+        self.counts[code] = self.counts.get(code, 0) + 1
+        self._messages = None
+
+    def extend(self, other: "WarningCollector") -> None:
+        """
+        Merges another collector's warnings into this one.
+
+        Args:
+            other: The collector to merge, including its suppressed counts.
+        """
+        for record in other.records:
+            self.add_record(record)
+        for code, suppressed in other.suppressed.items():
+            self.counts[code] = self.counts.get(code, 0) + suppressed
+        self._messages = None
+
+    @property
+    def suppressed(self) -> dict[str, int]:
+        """Number of warnings per code that were counted but not kept."""
+        return {
+            code: count - self._kept.get(code, 0)
+            for code, count in self.counts.items()
+            if count > self._kept.get(code, 0)
+        }
+
+    def messages(self) -> list[str]:
+        """
+        Formats the kept warnings, followed by one line per capped code.
+
+        Returns:
+            The warning messages (cached until the next change).
+        """
+        if self._messages is None:
+            messages = [record.message for record in self.records]
+            messages.extend(
+                WARNINGS_SUPPRESSED_TEMPLATE.format(count, code)
+                for code, count in self.suppressed.items()
+            )
+            self._messages = messages
+        return self._messages
+
+    def __len__(self) -> int:
+        return sum(self.counts.values())
+
+    def __bool__(self) -> bool:
+        return bool(self.counts)
+
+    def __iter__(self) -> Iterator[AnalysisWarning]:
+        return iter(self.records)
+
+    @classmethod
+    def from_messages(cls, messages: list[str]) -> "WarningCollector":
+        """
+        Wraps already formatted messages, e.g. of a deserialized analysis.
+
+        Args:
+            messages: The warning messages to keep, in order.
+
+        Returns:
+            An uncapped collector holding one 'message' record per message.
+        """
+        collector = cls(max_per_code=None)
+        collector.records = [AnalysisWarning("message", (m,)) for m in messages]
+        collector.counts = {"message": len(messages)} if messages else {}
+        collector._kept = dict(collector.counts)
+        return collector
@@ -0,0 +1,631 @@
+# filename: src/n8nmermaid/core/analyzer_v2/graph.py
+"""
+Compact internal graph store used by the V2 analysis phases.
+
+Nodes and connections are held in plain `__slots__` records instead of nested
+Pydantic models. The Pydantic `WorkflowAnalysisV2` view is only materialized
+when a caller asks for it via `WorkflowGraph.to_analysis()`.
+"""
+
+import hashlib
+from typing import Any
+
+from n8nmermaid.utils import json_codec
+
+from .constants import MAIN_CONNECTION_TYPE
+from .diagnostics import WarningCollector
+from .models import (
+    AnalyzedNodeV2,
+    ClusterInfoV2,
+    ClusterRole,
+    ConnectionDetail,
+    CredentialsV2,
+    NodeClassificationV2,
+    NodeConnectivityV2,
+    NodeCredentialDetailV2,
+    NodeGroupType,
+    WorkflowAnalysisV2,
+)
+from .planner import ALL_PHASES
+
+
+class EdgeRecord:
+    """A single mapped connection between two nodes."""
+
+    __slots__ = (
+        "source_node_id",
+        "source_port_index",
+        "target_node_id",
+        "target_port_name",
+        "connection_type",
+    )
+
+    def __init__(
+        self,
+        source_node_id: str,
+        source_port_index: int,
+        target_node_id: str,
+        target_port_name: str,
+        connection_type: str,
+    ):
+        self.source_node_id = source_node_id
+        self.source_port_index = source_port_index
+        self.target_node_id = target_node_id
+        self.target_port_name = target_port_name
+        self.connection_type = connection_type
+
+    @property
+    def source_port_name(self) -> str:
+        """Port name on the source node, e.g. "main_0" or "ai_tool_0"."""
+        return f"{self.connection_type}_{self.source_port_index}"
+
+    def to_model(self) -> ConnectionDetail:
+        """Builds the Pydantic ConnectionDetail view of this edge."""
+        return ConnectionDetail.model_construct(
+            source_node_id=self.source_node_id,
+            source_port_name=self.source_port_name,
+            target_node_id=self.target_node_id,
+            target_port_name=self.target_port_name,
+            connection_type=self.connection_type,
+        )
+
+
+class CredentialRef:
+    """Reference to a credential configured on a node."""
+
+    __slots__ = ("id", "name")
+
+    def __init__(self, id: str | None = None, name: str | None = None):
+        self.id = id
+        self.name = name
+
+
+class NodeRecord:
+    """Analyzed information for a single node, stored as flat slots."""
+
+    __slots__ = (
+        "id",
+        "name",
+        "type",
+        "type_version",
+        "position",
+        "is_disabled",
+        "notes",
+        "raw_parameters",
+        "extracted_parameters",
+        "incoming",
+        "outgoing",
+        "incoming_by_type",
+        "outgoing_by_type",
+        "main_in_degree",
+        "main_out_degree",
+        "main_output_port_mask",
+        "non_main_degree",
+        "group_type",
+        "is_end_node",
+        "cluster_root_id",
+        "cluster_role",
+        "has_credentials",
+        "credentials",
+        "parameter_categories",
+        "_fingerprint",
+    )
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        type: str,
+        type_version: float | None = None,
+        position: list[float] | None = None,
+        is_disabled: bool = False,
+        notes: str | None = None,
+        raw_parameters: dict[str, Any] | None = None,
+        has_credentials: bool = False,
+        credentials: dict[str, CredentialRef] | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.type = type
+        self.type_version = type_version
+        self.position = position
+        self.is_disabled = is_disabled
+        self.notes = notes
+        self.raw_parameters = raw_parameters if raw_parameters is not None else {}
+        self.extracted_parameters: dict[str, Any] = {}
+        self.incoming: list[EdgeRecord] = []
+        self.outgoing: list[EdgeRecord] = []
+        self.incoming_by_type: dict[str, list[EdgeRecord]] = {}
+        self.outgoing_by_type: dict[str, list[EdgeRecord]] = {}
+        self.main_in_degree = 0
+        self.main_out_degree = 0
+        self.main_output_port_mask = 0
+        self.non_main_degree = 0
+        self.group_type = NodeGroupType.UNKNOWN
+        self.is_end_node = False
+        self.cluster_root_id: str | None = None
+        self.cluster_role: ClusterRole | None = None
+        self.has_credentials = has_credentials
+        self.credentials = credentials if credentials is not None else {}
+        self.parameter_categories: dict[str, list[str]] = {}
+        self._fingerprint: bytes | None = None
+
+    def copy(self) -> "NodeRecord":
+        """
+        Returns a copy that analysis phases can update independently.
+
+        The edge lists and indexes (which Phase 2 appends to) are copied;
+        edges, parameters and other values are shared, as phases replace
+        them rather than changing them in place.
+        """
+        record = NodeRecord.__new__(NodeRecord)
+        for slot in NodeRecord.__slots__:
+            setattr(record, slot, getattr(self, slot))
+        record.incoming = list(self.incoming)
+        record.outgoing = list(self.outgoing)
+        record.incoming_by_type = {
+            conn_type: list(edges) for conn_type, edges in self.incoming_by_type.items()
+        }
+        record.outgoing_by_type = {
+            conn_type: list(edges) for conn_type, edges in self.outgoing_by_type.items()
+        }
+        return record
+
+    @property
+    def has_fingerprint(self) -> bool:
+        """True if fingerprint() was already taken (and is cached)."""
+        return self._fingerprint is not None
+
+    def fingerprint(self) -> bytes:
+        """
+        Returns the node's content fingerprint (see node_fingerprint).
+
+        Computed on first use and cached, so only incremental analysis pays
+        for hashing the parameters. raw_parameters may be shared with the
+        workflow dict: a fingerprint taken later reflects in-place edits
+        made since parsing.
+        """
+        if self._fingerprint is None:
+            self._fingerprint = node_fingerprint(self)
+        return self._fingerprint
+
+    @property
+    def is_clustered(self) -> bool:
+        """True if Phase 3 assigned this node to a cluster."""
+        return self.cluster_root_id is not None
+
+    def add_incoming(self, edge: EdgeRecord) -> None:
+        """Records an incoming edge and updates the typed index and degrees."""
+        self.incoming.append(edge)
+        self.incoming_by_type.setdefault(edge.connection_type, []).append(edge)
+        if edge.connection_type == MAIN_CONNECTION_TYPE:
+            self.main_in_degree += 1
+        else:
+            self.non_main_degree += 1
+
+    def add_outgoing(self, edge: EdgeRecord) -> None:
+        """Records an outgoing edge and updates the typed index and degrees."""
+        self.outgoing.append(edge)
+        self.outgoing_by_type.setdefault(edge.connection_type, []).append(edge)
+        if edge.connection_type == MAIN_CONNECTION_TYPE:
+            self.main_out_degree += 1
+            self.main_output_port_mask |= 1 << edge.source_port_index
+        else:
+            self.non_main_degree += 1
+
+    def incoming_of_type(self, connection_type: str) -> list[EdgeRecord]:
+        """Returns the incoming edges of one connection type, in mapping order."""
+        return self.incoming_by_type.get(connection_type, [])
+
+    def outgoing_of_type(self, connection_type: str) -> list[EdgeRecord]:
+        """Returns the outgoing edges of one connection type, in mapping order."""
+        return self.outgoing_by_type.get(connection_type, [])
+
+    @property
+    def has_main_connections(self) -> bool:
+        """True if the node has any incoming or outgoing main connection."""
+        return self.main_in_degree > 0 or self.main_out_degree > 0
+
+    @property
+    def has_non_main_connections(self) -> bool:
+        """True if the node has any incoming or outgoing non-main connection."""
+        return self.non_main_degree > 0
+
+    @property
+    def main_output_port_count(self) -> int:
+        """Number of distinct main output ports (e.g. main_0, main_1) in use."""
+        return self.main_output_port_mask.bit_count()
+
+    def non_main_neighbor_ids(self) -> list[str]:
+        """
+        Returns the IDs of nodes linked to this one via non-main connections.
+
+        Neighbors are deduplicated and listed in edge mapping order (outgoing
+        first), which keeps cluster traversal deterministic.
+        """
+        if not self.non_main_degree:
+            return []
+        neighbors: dict[str, None] = {}
+        for conn_type, edges in self.outgoing_by_type.items():
+            if conn_type != MAIN_CONNECTION_TYPE:
+                for edge in edges:
+                    neighbors[edge.target_node_id] = None
+        for conn_type, edges in self.incoming_by_type.items():
+            if conn_type != MAIN_CONNECTION_TYPE:
+                for edge in edges:
+                    neighbors[edge.source_node_id] = None
+        return list(neighbors)
+
+    def to_model(
+        self, edge_models: dict[int, ConnectionDetail] | None = None
+    ) -> AnalyzedNodeV2:
+        """
+        Builds the Pydantic AnalyzedNodeV2 view of this node.
+
+        Args:
+            edge_models: Optional memo keyed by `id(edge)` so that an edge shared
+                by its source and target maps to a single ConnectionDetail.
+
+        Returns:
+            The AnalyzedNodeV2 model, constructed without re-validation.
+        """
+        if edge_models is None:
+            edge_models = {}
+
+        def _edge(edge: EdgeRecord) -> ConnectionDetail:
+            model = edge_models.get(id(edge))
+            if model is None:
+                model = edge_models[id(edge)] = edge.to_model()
+            return model
+
+        return AnalyzedNodeV2.model_construct(
+            id=self.id,
+            name=self.name,
+            type=self.type,
+            type_version=self.type_version,
+            position=self.position,
+            is_disabled=self.is_disabled,
+            notes=self.notes,
+            raw_parameters=self.raw_parameters,
+            extracted_parameters=self.extracted_parameters,
+            connectivity=NodeConnectivityV2.model_construct(
+                incoming_connections=[_edge(e) for e in self.incoming],
+                outgoing_connections=[_edge(e) for e in self.outgoing],
+            ),
+            classification=NodeClassificationV2.model_construct(
+                group_type=self.group_type, is_end_node=self.is_end_node
+            ),
+            cluster=ClusterInfoV2.model_construct(
+                is_clustered=self.is_clustered,
+                cluster_root_id=self.cluster_root_id,
+                cluster_role=self.cluster_role,
+            ),
+            credentials=CredentialsV2.model_construct(
+                has_credentials=self.has_credentials,
+                details={
+                    cred_type: NodeCredentialDetailV2.model_construct(
+                        id=ref.id, name=ref.name
+                    )
+                    for cred_type, ref in self.credentials.items()
+                },
+            ),
+            parameter_categories=self.parameter_categories,
+        )
+
+    @classmethod
+    def from_model(cls, node: AnalyzedNodeV2) -> "NodeRecord":
+        """Builds a record from a Pydantic AnalyzedNodeV2 (without connections)."""
+        record = cls(
+            id=node.id,
+            name=node.name,
+            type=node.type,
+            type_version=node.type_version,
+            position=node.position,
+            is_disabled=node.is_disabled,
+            notes=node.notes,
+            raw_parameters=node.raw_parameters,
+            has_credentials=node.credentials.has_credentials,
+            credentials={
+                cred_type: CredentialRef(id=details.id, name=details.name)
+                for cred_type, details in node.credentials.details.items()
+            },
+        )
+        record.extracted_parameters = node.extracted_parameters
+        record.parameter_categories = node.parameter_categories
+        record.group_type = NodeGroupType(node.classification.group_type)
+        record.is_end_node = node.classification.is_end_node
+        if node.cluster.is_clustered:
+            record.cluster_root_id = node.cluster.cluster_root_id
+            record.cluster_role = (
+                ClusterRole(node.cluster.cluster_role)
+                if node.cluster.cluster_role is not None
+                else None
+            )
+        return record
+
+
+def node_fingerprint(node: NodeRecord) -> bytes:
+    """
+    Hashes the parsed node content that the analysis phases read.
+
+    Covers the name, type, type version, disabled flag, parameters and
+    credentials. Incremental analysis compares fingerprints to find edited
+    nodes; records rebuilt from a WorkflowAnalysisV2 get the same
+    fingerprint as the records it was produced from.
+
+    Args:
+        node: The NodeRecord to hash.
+
+    Returns:
+        A 16-byte digest.
+    """
+    content = json_codec.dumps_bytes(
+        [
+            node.name,
+            node.type,
+            node.type_version,
+            node.is_disabled,
+            node.raw_parameters,
+            [
+                [cred_type, ref.id, ref.name]
+                for cred_type, ref in node.credentials.items()
+            ],
+        ],
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.blake2b(content, digest_size=16).digest()
+
+
+CredentialKey = tuple[str, str | None, str | None]
+
+
+class GraphIndex:
+    """
+    Secondary indexes over a graph's nodes, each built on first use.
+
+    Lists keep graph (insertion) order unless noted otherwise. The indexes
+    reflect the nodes' state when they were built: cluster members need
+    Phase 3 and group types Phase 4 to have run, so WorkflowGraph drops its
+    index whenever an analysis run changes the nodes.
+    """
+
+    __slots__ = (
+        "_nodes",
+        "_layout_order",
+        "_cluster_members",
+        "_by_type",
+        "_by_group_type",
+        "_by_credential",
+    )
+
+    def __init__(self, nodes: dict[str, NodeRecord]):
+        self._nodes = nodes
+        self._layout_order: list[NodeRecord] | None = None
+        self._cluster_members: dict[str, list[NodeRecord]] | None = None
+        self._by_type: dict[str, list[NodeRecord]] | None = None
+        self._by_group_type: dict[NodeGroupType, list[NodeRecord]] | None = None
+        self._by_credential: dict[CredentialKey, list[NodeRecord]] | None = None
+
+    @property
+    def layout_order(self) -> list[NodeRecord]:
+        """All nodes, top to bottom and left to right by canvas position."""
+        if self._layout_order is None:
+
+            def position_key(node: NodeRecord) -> tuple[float, float, str]:
+                position = node.position or ()
+                return (
+                    position[1] if len(position) > 1 else 0,
+                    position[0] if position else 0,
+                    node.id,
+                )
+
+            self._layout_order = sorted(self._nodes.values(), key=position_key)
+        return self._layout_order
+
+    @property
+    def cluster_members(self) -> dict[str, list[NodeRecord]]:
+        """Cluster root ID -> the cluster's nodes (root included), in layout order."""
+        if self._cluster_members is None:
+            members: dict[str, list[NodeRecord]] = {}
+            for node in self.layout_order:
+                if node.cluster_root_id is not None:
+                    members.setdefault(node.cluster_root_id, []).append(node)
+            self._cluster_members = members
+        return self._cluster_members
+
+    @property
+    def by_type(self) -> dict[str, list[NodeRecord]]:
+        """n8n node type -> nodes of that type."""
+        if self._by_type is None:
+            by_type: dict[str, list[NodeRecord]] = {}
+            for node in self._nodes.values():
+                by_type.setdefault(node.type, []).append(node)
+            self._by_type = by_type
+        return self._by_type
+
+    @property
+    def by_group_type(self) -> dict[NodeGroupType, list[NodeRecord]]:
+        """Group type -> nodes classified into it."""
+        if self._by_group_type is None:
+            by_group: dict[NodeGroupType, list[NodeRecord]] = {}
+            for node in self._nodes.values():
+                by_group.setdefault(node.group_type, []).append(node)
+            self._by_group_type = by_group
+        return self._by_group_type
+
+    @property
+    def by_credential(self) -> dict[CredentialKey, list[NodeRecord]]:
+        """(Credential type, name, ID) -> nodes using that credential."""
+        if self._by_credential is None:
+            by_credential: dict[CredentialKey, list[NodeRecord]] = {}
+            for node in self._nodes.values():
+                if node.has_credentials:
+                    for cred_type, ref in node.credentials.items():
+                        key = (cred_type, ref.name, ref.id)
+                        by_credential.setdefault(key, []).append(node)
+            self._by_credential = by_credential
+        return self._by_credential
+
+    def nodes_in_group(self, group_type: NodeGroupType) -> list[NodeRecord]:
+        """Returns the nodes of a group type (empty if there are none)."""
+        return self.by_group_type.get(group_type, [])
+
+
+class WorkflowGraph:
+    """
+    The complete analyzed workflow, held as compact node and edge records.
+
+    Mirrors the top-level fields of `WorkflowAnalysisV2` so generators and
+    reports can consume either representation's metadata the same way.
+    """
+
+    __slots__ = (
+        "workflow_name",
+        "workflow_tags",
+        "workflow_id",
+        "workflow_version_id",
+        "nodes",
+        "name_to_id",
+        "warnings",
+        "completed_phases",
+        "phase_warnings",
+        "_analysis",
+        "_index",
+    )
+
+    def __init__(self) -> None:
+        self.workflow_name: str | None = None
+        self.workflow_tags: list[dict[str, Any]] = []
+        self.workflow_id: str | None = None
+        self.workflow_version_id: str | None = None
+        self.nodes: dict[str, NodeRecord] = {}
+        self.name_to_id: dict[str, str] = {}
+        self.warnings = WarningCollector()
+        self.completed_phases: set[int] = set()
+        self.phase_warnings: dict[int, WarningCollector] = {}
+        self._analysis: WorkflowAnalysisV2 | None = None
+        self._index: GraphIndex | None = None
+
+    @property
+    def index(self) -> GraphIndex:
+        """The (cached) secondary indexes over the nodes."""
+        if self._index is None:
+            self._index = GraphIndex(self.nodes)
+        return self._index
+
+    def copy(self) -> "WorkflowGraph":
+        """
+        Returns a copy that can be analyzed further without changing this one.
+
+        Used to complete missing phases of a shared (cached) graph while
+        other threads keep reading it.
+
+        Returns:
+            A new WorkflowGraph with copied node records and phase state.
+        """
+        graph = WorkflowGraph()
+        graph.workflow_name = self.workflow_name
+        graph.workflow_tags = self.workflow_tags
+        graph.workflow_id = self.workflow_id
+        graph.workflow_version_id = self.workflow_version_id
+        graph.nodes = {node_id: node.copy() for node_id, node in self.nodes.items()}
+        graph.name_to_id = dict(self.name_to_id)
+        graph.warnings = self.warnings
+        graph.completed_phases = set(self.completed_phases)
+        graph.phase_warnings = dict(self.phase_warnings)
+        return graph
+
+    def reset_views(self) -> None:
+        """Drops the cached Pydantic view and indexes after the nodes changed."""
+        self._analysis = None
+        self._index = None
+
+    @property
+    def analysis_warnings(self) -> list[str]:
+        """The formatted warning messages (capped per warning code)."""
+        return self.warnings.messages()
+
+    def to_analysis(self) -> WorkflowAnalysisV2:
+        """
+        Materializes (once) the Pydantic WorkflowAnalysisV2 view of this graph.
+
+        Returns:
+            The cached WorkflowAnalysisV2 object.
+        """
+        if self._analysis is None:
+            edge_models: dict[int, ConnectionDetail] = {}
+            self._analysis = WorkflowAnalysisV2.model_construct(
+                workflow_name=self.workflow_name,
+                workflow_tags=self.workflow_tags,
+                workflow_id=self.workflow_id,
+                workflow_version_id=self.workflow_version_id,
+                nodes={
+                    node_id: node.to_model(edge_models)
+                    for node_id, node in self.nodes.items()
+                },
+                analysis_warnings=list(self.analysis_warnings),
+            )
+        return self._analysis
+
+    @classmethod
+    def from_analysis(cls, analysis: WorkflowAnalysisV2) -> "WorkflowGraph":
+        """
+        Builds a graph from an existing Pydantic WorkflowAnalysisV2.
+
+        Args:
+            analysis: A completed WorkflowAnalysisV2 object.
+
+        Returns:
+            An equivalent WorkflowGraph.
+        """
+        graph = cls()
+        graph.workflow_name = analysis.workflow_name
+        graph.workflow_tags = analysis.workflow_tags
+        graph.workflow_id = analysis.workflow_id
+        graph.workflow_version_id = analysis.workflow_version_id
+        graph.warnings = WarningCollector.from_messages(analysis.analysis_warnings)
+        graph.completed_phases = set(ALL_PHASES)
+        graph.nodes = {
+            node_id: NodeRecord.from_model(node)
+            for node_id, node in analysis.nodes.items()
+        }
+
+        edges: dict[int, EdgeRecord] = {}
+
+        def _edge(conn: ConnectionDetail) -> EdgeRecord:
+            edge = edges.get(id(conn))
+            if edge is None:
+                port = conn.source_port_name.rsplit("_", 1)[-1]
+                edge = edges[id(conn)] = EdgeRecord(
+                    source_node_id=conn.source_node_id,
+                    source_port_index=int(port) if port.isdigit() else 0,
+                    target_node_id=conn.target_node_id,
+                    target_port_name=conn.target_port_name,
+                    connection_type=conn.connection_type,
+                )
+            return edge
+
+        for node_id, node in analysis.nodes.items():
+            record = graph.nodes[node_id]
+            for conn in node.connectivity.incoming_connections:
+                record.add_incoming(_edge(conn))
+            for conn in node.connectivity.outgoing_connections:
+                record.add_outgoing(_edge(conn))
+        graph._analysis = analysis
+        return graph
+
+
+def as_workflow_graph(analysis: WorkflowGraph | WorkflowAnalysisV2) -> WorkflowGraph:
+    """
+    Returns the graph form of an analysis, converting Pydantic input if needed.
+
+    Args:
+        analysis: A WorkflowGraph or a WorkflowAnalysisV2 object.
+
+    Returns:
+        A WorkflowGraph for the same analysis.
+    """
+    if isinstance(analysis, WorkflowAnalysisV2):
+        return WorkflowGraph.from_analysis(analysis)
+    return analysis
@@ -0,0 +1,226 @@
+# filename: src/n8nmermaid/core/analyzer_v2/incremental.py
+"""
+Incremental re-analysis of a workflow against a previous version's analysis.
+
+Phases 1 and 2 always run on the new workflow data. Nodes are then diffed
+against the previous graph by ID (their content fingerprints, see
+NodeRecord.fingerprint) and by their ordered connection endpoints. Phases
+3-6 run only for what the changes can affect; every other node takes its
+results from the previous graph.
+
+Fingerprints are only taken here, not during regular analysis. Graphs
+returned by analyze_incremental are fingerprinted right after parsing, so
+later in-place edits of the workflow dict show up when they serve as the
+previous graph. Other graphs are fingerprinted on first use; nodes whose
+parameters they still share with the new workflow are treated as edited.
+"""
+
+import logging
+from collections.abc import Iterable
+from typing import TYPE_CHECKING
+
+from .constants import INCREMENTAL_MAX_CHANGED_FRACTION
+from .diagnostics import WarningCollector
+from .graph import EdgeRecord, NodeRecord, WorkflowGraph
+from .planner import AnalysisField, plan_phases
+
+if TYPE_CHECKING:
+    from . import WorkflowAnalyzerV2
+
+logger = logging.getLogger(__name__)
+
+# Phases whose results can be carried over per node from a previous analysis
+_REUSABLE_PHASES = (3, 4, 5, 6)
+
+
+def _edge_signature(
+    edges: list[EdgeRecord], outgoing: bool
+) -> tuple[tuple[str, int, str, str], ...]:
+    """Returns an order-preserving, comparable form of a node's edge list."""
+    return tuple(
+        (
+            edge.connection_type,
+            edge.source_port_index,
+            edge.target_node_id if outgoing else edge.source_node_id,
+            edge.target_port_name,
+        )
+        for edge in edges
+    )
+
+
+def _connections_changed(node: NodeRecord, old: NodeRecord) -> bool:
+    """True if a node's incoming or outgoing connections differ."""
+    return _edge_signature(node.outgoing, True) != _edge_signature(
+        old.outgoing, True
+    ) or _edge_signature(node.incoming, False) != _edge_signature(old.incoming, False)
+
+
+def _fingerprint_nodes(graph: WorkflowGraph) -> None:
+    """Takes the fingerprints of all nodes of a freshly parsed graph."""
+    for node in graph.nodes.values():
+        node.fingerprint()
+
+
+def _content_changed(node: NodeRecord, old: NodeRecord) -> bool:
+    """True if a node's content may differ from the previous version."""
+    if not old.has_fingerprint and old.raw_parameters is node.raw_parameters:
+        # Shared with the new workflow and never fingerprinted, so in-place
+        # edits since the previous analysis can't be ruled out
+        return True
+    return node.fingerprint() != old.fingerprint()
+
+
+def _cluster_components(graph: WorkflowGraph, seeds: Iterable[str]) -> set[str]:
+    """Collects all nodes in the non-main components containing the seeds."""
+    members: set[str] = set()
+    for seed in seeds:
+        if seed in members:
+            continue
+        members.add(seed)
+        stack = [seed]
+        while stack:
+            for neighbor_id in graph.nodes[stack.pop()].non_main_neighbor_ids():
+                if neighbor_id not in members and neighbor_id in graph.nodes:
+                    members.add(neighbor_id)
+                    stack.append(neighbor_id)
+    return members
+
+
+def _subset(graph: WorkflowGraph, node_ids: set[str]) -> dict[str, NodeRecord]:
+    """Returns the given nodes as a dict in workflow node order."""
+    return {
+        node_id: node for node_id, node in graph.nodes.items() if node_id in node_ids
+    }
+
+
+def analyze_incremental(
+    analyzer: "WorkflowAnalyzerV2",
+    previous: WorkflowGraph,
+    fields: Iterable[AnalysisField] | None = None,
+    max_changed_fraction: float = INCREMENTAL_MAX_CHANGED_FRACTION,
+) -> WorkflowGraph:
+    """
+    Runs the analyzer incrementally, reusing per-node results from `previous`.
+
+    Falls back to a full run when the previous graph can't be diffed (it
+    lacks required phases, or carries warnings from phases 3-6, or warnings
+    that can't be attributed to a phase as in a graph rebuilt from a
+    WorkflowAnalysisV2), when the order of the remaining nodes changed, or
+    when more than `max_changed_fraction` of the nodes were added, removed,
+    edited or rewired.
+
+    Args:
+        analyzer: A fresh WorkflowAnalyzerV2 for the new workflow data.
+        previous: The analysis graph of an earlier version of the workflow.
+        fields: The analysis fields the caller needs, or None for all.
+        max_changed_fraction: Change ratio above which a full run is cheaper.
+
+    Returns:
+        The analyzer's WorkflowGraph for the new workflow data.
+    """
+    phases = plan_phases(fields)
+
+    def full_run(reason: str) -> WorkflowGraph:
+        logger.info("Incremental analysis falling back to a full run: %s", reason)
+        full = analyzer.analyze_graph(fields)
+        _fingerprint_nodes(full)
+        return full
+
+    if analyzer.graph.completed_phases:
+        return full_run("analyzer already ran")
+    if not set(phases) <= previous.completed_phases:
+        return full_run("previous analysis lacks required phases")
+    if any(previous.phase_warnings.get(p) for p in _REUSABLE_PHASES):
+        return full_run("previous analysis has node-level warnings")
+    if previous.warnings and not previous.phase_warnings:
+        return full_run("previous analysis has warnings of unknown phases")
+    old_nodes = previous.nodes
+
+    graph = analyzer.graph
+    new_warnings = WarningCollector()
+
+    def run(phase: int, nodes: dict[str, NodeRecord] | None = None) -> None:
+        phase_warnings = (
+            analyzer.run_phase(phase, nodes) if nodes != {} else WarningCollector()
+        )
+        graph.phase_warnings[phase] = phase_warnings
+        new_warnings.extend(phase_warnings)
+        graph.completed_phases.add(phase)
+
+    run(1)
+    _fingerprint_nodes(graph)
+    if not graph.nodes:
+        analyzer._finish(new_warnings)
+        return graph
+
+    kept_new = [node_id for node_id in graph.nodes if node_id in old_nodes]
+    kept_old = [node_id for node_id in old_nodes if node_id in graph.nodes]
+    removed = len(old_nodes) - len(kept_old)
+    edited = {
+        node_id
+        for node_id, node in graph.nodes.items()
+        if node_id not in old_nodes or _content_changed(node, old_nodes[node_id])
+    }
+
+    rewired: set[str] = set()
+    if 2 in phases:
+        run(2)
+        rewired = {
+            node_id
+            for node_id in kept_new
+            if _connections_changed(graph.nodes[node_id], old_nodes[node_id])
+        }
+
+    changed = edited | rewired
+    fraction = (len(changed) + removed) / len(graph.nodes)
+    if kept_new != kept_old or fraction > max_changed_fraction:
+        reason = (
+            "node order changed"
+            if kept_new != kept_old
+            else f"{fraction:.0%} of nodes changed"
+        )
+        logger.info("Incremental analysis falling back to a full run: %s", reason)
+        for phase in phases:
+            if phase > 2:
+                run(phase)
+        analyzer._finish(new_warnings)
+        return graph
+
+    # Carry over results of unaffected nodes, then recompute the rest
+    reclustered: set[str] = set()
+    if 3 in phases:
+        reclustered = _cluster_components(graph, changed)
+    reclassified = reclustered | changed
+
+    for node_id, node in graph.nodes.items():
+        old = old_nodes.get(node_id)
+        if old is None:
+            continue
+        if 3 in phases and node_id not in reclustered:
+            node.cluster_root_id = old.cluster_root_id
+            node.cluster_role = old.cluster_role
+        if 4 in phases and node_id not in reclassified:
+            node.group_type = old.group_type
+            node.is_end_node = old.is_end_node
+        if node_id not in edited:
+            if 5 in phases:
+                node.extracted_parameters = old.extracted_parameters
+            if 6 in phases:
+                node.parameter_categories = old.parameter_categories
+
+    recompute = {3: reclustered, 4: reclassified, 5: edited, 6: edited}
+    for phase in phases:
+        if phase > 2:
+            run(phase, _subset(graph, recompute[phase]))
+
+    logger.info(
+        "Incremental analysis: %d edited, %d rewired, %d removed; "
+        "recomputed %d cluster member(s), %d classification(s).",
+        len(edited),
+        len(rewired),
+        removed,
+        len(reclustered),
+        len(reclassified),
+    )
+    analyzer._finish(new_warnings)
+    return graph
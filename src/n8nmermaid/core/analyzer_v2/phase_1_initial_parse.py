@@ -1,85 +1,268 @@
 # filename: src/n8nmermaid/core/analyzer_v2/phase_1_initial_parse.py
-"""Phase 1: Initial parsing of raw node data into AnalyzedNodeV2 objects."""
+"""Phase 1: Initial parsing of raw node data into NodeRecord objects."""
 
 import logging
 from typing import Any
 
-from pydantic import ValidationError
-
-from .models import (
-    AnalyzedNodeV2,
-    CredentialsV2,
-    NodeCredentialDetailV2,
-    WorkflowAnalysisV2,
-)
+from .diagnostics import WarningCollector
+from .graph import CredentialRef, NodeRecord, WorkflowGraph
 
 logger = logging.getLogger(__name__)
 
+_TRUE_STRINGS = frozenset({"1", "on", "t", "true", "y", "yes"})
+_FALSE_STRINGS = frozenset({"0", "off", "f", "false", "n", "no"})
+
+
+def _coerce_float(value: Any, field: str) -> float | None:
+    """Coerces an optional numeric field the way the V2 models accept it."""
+    if value is None:
+        return None
+    if isinstance(value, bool | int | float):
+        return float(value)
+    if isinstance(value, str):
+        try:
+            return float(value)
+        except ValueError:
+            pass
+    raise ValueError(f"'{field}' should be a valid number, got {value!r}")
+
+
+def _coerce_position(value: Any) -> list[float] | None:
+    """Coerces the optional 'position' field into a list of floats."""
+    if value is None:
+        return None
+    if not isinstance(value, list | tuple):
+        raise ValueError(f"'position' should be a valid list, got {value!r}")
+    return [_coerce_float(item, "position") for item in value]
 
-def _parse_credentials(raw_credentials: Any) -> tuple[CredentialsV2, list[str]]:
+
+def _coerce_bool(value: Any, field: str) -> bool:
+    """Coerces a boolean field the way the V2 models accept it."""
+    if isinstance(value, bool):
+        return value
+    if isinstance(value, int | float) and value in (0, 1):
+        return bool(value)
+    if isinstance(value, str):
+        lowered = value.lower()
+        if lowered in _TRUE_STRINGS:
+            return True
+        if lowered in _FALSE_STRINGS:
+            return False
+    raise ValueError(f"'{field}' should be a valid boolean, got {value!r}")
+
+
+def _coerce_optional_str(value: Any, field: str) -> str | None:
+    """Checks an optional string field."""
+    if value is None or isinstance(value, str):
+        return value
+    raise ValueError(f"'{field}' should be a valid string, got {value!r}")
+
+
+def _parse_credentials(
+    raw_credentials: Any,
+    warnings: WarningCollector,
+    node_name: Any,
+    node_id: str,
+) -> tuple[bool, dict[str, CredentialRef]]:
     """
     Parses the raw credential data for a node.
 
     Args:
         raw_credentials: The 'credentials' dictionary from the raw node data.
+        warnings: Collector for warnings about malformed credentials.
+        node_name: The node's name, for warning messages.
+        node_id: The node's ID.
 
     Returns:
-        A tuple containing the parsed CredentialsV2 object and a list of warnings.
+        A tuple containing the has-credentials flag and the parsed credential
+        references keyed by credential type.
     """
-    warnings: list[str] = []
-    details: dict[str, NodeCredentialDetailV2] = {}
-    has_creds = False
+    details: dict[str, CredentialRef] = {}
 
     if not isinstance(raw_credentials, dict):
         if raw_credentials is not None:
-            warnings.append(
-                "Credentials field is not a dictionary, skipping credential parsing."
-            )
-        return CredentialsV2(has_credentials=False), warnings
+            warnings.add("credentials_not_dict", node_name, node_id, node_id=node_id)
+        return False, details
 
     if not raw_credentials:
-        return CredentialsV2(has_credentials=False), warnings
+        return False, details
 
-    has_creds = True
     for cred_type, cred_data in raw_credentials.items():
         if isinstance(cred_data, dict):
             try:
-                details[cred_type] = NodeCredentialDetailV2(
-                    id=cred_data.get("id"), name=cred_data.get("name")
+                details[cred_type] = CredentialRef(
+                    id=_coerce_optional_str(cred_data.get("id"), "id"),
+                    name=_coerce_optional_str(cred_data.get("name"), "name"),
                 )
-            except ValidationError as e:
-                warnings.append(
-                    f"Validation error parsing credential type '{cred_type}': {e}"
+            except ValueError as e:
+                warnings.add(
+                    "credential_invalid",
+                    node_name,
+                    node_id,
+                    cred_type,
+                    str(e),
+                    node_id=node_id,
                 )
         else:
-            warnings.append(
-                f"Unexpected format for credential type '{cred_type}', expected dict."
+            warnings.add(
+                "credential_not_dict", node_name, node_id, cred_type, node_id=node_id
             )
 
-    return CredentialsV2(has_credentials=has_creds, details=details), warnings
+    return True, details
+
+
+def _parse_trusted_nodes(
+    raw_nodes_list: Any,
+) -> tuple[dict[str, NodeRecord], dict[str, str]] | None:
+    """
+    Builds NodeRecord objects from known-good node data without coercion.
+
+    Only checks the structure that name mapping and later phases rely on:
+    a list of dicts with unique, non-empty string IDs and names, string types,
+    and dict-of-dict credentials with optional string IDs and names. Other
+    field values are taken as-is when they already have the right type and
+    coerced like the validating parser otherwise; a value it would reject
+    fails the check, so the validating parser drops just that node.
+
+    Args:
+        raw_nodes_list: The 'nodes' entry of the raw workflow dictionary.
+
+    Returns:
+        A tuple of (nodes by ID, name to ID map), or None if the structural
+        check failed and the validating parser must be used instead.
+    """
+    if not isinstance(raw_nodes_list, list):
+        return None
+
+    nodes_dict: dict[str, NodeRecord] = {}
+    name_to_id: dict[str, str] = {}
+
+    for node_data in raw_nodes_list:
+        if not isinstance(node_data, dict):
+            return None
+        node_id = node_data.get("id")
+        node_type = node_data.get("type")
+        node_name = node_data.get("name")
+        if (
+            not isinstance(node_id, str)
+            or not isinstance(node_name, str)
+            or not isinstance(node_type, str)
+            or not node_id
+            or not node_name
+            or not node_type
+            or node_id in nodes_dict
+            or node_name in name_to_id
+        ):
+            return None
+
+        raw_credentials = node_data.get("credentials")
+        credentials: dict[str, CredentialRef] = {}
+        if raw_credentials is not None:
+            if not isinstance(raw_credentials, dict):
+                return None
+            for cred_type, cred_data in raw_credentials.items():
+                if not isinstance(cred_data, dict):
+                    return None
+                cred_id = cred_data.get("id")
+                cred_name = cred_data.get("name")
+                if (cred_id is not None and not isinstance(cred_id, str)) or (
+                    cred_name is not None and not isinstance(cred_name, str)
+                ):
+                    return None
+                credentials[cred_type] = CredentialRef(id=cred_id, name=cred_name)
+
+        type_version = node_data.get("typeVersion")
+        position = node_data.get("position")
+        disabled = node_data.get("disabled", False)
+        notes = node_data.get("notes")
+        try:
+            if type_version is not None:
+                type_version = float(type_version)
+            if position is not None:
+                if not isinstance(position, list):
+                    return None
+                position = [float(v) for v in position]
+            if not isinstance(disabled, bool):
+                disabled = _coerce_bool(disabled, "disabled")
+        except (TypeError, ValueError):
+            return None
+        if notes is not None and not isinstance(notes, str):
+            return None
+        node_params = node_data.get("parameters", {})
+
+        name_to_id[node_name] = node_id
+        nodes_dict[node_id] = NodeRecord(
+            id=node_id,
+            name=node_name,
+            type=node_type,
+            type_version=type_version,
+            position=position,
+            is_disabled=disabled,
+            notes=notes,
+            raw_parameters=node_params if isinstance(node_params, dict) else {},
+            has_credentials=bool(raw_credentials),
+            credentials=credentials,
+        )
+
+    return nodes_dict, name_to_id
+
+
+def _update_workflow_info(
+    raw_workflow_data: dict[str, Any],
+    graph: WorkflowGraph,
+    nodes_dict: dict[str, NodeRecord],
+) -> None:
+    """Stores the parsed nodes and the workflow-level metadata on the graph."""
+    graph.nodes = nodes_dict
+    graph.workflow_name = raw_workflow_data.get("name")
+    graph.workflow_tags = raw_workflow_data.get("tags", [])
+    graph.workflow_id = raw_workflow_data.get("id")
+    graph.workflow_version_id = raw_workflow_data.get("versionId")
 
 
 def parse_initial_nodes(
-    raw_workflow_data: dict[str, Any], analysis_result: WorkflowAnalysisV2
-) -> tuple[dict[str, str], list[str]]:
+    raw_workflow_data: dict[str, Any], graph: WorkflowGraph, trusted: bool = False
+) -> tuple[dict[str, str], WarningCollector]:
     """
-    Parses raw node list, creates initial AnalyzedNodeV2 objects, builds name map.
+    Parses raw node list, creates initial NodeRecord objects, builds name map.
+
+    Populates basic fields, raw_parameters, and credentials. Handles invalid
+    field values and duplicates. Updates graph.nodes in place.
 
-    Populates basic fields, raw_parameters, and credentials. Handles validation
-    errors and duplicates. Updates analysis_result.nodes in place.
+    With `trusted`, the node data is assumed to be well-formed (e.g. produced
+    by our own export pipeline): after a cheap structural check, records are
+    built without validating or coercing field values. Input that fails the
+    check is parsed the regular way, so results only differ for values the
+    validating parser would have coerced or rejected.
 
     Args:
         raw_workflow_data: The raw workflow dictionary.
-        analysis_result: The WorkflowAnalysisV2 object to populate.
+        graph: The WorkflowGraph object to populate.
+        trusted: Skip per-field validation for known-good input.
 
     Returns:
         A tuple containing:
         - Dictionary mapping unique node names to their corresponding node IDs.
-        - List of warning messages generated during this phase.
+        - The warnings generated during this phase.
     """
-    nodes_dict: dict[str, AnalyzedNodeV2] = {}
+    if trusted:
+        parsed = _parse_trusted_nodes(raw_workflow_data.get("nodes", []))
+        if parsed is not None:
+            nodes_dict, name_to_id = parsed
+            logger.info(
+                "Phase 1: Parsed %d trusted node entries without validation.",
+                len(nodes_dict),
+            )
+            _update_workflow_info(raw_workflow_data, graph, nodes_dict)
+            return name_to_id, WarningCollector()
+        logger.info(
+            "Phase 1: Trusted input failed the structural check. "
+            "Falling back to validated parsing."
+        )
+
+    nodes_dict: dict[str, NodeRecord] = {}
     name_to_id: dict[str, str] = {}
-    warnings: list[str] = []
+    warnings = WarningCollector()
     processed_ids: set[str] = set()
     duplicate_names: set[str] = set()
 
@@ -87,10 +270,7 @@ def parse_initial_nodes(
     initial_node_count = 0
 
     if not isinstance(raw_nodes_list, list):
-        warnings.append(
-            f"Workflow 'nodes' data is not a list "
-            f"(found {type(raw_nodes_list).__name__}). Treating as empty."
-        )
+        warnings.add("nodes_not_list", type(raw_nodes_list).__name__)
         raw_nodes_list = []
     else:
         initial_node_count = len(raw_nodes_list)
@@ -100,7 +280,7 @@ def parse_initial_nodes(
     for i, node_data in enumerate(raw_nodes_list):
         node_name_default = f"Unnamed_Node_{i+1}"
         if not isinstance(node_data, dict):
-            warnings.append(f"Skipping non-dictionary item in nodes list at index {i}.")
+            warnings.add("node_not_dict", i)
             invalid_or_duplicate_count += 1
             continue
 
@@ -110,23 +290,15 @@ def parse_initial_nodes(
 
         # Basic Validation
         if not node_id or not isinstance(node_id, str):
-            warnings.append(
-                f"Node '{node_name}' (index {i}) missing or invalid 'id'. Skipping."
-            )
+            warnings.add("node_invalid_id", node_name, i)
             invalid_or_duplicate_count += 1
             continue
         if not node_type or not isinstance(node_type, str):
-            warnings.append(
-                f"Node '{node_name}' (ID: {node_id}) missing or invalid 'type'. "
-                "Skipping."
-            )
+            warnings.add("node_invalid_type", node_name, node_id, node_id=node_id)
             invalid_or_duplicate_count += 1
             continue
         if node_id in processed_ids:
-            warnings.append(
-                f"Duplicate node ID '{node_id}' found for node '{node_name}'. "
-                "Skipping duplicate."
-            )
+            warnings.add("duplicate_node_id", node_id, node_name, node_id=node_id)
             invalid_or_duplicate_count += 1
             continue
 
@@ -137,9 +309,8 @@ def parse_initial_nodes(
             if node_name in name_to_id:
                 if node_name not in duplicate_names:
                     original_id = name_to_id[node_name]
-                    warnings.append(
-                        f"Duplicate node name '{node_name}'. Connections will use "
-                        f"first encountered ID: {original_id}."
+                    warnings.add(
+                        "duplicate_node_name", node_name, original_id, node_id=node_id
                     )
                     duplicate_names.add(node_name)
             else:
@@ -151,40 +322,37 @@ def parse_initial_nodes(
                 temp_name = f"{node_name_default}_{counter}"
                 counter += 1
             if temp_name != node_name:
-                warnings.append(
-                    f"Default node name '{node_name}' conflicted, renaming to "
-                    f"'{temp_name}' for internal mapping."
+                warnings.add(
+                    "default_name_conflict", node_name, temp_name, node_id=node_id
                 )
                 node_name = temp_name
             name_to_id[node_name] = node_id
 
-        # Create AnalyzedNodeV2 Object
+        # Create NodeRecord Object
         try:
             node_params = node_data.get("parameters", {})
-            raw_creds = node_data.get("credentials")
-            parsed_creds, cred_warnings = _parse_credentials(raw_creds)
-            warnings.extend(
-                f"Node '{node_name}' (ID: {node_id}): {w}" for w in cred_warnings
+            has_creds, cred_details = _parse_credentials(
+                node_data.get("credentials"), warnings, node_name, node_id
             )
 
-            analyzed_node = AnalyzedNodeV2(
+            if not isinstance(node_name, str):
+                raise ValueError(f"'name' should be a valid string, got {node_name!r}")
+
+            nodes_dict[node_id] = NodeRecord(
                 id=node_id,
                 name=node_name,
                 type=node_type,
-                type_version=node_data.get("typeVersion"),
-                position=node_data.get("position"),
-                is_disabled=node_data.get("disabled", False),
-                notes=node_data.get("notes"),
+                type_version=_coerce_float(node_data.get("typeVersion"), "typeVersion"),
+                position=_coerce_position(node_data.get("position")),
+                is_disabled=_coerce_bool(node_data.get("disabled", False), "disabled"),
+                notes=_coerce_optional_str(node_data.get("notes"), "notes"),
                 raw_parameters=node_params if isinstance(node_params, dict) else {},
-                credentials=parsed_creds,
+                has_credentials=has_creds,
+                credentials=cred_details,
             )
-            nodes_dict[node_id] = analyzed_node
 
-        except ValidationError as e:
-            warnings.append(
-                f"Validation error creating AnalyzedNodeV2 for '{node_name}' "
-                f"(ID: {node_id}): {e}. Skipping."
-            )
+        except ValueError as e:
+            warnings.add("node_invalid", node_name, node_id, str(e), node_id=node_id)
             invalid_or_duplicate_count += 1
             if node_id in processed_ids:
                 processed_ids.remove(node_id)
@@ -205,11 +373,7 @@ def parse_initial_nodes(
             len(duplicate_names),
         )
 
-    # Update the main analysis result object
-    analysis_result.nodes = nodes_dict
-    analysis_result.workflow_name = raw_workflow_data.get("name")
-    analysis_result.workflow_tags = raw_workflow_data.get("tags", [])
-    analysis_result.workflow_id = raw_workflow_data.get("id")
-    analysis_result.workflow_version_id = raw_workflow_data.get("versionId")
+    # Update the graph
+    _update_workflow_info(raw_workflow_data, graph, nodes_dict)
 
     return name_to_id, warnings
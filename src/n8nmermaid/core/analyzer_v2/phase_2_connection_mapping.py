@@ -5,80 +5,57 @@ import logging
 from typing import Any, cast
 
 from .constants import N8nConnectionLiteral
-from .models import AnalyzedNodeV2, ConnectionDetail
+from .diagnostics import WarningCollector
+from .graph import EdgeRecord, NodeRecord
 
 logger = logging.getLogger(__name__)
 
 
-def _log_missing_connection_node(
-    node_kind: str,
-    node_name: str,
-    warnings: list[str],
-    source_name_context: str | None = None,
-    target_name_context: str | None = None,
-) -> None:
-    """Logs info about nodes referenced in connections but not found/valid."""
-    context = ""
-    if source_name_context and target_name_context:
-        context = (
-            f"Connection from '{source_name_context}' to "
-            f"'{target_name_context}': "
-        )
-    elif source_name_context:
-        context = f"Connection from '{source_name_context}': "
-
-    msg = (
-        f"{context}Skipping connection involving {node_kind} node '{node_name}': "
-        "Node not found/valid (check name, duplicates, or earlier errors)."
-    )
-    warnings.append(msg)
-    logger.warning(msg)
-
-
 def map_connections(
-    nodes_dict: dict[str, AnalyzedNodeV2],
+    nodes_dict: dict[str, NodeRecord],
     name_to_id: dict[str, str],
     raw_connections: dict[str, Any],
-) -> list[str]:
+) -> WarningCollector:
     """
     Analyzes raw connection data and populates node connectivity details.
 
-    Updates the `connectivity.incoming_connections` and
-    `connectivity.outgoing_connections` lists for each node in nodes_dict.
+    Updates the `incoming` and `outgoing` edge lists for each node in nodes_dict,
+    together with the per-type edge index and the main/non-main degree counters
+    that later phases and generators use for constant-time lookups.
 
     Args:
-        nodes_dict: Dictionary mapping node IDs to AnalyzedNodeV2 objects.
+        nodes_dict: Dictionary mapping node IDs to NodeRecord objects.
         name_to_id: Dictionary mapping node names to their corresponding node IDs.
         raw_connections: The 'connections' dictionary from the raw workflow JSON.
 
     Returns:
-        A list of warning messages generated during connection processing.
+        The warnings generated during connection processing.
     """
-    warnings: list[str] = []
+    warnings = WarningCollector()
     connection_parse_errors = 0
     total_connections_processed = 0
 
     if not isinstance(raw_connections, dict):
-        warnings.append(
-            f"Workflow 'connections' data is not a dict "
-            f"(found {type(raw_connections).__name__}). Skipping connection analysis."
-        )
+        warnings.add("connections_not_dict", type(raw_connections).__name__)
         return warnings
 
     for source_name, output_types in raw_connections.items():
         source_id = name_to_id.get(source_name)
 
         if not source_id or source_id not in nodes_dict:
-            _log_missing_connection_node("source", source_name, warnings)
+            warnings.add("missing_source_node", source_name)
+            logger.debug("Connection source node '%s' not found.", source_name)
             connection_parse_errors += 1
             continue
 
         source_node = nodes_dict[source_id]
 
         if not isinstance(output_types, dict):
-            warnings.append(
-                f"Connections data for source node '{source_name}' (ID: {source_id}) "
-                "is not a dict. Skipping."
+            warnings.add(
+                "source_connections_not_dict",
+                source_name,
+                source_id,
+                node_id=source_id,
             )
             connection_parse_errors += 1
             continue
@@ -88,17 +65,22 @@ def map_connections(
                 # Validate and cast connection type
                 conn_type = cast(N8nConnectionLiteral, conn_type_str)
             except Exception:
-                warnings.append(
-                    f"Unknown connection type '{conn_type_str}' from node "
-                    f"'{source_name}'. Skipping."
+                warnings.add(
+                    "unknown_connection_type",
+                    conn_type_str,
+                    source_name,
+                    node_id=source_id,
                 )
                 connection_parse_errors += 1
                 continue
 
             if not isinstance(output_ports, list):
-                warnings.append(
-                    f"Connection type '{conn_type}' from '{source_name}' "
-                    f"expected list, got {type(output_ports).__name__}. Skipping."
+                warnings.add(
+                    "connection_ports_not_list",
+                    conn_type,
+                    source_name,
+                    type(output_ports).__name__,
+                    node_id=source_id,
                 )
                 connection_parse_errors += 1
                 continue
@@ -118,10 +100,12 @@ def map_connections(
                 # Process each target connection from this specific port
                 for connection in targets:
                     if not isinstance(connection, dict):
-                        warnings.append(
-                            f"Connection target from '{source_name}' "
-                            f"(port {port_index}, type {conn_type}) "
-                            "is not a dictionary. Skipping."
+                        warnings.add(
+                            "connection_target_not_dict",
+                            source_name,
+                            port_index,
+                            conn_type,
+                            node_id=source_id,
                         )
                         connection_parse_errors += 1
                         continue
@@ -133,9 +117,12 @@ def map_connections(
                     # target_port_index = connection.get("index", 0) # Not used here
 
                     if not target_node_name:
-                        warnings.append(
-                            f"Connection from '{source_name}' (port {port_index}, "
-                            f"type {conn_type}) missing target node name. Skipping."
+                        warnings.add(
+                            "connection_missing_target",
+                            source_name,
+                            port_index,
+                            conn_type,
+                            node_id=source_id,
                         )
                         connection_parse_errors += 1
                         continue
@@ -143,40 +130,44 @@ def map_connections(
                     target_id = name_to_id.get(str(target_node_name))
 
                     if not target_id or target_id not in nodes_dict:
-                        _log_missing_connection_node(
-                            "target",
+                        warnings.add(
+                            "missing_target_node",
+                            source_name,
                             str(target_node_name),
-                            warnings,
-                            source_name_context=source_name,
+                            node_id=source_id,
+                        )
+                        logger.debug(
+                            "Connection target node '%s' from '%s' not found.",
+                            target_node_name,
+                            source_name,
                         )
                         connection_parse_errors += 1
                         continue
 
                     target_node = nodes_dict[target_id]
 
-                    # Construct port names
-                    source_port_name = f"{conn_type}_{port_index}"
                     # Target port name often just the type
                     target_port_name = (
                         str(target_port_type) if target_port_type else conn_type
                     )
 
-                    detail = ConnectionDetail(
+                    edge = EdgeRecord(
                         source_node_id=source_id,
-                        source_port_name=source_port_name,
+                        source_port_index=port_index,
                         target_node_id=target_id,
                         target_port_name=target_port_name,
                         connection_type=conn_type,
                     )
 
-                    source_node.connectivity.outgoing_connections.append(detail)
-                    target_node.connectivity.incoming_connections.append(detail)
+                    source_node.add_outgoing(edge)
+                    target_node.add_incoming(edge)
                     total_connections_processed += 1
 
                     logger.debug(
-                        "Mapped connection: %s (%s) -> %s (%s) via type %s",
+                        "Mapped connection: %s (%s_%d) -> %s (%s) via type %s",
                         source_id,
-                        source_port_name,
+                        conn_type,
+                        port_index,
                         target_id,
                         target_port_name,
                         conn_type,
@@ -187,10 +178,7 @@ def map_connections(
         total_connections_processed,
     )
     if connection_parse_errors > 0:
-        warnings.append(
-            f"{connection_parse_errors} connection issues found during mapping "
-            "(see logs/previous warnings)."
-        )
+        warnings.add("connection_issues", connection_parse_errors)
         logger.warning(
             "Phase 2: %d connection issues found (check logs).",
             connection_parse_errors,
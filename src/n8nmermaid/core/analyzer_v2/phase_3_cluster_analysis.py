@@ -2,170 +2,142 @@
 """Phase 3: Identify clusters based on non-main connections."""
 
 import logging
-from collections import deque
 
-from .models import AnalyzedNodeV2, ClusterInfoV2, ClusterRole
+from .constants import MAIN_CONNECTION_TYPE
+from .diagnostics import WarningCollector
+from .graph import NodeRecord
+from .models import ClusterRole
 
 logger = logging.getLogger(__name__)
 
 
-def _has_main_connections(node: AnalyzedNodeV2) -> bool:
-    """Check if a node has any incoming or outgoing main connections."""
-    for conn in node.connectivity.incoming_connections:
-        if conn.connection_type == "main":
-            return True
-    for conn in node.connectivity.outgoing_connections:
-        if conn.connection_type == "main":
-            return True
-    return False
-
-
-def _has_non_main_connections(node: AnalyzedNodeV2) -> bool:
-    """Check if a node has any incoming or outgoing non-main connections."""
-    for conn in node.connectivity.incoming_connections:
-        if conn.connection_type != "main":
-            return True
-    for conn in node.connectivity.outgoing_connections:
-        if conn.connection_type != "main":
-            return True
-    return False
-
-
-def _get_non_main_neighbors(
-    node_id: str, nodes_dict: dict[str, AnalyzedNodeV2]
-) -> set[str]:
-    """Get IDs of neighbors connected via non-main links."""
-    neighbors = set()
-    node = nodes_dict.get(node_id)
-    if not node:
-        return neighbors
-
-    for conn in node.connectivity.outgoing_connections:
-        if conn.connection_type != "main":
-            neighbors.add(conn.target_node_id)
-    for conn in node.connectivity.incoming_connections:
-        if conn.connection_type != "main":
-            neighbors.add(conn.source_node_id)
-    return neighbors
-
-
-def analyze_clusters(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
+class _DisjointSet:
+    """Union-find over node IDs with path halving and union by size."""
+
+    __slots__ = ("parent", "size")
+
+    def __init__(self) -> None:
+        self.parent: dict[str, str] = {}
+        self.size: dict[str, int] = {}
+
+    def find(self, item: str) -> str:
+        parent = self.parent
+        if item not in parent:
+            parent[item] = item
+            self.size[item] = 1
+            return item
+        while parent[item] != item:
+            parent[item] = parent[parent[item]]
+            item = parent[item]
+        return item
+
+    def union(self, a: str, b: str) -> None:
+        root_a, root_b = self.find(a), self.find(b)
+        if root_a == root_b:
+            return
+        if self.size[root_a] < self.size[root_b]:
+            root_a, root_b = root_b, root_a
+        self.parent[root_b] = root_a
+        self.size[root_a] += self.size[root_b]
+
+
+def _label_components(nodes_dict: dict[str, NodeRecord]) -> _DisjointSet:
+    """Unions the endpoints of every non-main edge in a single pass."""
+    components = _DisjointSet()
+    for node_id, node in nodes_dict.items():
+        if not node.has_non_main_connections:
+            continue
+        for conn_type, edges in node.outgoing_by_type.items():
+            if conn_type == MAIN_CONNECTION_TYPE:
+                continue
+            for edge in edges:
+                components.union(node_id, edge.target_node_id)
+    return components
+
+
+def analyze_clusters(nodes_dict: dict[str, NodeRecord]) -> WarningCollector:
     """
     Identifies clusters based on non-'main' connections and assigns roles.
 
-    Updates the `cluster` attribute of nodes involved in clusters.
+    Labels the connected components of the non-main subgraph with union-find,
+    then walks each component containing a potential root (a node with both
+    main and non-main connections) once, breadth-first from its first root in
+    node order. Any other potential roots in that component join its cluster
+    as members, like every other node the walk reaches. A member becomes a
+    SubRoot if it links onward to a member discovered after it, otherwise a
+    Sub. Runs in O(N + E).
+
+    Updates the cluster root and role of nodes involved in clusters.
 
     Args:
-        nodes_dict: Dictionary mapping node IDs to AnalyzedNodeV2 objects.
+        nodes_dict: Dictionary mapping node IDs to NodeRecord objects.
 
     Returns:
-        A list of warning messages generated during cluster analysis.
+        The warnings generated during cluster analysis.
     """
-    warnings: list[str] = []
-    potential_roots = set()
-    nodes_in_clusters: set[str] = set()
+    warnings = WarningCollector()
+    components = _label_components(nodes_dict)
 
-    # 1. Identify potential cluster roots
+    # 1. Identify potential cluster roots, grouped by component
+    roots_by_component: dict[str, list[str]] = {}
     for node_id, node in nodes_dict.items():
-        if _has_main_connections(node) and _has_non_main_connections(node):
-            potential_roots.add(node_id)
+        if node.has_main_connections and node.has_non_main_connections:
+            roots_by_component.setdefault(components.find(node_id), []).append(
+                node_id
+            )
             logger.debug(
                 "Identified potential cluster root: %s (%s)", node_id, node.name
             )
 
-    cluster_count = 0
-
-    # 2. Perform BFS from each root to identify cluster members
-    for root_id in potential_roots:
-        if root_id in nodes_in_clusters:
-            continue
-
+    # 2. Walk each component once from its first root to assign roles
+    for component_roots in roots_by_component.values():
+        root_id = component_roots[0]
         root_node = nodes_dict[root_id]
-        root_node.cluster = ClusterInfoV2(
-            is_clustered=True, cluster_root_id=root_id, cluster_role=ClusterRole.ROOT
-        )
-        nodes_in_clusters.add(root_id)
-        cluster_count += 1
         logger.info(
             "Starting cluster analysis for root: %s (%s)", root_id, root_node.name
         )
 
-        queue: deque[str] = deque([root_id])
-        visited_in_this_cluster: set[str] = {root_id}
-
-        while queue:
-            current_id = queue.popleft()
-            # current_node variable removed as it was unused (F841 fix)
-
-            neighbors = _get_non_main_neighbors(current_id, nodes_dict)
+        for other_root_id in component_roots[1:]:
+            logger.debug(
+                "Potential root %s joins the cluster of %s.", other_root_id, root_id
+            )
 
+        discovery_order: dict[str, int] = {root_id: 0}
+        members: list[tuple[str, list[str]]] = []
+        index = 0
+        queue = [root_id]
+        while index < len(queue):
+            current_id = queue[index]
+            index += 1
+            neighbors = nodes_dict[current_id].non_main_neighbor_ids()
+            members.append((current_id, neighbors))
             for neighbor_id in neighbors:
-                if (
-                    neighbor_id not in nodes_dict
-                    or neighbor_id in visited_in_this_cluster
-                ):
-                    continue
-
-                neighbor_node = nodes_dict[neighbor_id]
-
-                # Only add nodes that have non-main connections or are potential roots
-                if (
-                    not _has_non_main_connections(neighbor_node)
-                    and neighbor_id not in potential_roots
-                ):
-                    continue
-
-                if (
-                    neighbor_id in nodes_in_clusters
-                    and neighbor_node.cluster.cluster_root_id != root_id
-                ):
-                    warnings.append(
-                        f"Node {neighbor_id} connected to multiple cluster roots "
-                        f"({root_id} and {neighbor_node.cluster.cluster_root_id}). "
-                        "Analysis might be ambiguous."
-                    )
-                    logger.warning(
-                        "Node %s seems connected to multiple " "cluster roots.",
-                        neighbor_id,
-                    )
-                    continue
-
-                visited_in_this_cluster.add(neighbor_id)
-                nodes_in_clusters.add(neighbor_id)
-
-                # Determine role (SubRoot or Sub) - simplified logic
-                has_unvisited_non_main_neighbors = False
-                neighbor_neighbors = _get_non_main_neighbors(neighbor_id, nodes_dict)
-                for nn_id in neighbor_neighbors:
-                    neighbor_neighbor_node = nodes_dict.get(
-                        nn_id, AnalyzedNodeV2(id="", name="", type="")
-                    )
-                    if (
-                        nn_id not in visited_in_this_cluster
-                        and _has_non_main_connections(neighbor_neighbor_node)
-                    ):
-                        has_unvisited_non_main_neighbors = True
-                        break
-
-                role = (
-                    ClusterRole.SUB_ROOT
-                    if has_unvisited_non_main_neighbors
-                    else ClusterRole.SUB
-                )
-
-                neighbor_node.cluster = ClusterInfoV2(
-                    is_clustered=True, cluster_root_id=root_id, cluster_role=role
-                )
-                logger.debug(
-                    "Assigned node %s (%s) to cluster %s with role %s",
-                    neighbor_id,
-                    neighbor_node.name,
-                    root_id,
-                    role,
-                )
-                queue.append(neighbor_id)
+                if neighbor_id in nodes_dict and neighbor_id not in discovery_order:
+                    discovery_order[neighbor_id] = len(discovery_order)
+                    queue.append(neighbor_id)
+
+        root_node.cluster_root_id = root_id
+        root_node.cluster_role = ClusterRole.ROOT
+        for member_id, neighbors in members[1:]:
+            order = discovery_order[member_id]
+            role = (
+                ClusterRole.SUB_ROOT
+                if any(discovery_order.get(nb, -1) > order for nb in neighbors)
+                else ClusterRole.SUB
+            )
+            member_node = nodes_dict[member_id]
+            member_node.cluster_root_id = root_id
+            member_node.cluster_role = role
+            logger.debug(
+                "Assigned node %s (%s) to cluster %s with role %s",
+                member_id,
+                member_node.name,
+                root_id,
+                role,
+            )
 
     logger.info(
-        "Phase 3: Cluster analysis complete. Identified %d cluster(s).", cluster_count
+        "Phase 3: Cluster analysis complete. Identified %d cluster(s).",
+        len(roots_by_component),
     )
     return warnings
@@ -4,37 +4,33 @@
 import logging
 
 from .constants import STICKY_NODE_TYPE
-from .models import AnalyzedNodeV2, ClusterRole, NodeGroupType
+from .diagnostics import WarningCollector
+from .graph import NodeRecord
+from .models import ClusterRole, NodeGroupType
 
 logger = logging.getLogger(__name__)
 
 
-def _is_potential_router(node: AnalyzedNodeV2) -> bool:
+def _is_potential_router(node: NodeRecord) -> bool:
     """Check if a node acts as a router based on outgoing main ports."""
-    main_output_ports_used = set()
-    for conn in node.connectivity.outgoing_connections:
-        if conn.connection_type == "main" and conn.source_port_name.startswith(
-            "main_"
-        ):
-            main_output_ports_used.add(conn.source_port_name)
     # If more than one distinct main output port (e.g., main_0, main_1) is used
-    return len(main_output_ports_used) > 1
+    return node.main_output_port_count > 1
 
 
-def classify_nodes(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
+def classify_nodes(nodes_dict: dict[str, NodeRecord]) -> WarningCollector:
     """
     Classifies each node's group type and determines if it's an end node.
 
-    Updates the `classification` field of each AnalyzedNodeV2. Needs to run
-    AFTER cluster analysis (Phase 3).
+    Updates the `group_type` and `is_end_node` fields of each NodeRecord. Needs
+    to run AFTER cluster analysis (Phase 3).
 
     Args:
-        nodes_dict: Dictionary mapping node IDs to AnalyzedNodeV2 objects.
+        nodes_dict: Dictionary mapping node IDs to NodeRecord objects.
 
     Returns:
-        A list of warning messages generated during classification.
+        The warnings generated during classification.
     """
-    warnings: list[str] = []
+    warnings = WarningCollector()
     classification_counts: dict[NodeGroupType, int] = {}
 
     if not nodes_dict:
@@ -43,37 +39,27 @@ def classify_nodes(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
 
     for node_id, node in nodes_dict.items():
         # 1. Determine if it's an end node (no outgoing main connections)
-        has_outgoing_main = any(
-            conn.connection_type == "main"
-            for conn in node.connectivity.outgoing_connections
-        )
-        node.classification.is_end_node = not has_outgoing_main
+        node.is_end_node = node.main_out_degree == 0
 
         # 2. Determine Group Type based on priority
         group_type = NodeGroupType.UNKNOWN  # Default
 
         if node.type == STICKY_NODE_TYPE:
             group_type = NodeGroupType.STICKY
-        elif node.cluster.is_clustered:
+        elif node.is_clustered:
             # Assign type based on cluster role determined in Phase 3
-            if node.cluster.cluster_role == ClusterRole.ROOT:
+            if node.cluster_role == ClusterRole.ROOT:
                 group_type = NodeGroupType.CLUSTER_ROOT
-            elif node.cluster.cluster_role == ClusterRole.SUB_ROOT:
+            elif node.cluster_role == ClusterRole.SUB_ROOT:
                 group_type = NodeGroupType.CLUSTER_SUB_ROOT
-            elif node.cluster.cluster_role == ClusterRole.SUB:
+            elif node.cluster_role == ClusterRole.SUB:
                 group_type = NodeGroupType.CLUSTER_SUB
             else:
-                warnings.append(
-                    f"Node {node_id} is clustered but has no role assigned."
-                )
+                warnings.add("clustered_without_role", node_id, node_id=node_id)
                 group_type = NodeGroupType.UNKNOWN
         else:
             # Node is not Sticky and not part of a cluster
-            has_incoming_main = any(
-                conn.connection_type == "main"
-                for conn in node.connectivity.incoming_connections
-            )
-            if not has_incoming_main:
+            if node.main_in_degree == 0:
                 group_type = NodeGroupType.TRIGGER
             elif _is_potential_router(node):
                 group_type = NodeGroupType.ROUTER
@@ -81,7 +67,7 @@ def classify_nodes(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
                 # Standard node in the main flow
                 group_type = NodeGroupType.ACTION
 
-        node.classification.group_type = group_type
+        node.group_type = group_type
         classification_counts[group_type] = (
             classification_counts.get(group_type, 0) + 1
         )
@@ -90,7 +76,7 @@ def classify_nodes(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
             node_id,
             node.name,
             group_type.value,
-            node.classification.is_end_node,
+            node.is_end_node,
         )
 
     logger.info(
@@ -101,12 +87,11 @@ def classify_nodes(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
         unknown_ids = [
             nid
             for nid, n in nodes_dict.items()
-            if n.classification.group_type == NodeGroupType.UNKNOWN
+            if n.group_type == NodeGroupType.UNKNOWN
         ]
-        warning_msg = (
-            f"Found {unknown_nodes} nodes with Unknown classification: {unknown_ids}"
+        warnings.add("unknown_classification", unknown_nodes, unknown_ids)
+        logger.warning(
+            "Phase 4: Found %d nodes with Unknown classification.", unknown_nodes
         )
-        warnings.append(warning_msg)
-        logger.warning(warning_msg)
 
     return warnings
@@ -2,72 +2,170 @@
 """Phase 5: Generic flattening of raw node parameters."""
 
 import logging
+from collections.abc import Iterator
 from typing import Any
 
-from .models import AnalyzedNodeV2
+from .constants import PARAM_FLATTEN_MAX_DEPTH, PARAM_FLATTEN_MAX_ENTRIES
+from .diagnostics import WarningCollector
+from .graph import NodeRecord
 
 logger = logging.getLogger(__name__)
 
+# Yielded by _walk in place of a value when a container exceeds max_depth
+_DEPTH_LIMIT_REACHED = object()
 
-def _flatten_dict(
-    data: Any, parent_key: str = "", sep: str = "."
-) -> dict[str, Any]:
+
+def _walk(data: Any, sep: str, max_depth: int | None) -> Iterator[tuple[str, Any]]:
+    """
+    Walks a nested dict/list structure depth-first with an explicit stack.
+
+    Yields `(path, value)` for every leaf, in the same order a recursive
+    traversal would. Containers nested deeper than `max_depth` are not
+    entered; `(path, _DEPTH_LIMIT_REACHED)` is yielded for them instead.
     """
-    Recursively flattens a nested dictionary or list structure.
+    if isinstance(data, dict):
+        stack = [(iter(data.items()), "", False)]
+    elif isinstance(data, list):
+        stack = [(enumerate(data), "", True)]
+    else:
+        return
+
+    while stack:
+        items, parent_key, is_list = stack[-1]
+        for k, v in items:
+            if is_list:
+                key = f"{parent_key}{sep}{k}" if parent_key else str(k)
+            else:
+                key = f"{parent_key}{sep}{k}" if parent_key else k
+
+            if isinstance(v, dict):
+                if v:
+                    if max_depth is not None and len(stack) >= max_depth:
+                        yield key, _DEPTH_LIMIT_REACHED
+                        continue
+                    stack.append((iter(v.items()), key, False))
+                    break
+            elif isinstance(v, list):
+                if v:
+                    if max_depth is not None and len(stack) >= max_depth:
+                        yield key, _DEPTH_LIMIT_REACHED
+                        continue
+                    stack.append((enumerate(v), key, True))
+                    break
+            elif key:
+                yield key, v
+        else:
+            stack.pop()
+
+
+def iter_flattened(
+    data: Any, sep: str = ".", max_depth: int | None = None
+) -> Iterator[tuple[str, Any]]:
+    """
+    Lazily flattens a nested dictionary or list structure.
 
     Args:
         data: The dictionary or list to flatten.
-        parent_key: The base key string to prepend to flattened keys.
         sep: The separator character between keys.
+        max_depth: Optional nesting limit; deeper containers are skipped.
+
+    Yields:
+        `(flattened_key, value)` pairs in depth-first order. A key may repeat
+        if the input already contains flattened-looking keys.
+    """
+    for key, value in _walk(data, sep, max_depth):
+        if value is not _DEPTH_LIMIT_REACHED:
+            yield key, value
+
+
+def flatten_parameters(
+    data: Any,
+    sep: str = ".",
+    max_depth: int | None = PARAM_FLATTEN_MAX_DEPTH,
+    max_entries: int | None = PARAM_FLATTEN_MAX_ENTRIES,
+) -> tuple[dict[str, Any], bool, bool]:
+    """
+    Flattens a nested dictionary or list structure into a single dictionary.
+
+    Args:
+        data: The dictionary or list to flatten.
+        sep: The separator character between keys.
+        max_depth: Containers nested deeper than this are skipped.
+        max_entries: Flattening stops once this many values were extracted.
 
     Returns:
-        A flattened dictionary.
+        A tuple of (flattened dictionary, depth limit hit, entry limit hit).
     """
     items: dict[str, Any] = {}
-    if isinstance(data, dict):
-        for k, v in data.items():
-            new_key = f"{parent_key}{sep}{k}" if parent_key else k
-            items.update(_flatten_dict(v, new_key, sep=sep))
-    elif isinstance(data, list):
-        # Create indexed keys for list items
-        for i, v in enumerate(data):
-            new_key = f"{parent_key}{sep}{i}" if parent_key else str(i)
-            items.update(_flatten_dict(v, new_key, sep=sep))
-    else:
-        # Base case: value is simple type
-        if parent_key:
-            items[parent_key] = data
-        # If initial data is simple type, returns empty (shouldn't happen with params)
+    depth_limited = False
+    entries = 0
 
-    return items
+    for key, value in _walk(data, sep, max_depth):
+        if value is _DEPTH_LIMIT_REACHED:
+            depth_limited = True
+            continue
+        if max_entries is not None and entries >= max_entries:
+            return items, depth_limited, True
+        items[key] = value
+        entries += 1
 
+    return items, depth_limited, False
 
-def extract_parameters(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
+
+def extract_parameters(
+    nodes_dict: dict[str, NodeRecord],
+    max_depth: int | None = PARAM_FLATTEN_MAX_DEPTH,
+    max_entries: int | None = PARAM_FLATTEN_MAX_ENTRIES,
+) -> WarningCollector:
     """
     Flattens the raw_parameters for each node into extracted_parameters.
 
     Args:
-        nodes_dict: Dictionary mapping node IDs to AnalyzedNodeV2 objects.
+        nodes_dict: Dictionary mapping node IDs to NodeRecord objects.
+        max_depth: Maximum parameter nesting depth flattened per node.
+        max_entries: Maximum number of flattened parameters kept per node.
 
     Returns:
-        A list of warning messages (currently none generated here).
+        The warnings generated during extraction, e.g. for nodes whose
+        parameters were truncated by the limits.
     """
-    warnings: list[str] = []
+    warnings = WarningCollector()
     nodes_processed = 0
     total_params_extracted = 0
 
     for node_id, node in nodes_dict.items():
         try:
             if isinstance(node.raw_parameters, dict):
-                flattened = _flatten_dict(node.raw_parameters)
+                flattened, depth_limited, entries_limited = flatten_parameters(
+                    node.raw_parameters, max_depth=max_depth, max_entries=max_entries
+                )
                 node.extracted_parameters = flattened
                 total_params_extracted += len(flattened)
+                if depth_limited:
+                    warnings.add(
+                        "parameters_too_deep",
+                        node_id,
+                        node.name,
+                        max_depth,
+                        node_id=node_id,
+                    )
+                if entries_limited:
+                    warnings.add(
+                        "parameters_truncated",
+                        node_id,
+                        node.name,
+                        max_entries,
+                        node_id=node_id,
+                    )
             else:
-                warnings.append(
-                    f"Node {node_id} ('{node.name}') has non-dict raw_parameters "
-                    f"type: {type(node.raw_parameters)}. Skipping extraction."
+                warnings.add(
+                    "parameters_not_dict",
+                    node_id,
+                    node.name,
+                    type(node.raw_parameters),
+                    node_id=node_id,
                 )
-                logger.warning(
+                logger.debug(
                     "Node %s ('%s') has non-dict raw_parameters type: %s.",
                     node_id,
                     node.name,
@@ -75,8 +173,12 @@ def extract_parameters(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
                 )
             nodes_processed += 1
         except Exception as e:
-            warnings.append(
-                f"Error flattening parameters for node {node_id} ('{node.name}'): {e}"
+            warnings.add(
+                "parameter_extraction_error",
+                node_id,
+                node.name,
+                str(e),
+                node_id=node_id,
             )
             logger.exception("Error during parameter flattening for node %s", node_id)
 
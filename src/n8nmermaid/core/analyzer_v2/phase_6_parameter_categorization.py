@@ -2,26 +2,71 @@
 """Phase 6: Categorize extracted parameters based on keywords."""
 
 import logging
+import re
+from functools import lru_cache
 
-from .constants import PARAM_CATEGORIES
-from .models import AnalyzedNodeV2
+from .constants import PARAM_CATEGORIES, PARAM_CATEGORY_CACHE_SIZE
+from .diagnostics import WarningCollector
+from .graph import NodeRecord
 
 logger = logging.getLogger(__name__)
 
 
-def categorize_parameters(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
+def _compile_category_matchers() -> list[tuple[str, re.Pattern[str]]]:
+    """
+    Builds one alternation pattern per category, in PARAM_CATEGORIES order.
+
+    A keyword matches when it is a substring of any dot-separated part of the
+    lower-cased key. Keywords contain no dots, so this is the same as a plain
+    substring search over the whole key. Patterns stay case-sensitive, so
+    keywords with capitals (e.g. "systemMessage") never match a lowered key.
+    """
+    matchers = []
+    for category, keywords in PARAM_CATEGORIES.items():
+        usable = [keyword for keyword in keywords if "." not in keyword]
+        if usable:
+            pattern = "|".join(re.escape(keyword) for keyword in usable)
+            matchers.append((category, re.compile(pattern)))
+    return matchers
+
+
+_CATEGORY_MATCHERS = _compile_category_matchers()
+
+
+@lru_cache(maxsize=PARAM_CATEGORY_CACHE_SIZE)
+def categorize_key(param_key: str) -> str | None:
+    """
+    Returns the first category whose keywords match a flattened parameter key.
+
+    Results are memoized, so keys repeated across nodes and workflows (e.g.
+    "options.systemMessage") are matched only once.
+
+    Args:
+        param_key: A flattened parameter key, e.g. "options.temperature".
+
+    Returns:
+        The category name, or None if no keyword matches.
+    """
+    key_lower = param_key.lower()
+    for category, matcher in _CATEGORY_MATCHERS:
+        if matcher.search(key_lower):
+            return category
+    return None
+
+
+def categorize_parameters(nodes_dict: dict[str, NodeRecord]) -> WarningCollector:
     """
     Categorizes extracted parameters based on keywords defined in constants.
 
-    Updates the `parameter_categories` field of each AnalyzedNodeV2.
+    Updates the `parameter_categories` field of each NodeRecord.
 
     Args:
-        nodes_dict: Dictionary mapping node IDs to AnalyzedNodeV2 objects.
+        nodes_dict: Dictionary mapping node IDs to NodeRecord objects.
 
     Returns:
-        A list of warning messages (currently none generated here).
+        The warnings generated here (currently none).
     """
-    warnings: list[str] = []
+    warnings = WarningCollector()
     nodes_processed = 0
     categories_found_count = 0
 
@@ -30,20 +75,9 @@ def categorize_parameters(nodes_dict: dict[str, AnalyzedNodeV2]) -> list[str]:
         categories: dict[str, list[str]] = {}
         # Use `in dict` instead of `in dict.keys()` (SIM118 fix)
         for param_key in node.extracted_parameters:
-            key_lower = param_key.lower()
-            for category, keywords in PARAM_CATEGORIES.items():
-                # Check if any keyword is a substring of the parameter key part
-                key_parts = key_lower.split(".")
-                found_in_category = False
-                for keyword in keywords:
-                    # Check if keyword matches exactly any part or is a substring
-                    if any(part == keyword or keyword in part for part in key_parts):
-                        categories.setdefault(category, []).append(param_key)
-                        found_in_category = True
-                        break  # Assign to first matching category found
-                # If assigned to a category, stop checking other categories
-                if found_in_category:
-                    break
+            category = categorize_key(param_key)
+            if category is not None:
+                categories.setdefault(category, []).append(param_key)
 
         if categories:
             node.parameter_categories = categories
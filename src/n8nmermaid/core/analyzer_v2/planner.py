@@ -0,0 +1,79 @@
+# filename: src/n8nmermaid/core/analyzer_v2/planner.py
+"""
+Phase planning for the V2 analyzer.
+
+Maps the analysis fields a consumer (generator or report) reads to the
+analysis phases that populate them, including the phases those depend on.
+"""
+
+from collections.abc import Iterable
+from typing import Literal
+
+AnalysisField = Literal[
+    "nodes",  # Phase 1: basic node info, raw_parameters, credentials
+    "connections",  # Phase 2: incoming/outgoing edges and the typed index
+    "clusters",  # Phase 3: cluster_root_id / cluster_role
+    "classification",  # Phase 4: group_type / is_end_node
+    "extracted_parameters",  # Phase 5: flattened parameters
+    "parameter_categories",  # Phase 6: categorized parameter keys
+]
+
+ALL_PHASES: tuple[int, ...] = (1, 2, 3, 4, 5, 6)
+
+# Which phase populates each analysis field
+FIELD_PHASES: dict[AnalysisField, int] = {
+    "nodes": 1,
+    "connections": 2,
+    "clusters": 3,
+    "classification": 4,
+    "extracted_parameters": 5,
+    "parameter_categories": 6,
+}
+
+# Phases each phase reads the results of (direct dependencies only)
+PHASE_DEPENDENCIES: dict[int, tuple[int, ...]] = {
+    1: (),
+    2: (1,),
+    3: (2,),
+    4: (3,),
+    5: (1,),
+    6: (5,),
+}
+
+
+def plan_phases(
+    fields: Iterable[AnalysisField] | None = None,
+    completed: Iterable[int] = (),
+) -> list[int]:
+    """
+    Determines which analysis phases must run to provide the given fields.
+
+    Args:
+        fields: The analysis fields required by the caller. None means every
+            field (the full analysis).
+        completed: Phases that already ran and can be skipped.
+
+    Returns:
+        The phase numbers to run, in execution order.
+
+    Raises:
+        ValueError: If an unknown analysis field is requested.
+    """
+    if fields is None:
+        required = set(ALL_PHASES)
+    else:
+        required = set()
+        pending: list[int] = []
+        for field in fields:
+            phase = FIELD_PHASES.get(field)
+            if phase is None:
+                raise ValueError(f"Unknown analysis field: '{field}'")
+            pending.append(phase)
+        while pending:
+            phase = pending.pop()
+            if phase not in required:
+                required.add(phase)
+                pending.extend(PHASE_DEPENDENCIES[phase])
+
+    done = set(completed)
+    return [phase for phase in ALL_PHASES if phase in required and phase not in done]
@@ -1,8 +1,11 @@
 # src/n8nmermaid/core/generators/mermaid_v2/__init__.py
 """
-V2 Mermaid diagram generation module.
+V2 diagram generation module: Mermaid, Graphviz DOT and JSON graph output.
 """
 
+from collections.abc import Iterable
+
+from n8nmermaid.core.analyzer_v2.graph import WorkflowGraph
 from n8nmermaid.core.analyzer_v2.models import WorkflowAnalysisV2
 from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
 
@@ -10,13 +13,13 @@ from .generator import MermaidGeneratorV2
 
 
 def generate_mermaid_v2(
-    analysis: WorkflowAnalysisV2, params: MermaidGenerationParamsV2
+    analysis: WorkflowGraph | WorkflowAnalysisV2, params: MermaidGenerationParamsV2
 ) -> dict[str, str]:
     """
     Generates Mermaid diagrams from V2 workflow analysis results.
 
     Args:
-        analysis: The WorkflowAnalysisV2 object containing analyzed data.
+        analysis: The WorkflowGraph (or WorkflowAnalysisV2) with analyzed data.
         params: The MermaidGenerationParamsV2 specifying diagram options.
 
     Returns:
@@ -27,7 +30,30 @@ def generate_mermaid_v2(
     return generator.generate()
 
 
+def generate_mermaid_variants_v2(
+    analysis: WorkflowGraph | WorkflowAnalysisV2,
+    variants: Iterable[MermaidGenerationParamsV2],
+) -> list[dict[str, str]]:
+    """
+    Generates Mermaid diagrams for several parameter sets from one analysis.
+
+    Args:
+        analysis: The WorkflowGraph (or WorkflowAnalysisV2) with analyzed data.
+        variants: The MermaidGenerationParamsV2 sets to render.
+
+    Returns:
+        One diagram dictionary (as returned by generate_mermaid_v2) per
+        variant, in the same order.
+    """
+    variants = list(variants)
+    if not variants:
+        return []
+    generator = MermaidGeneratorV2(analysis=analysis, params=variants[0])
+    return generator.generate_variants(variants)
+
+
 __all__ = [
     "MermaidGeneratorV2",
     "generate_mermaid_v2",
+    "generate_mermaid_variants_v2",
 ]
@@ -1,46 +1,54 @@
 # src/n8nmermaid/core/generators/mermaid_v2/connection_definitions.py
-"""Functions for generating V2 Mermaid connection definitions."""
+"""
+Functions for resolving V2 diagram connections.
+
+Edges are returned keyed by their Mermaid link text (DiagramEdge.key),
+which deduplicates them and gives their order.
+"""
 
 import logging
+from collections.abc import Iterable
 
-from .constants import N8N_CONNECTION_TYPE_MAIN
-from n8nmermaid.core.analyzer_v2.models import (
-    AnalyzedNodeV2,
-    ConnectionDetail,
-    WorkflowAnalysisV2,
-)
-from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
+from n8nmermaid.core.analyzer_v2.graph import EdgeRecord, NodeRecord, WorkflowGraph
+from n8nmermaid.models_v2.request_v2_models import SubgraphDisplayMode
 
-from .constants import END_SYMBOL_SUFFIX, START_SYMBOL_SUFFIX
-from .helpers import get_connection_label_parts, get_display_ids_and_context
+from .constants import (
+    END_SYMBOL_SUFFIX,
+    N8N_CONNECTION_TYPE_MAIN,
+    START_SYMBOL_SUFFIX,
+)
+from .helpers import build_display_ids, get_connection_label
+from .ir import DiagramEdge
 
 logger = logging.getLogger(__name__)
 
 
 def _process_single_connection(
-    source_node: AnalyzedNodeV2,
-    connection: ConnectionDetail,
-    analysis_nodes: dict[str, AnalyzedNodeV2],
-    params: MermaidGenerationParamsV2,
+    source_node: NodeRecord,
+    connection: EdgeRecord,
+    display_ids: dict[str, str],
+    subgraph_ids: set[str],
+    mode: SubgraphDisplayMode,
     visible_diagram_element_ids: set[str],
-) -> str | None:
+) -> DiagramEdge | None:
     """
     Processes a single connection detail.
 
     Args:
         source_node: The node where the connection originates.
         connection: The connection detail object.
-        analysis_nodes: A dictionary mapping node IDs to AnalyzedNodeV2 objects.
-        params: Mermaid generation parameters.
+        display_ids: Node ID to display element ID map (see build_display_ids).
+        subgraph_ids: Display element IDs that are subgraphs.
+        mode: The subgraph display mode.
         visible_diagram_element_ids: Set of IDs visible in the current diagram context.
 
     Returns:
-        A Mermaid diagram link string, or None if the connection should be skipped.
+        The resolved edge, or None if the connection should be skipped.
     """
     target_id = connection.target_node_id
-    target_node = analysis_nodes.get(target_id)
+    disp_tgt = display_ids.get(target_id)
 
-    if not target_node:
+    if disp_tgt is None:
         logger.warning(
             "Connection source %s links to unknown target %s (%s). Skipping.",
             source_node.id,
@@ -49,25 +57,20 @@ def _process_single_connection(
         )
         return None
 
-    disp_src, disp_tgt, log_ctx = get_display_ids_and_context(
-        source_node, target_node, params
-    )
+    disp_src = display_ids[source_node.id]
 
     if disp_src == disp_tgt:
         logger.debug(
             "Skipping connection %s -> %s as source/target resolve to "
-            "same display ID: %s (Context: %s, Mode: %s)",
+            "same display ID: %s (Mode: %s)",
             source_node.id,
             target_id,
             disp_src,
-            log_ctx,
-            params.subgraph_display_mode,
+            mode,
         )
         return None
 
-    is_subgraph_link = params.subgraph_display_mode == "subgraph" and (
-        "_graph" in disp_src or "_graph" in disp_tgt
-    )
+    is_subgraph_link = disp_src in subgraph_ids or disp_tgt in subgraph_ids
 
     if not is_subgraph_link and not (
         disp_src in visible_diagram_element_ids
@@ -80,148 +83,161 @@ def _process_single_connection(
             target_id,
             disp_src,
             disp_tgt,
-            params.subgraph_display_mode,
+            mode,
         )
         return None
 
-    arrow = (
-        "-->"
-        if connection.connection_type == N8N_CONNECTION_TYPE_MAIN
-        else "-.->"
+    edge = DiagramEdge(
+        disp_src,
+        disp_tgt,
+        connection.connection_type,
+        get_connection_label(source_node, connection),
     )
-    label_parts = get_connection_label_parts(source_node, connection)
-    label_str = f'|"{" ".join(label_parts)}"|' if label_parts else ""
-
-    mermaid_link = f"{disp_src} {arrow}{label_str} {disp_tgt}"
-
     logger.debug(
-        "Formatted %s link (%s, Mode: %s): %s",
+        "Resolved %s link (Mode: %s): %s -> %s",
         connection.connection_type,
-        log_ctx,
-        params.subgraph_display_mode,
-        mermaid_link,
+        mode,
+        disp_src,
+        disp_tgt,
     )
-    return mermaid_link
+    return edge
+
+
+def generate_internal_connections(
+    analysis: WorkflowGraph, member_ids: Iterable[str]
+) -> list[DiagramEdge]:
+    """
+    Generates the edges between the members of a cluster (V2).
+
+    Used for subgraphs in the main diagram and for separate cluster diagrams.
+
+    Args:
+        analysis: The V2 workflow analysis results.
+        member_ids: The IDs of the cluster's nodes (root included).
+
+    Returns:
+        The edges between member nodes, in Mermaid link text order.
+    """
+    members = set(member_ids)
+    edges: dict[str, DiagramEdge] = {}
+    for member_id in members:
+        source_node = analysis.nodes.get(member_id)
+        if not source_node:
+            continue
+
+        for connection in source_node.outgoing:
+            target_id = connection.target_node_id
+            if target_id in members:
+                edge = DiagramEdge(
+                    member_id,
+                    target_id,
+                    connection.connection_type,
+                    get_connection_label(source_node, connection),
+                )
+                edges.setdefault(edge.key, edge)
+    return [edges[edge_key] for edge_key in sorted(edges)]
 
 
 def generate_node_connections(
-    analysis: WorkflowAnalysisV2,
-    params: MermaidGenerationParamsV2,
+    analysis: WorkflowGraph,
+    mode: SubgraphDisplayMode,
     visible_diagram_element_ids: set[str],
-) -> list[str]:
+    display_ids: tuple[dict[str, str], set[str]] | None = None,
+) -> dict[str, DiagramEdge]:
     """
-    Generates Mermaid connection lines for the main diagram (V2).
+    Generates the edges between top-level elements of the main diagram (V2).
 
     Args:
         analysis: The V2 workflow analysis results.
-        params: Mermaid generation parameters (V2).
+        mode: The subgraph display mode.
         visible_diagram_element_ids: Set of node/subgraph IDs visible.
+        display_ids: The result of build_display_ids for the analysis and
+            mode, if already computed.
 
     Returns:
-        A list of strings, each representing a Mermaid connection definition.
+        The unique edges, keyed by their Mermaid link text.
     """
-    definitions: set[str] = set()
+    node_display_ids, subgraph_ids = display_ids or build_display_ids(
+        analysis.nodes, mode
+    )
+    definitions: dict[str, DiagramEdge] = {}
     connection_errors = 0
 
     for _, source_node in sorted(analysis.nodes.items()):
-        for connection in source_node.connectivity.outgoing_connections:
-            mermaid_link = _process_single_connection(
+        for connection in source_node.outgoing:
+            edge = _process_single_connection(
                 source_node,
                 connection,
-                analysis.nodes,
-                params,
+                node_display_ids,
+                subgraph_ids,
+                mode,
                 visible_diagram_element_ids,
             )
-            if mermaid_link:
-                definitions.add(mermaid_link)
-            elif (
-                mermaid_link is None
-                and analysis.nodes.get(connection.target_node_id) is None
-            ):
+            if edge:
+                definitions.setdefault(edge.key, edge)
+            elif connection.target_node_id not in node_display_ids:
                 connection_errors += 1
 
-    unique_definitions_list = sorted(definitions)
     logger.debug(
-        "Generated %d unique node/subgraph connection lines for main diagram.",
-        len(unique_definitions_list),
+        "Generated %d unique node/subgraph connections for main diagram.",
+        len(definitions),
     )
     if connection_errors > 0:
         logger.warning(
             "Skipped %d connections due to missing target nodes (see logs).",
             connection_errors,
         )
-    return unique_definitions_list
+    return definitions
 
 
 def generate_start_end_connections(
-    analysis: WorkflowAnalysisV2,
-    params: MermaidGenerationParamsV2,
+    analysis: WorkflowGraph,
+    mode: SubgraphDisplayMode,
     trigger_ids: list[str],
     end_node_ids: list[str],
-) -> list[str]:
+    display_ids: tuple[dict[str, str], set[str]] | None = None,
+) -> dict[str, DiagramEdge]:
     """
     Generates connections involving the dedicated Start/End symbols (V2).
 
     Args:
         analysis: The V2 workflow analysis results.
-        params: Mermaid generation parameters (V2).
+        mode: The subgraph display mode.
         trigger_ids: List of IDs for nodes classified as triggers.
         end_node_ids: List of IDs for nodes classified as end nodes.
+        display_ids: The result of build_display_ids for the analysis and
+            mode, if already computed.
 
     Returns:
-        A list of strings, each representing a Start/End connection definition.
+        The unique Start/End edges, keyed by their Mermaid link text.
     """
-    start_end_connections: set[str] = set()
-    arrow = "-->"
-
-    from n8nmermaid.core.analyzer_v2.models import AnalyzedNodeV2
+    node_display_ids, _ = display_ids or build_display_ids(analysis.nodes, mode)
+    start_end_connections: dict[str, DiagramEdge] = {}
 
     for trigger_id in trigger_ids:
-        trigger_node = analysis.nodes.get(trigger_id)
-        if not trigger_node:
+        disp_tgt = node_display_ids.get(trigger_id)
+        if disp_tgt is None:
             continue
 
-        start_symbol_id = f"{trigger_id}{START_SYMBOL_SUFFIX}"
-        dummy_start_symbol_node = AnalyzedNodeV2(
-            id=start_symbol_id,
-            name="StartSymbol",
-            type="symbol",
-            raw_parameters={},
-            extracted_parameters={},
-            parameter_categories={},
-        )
-
-        disp_src, disp_tgt, log_ctx = get_display_ids_and_context(
-            dummy_start_symbol_node, trigger_node, params
+        edge = DiagramEdge(
+            f"{trigger_id}{START_SYMBOL_SUFFIX}",
+            disp_tgt,
+            N8N_CONNECTION_TYPE_MAIN,
+            "",
         )
-
-        link = f"{start_symbol_id} {arrow} {disp_tgt}"
-        start_end_connections.add(link)
-        logger.debug("Added start link (%s): %s", log_ctx, link)
+        start_end_connections.setdefault(edge.key, edge)
+        logger.debug("Added start link: %s -> %s", edge.source, disp_tgt)
 
     for end_id in end_node_ids:
-        end_node = analysis.nodes.get(end_id)
-        if not end_node:
+        disp_src = node_display_ids.get(end_id)
+        if disp_src is None:
             continue
 
         end_symbol_id = f"{end_id}{END_SYMBOL_SUFFIX}"
-        dummy_end_symbol_node = AnalyzedNodeV2(
-            id=end_symbol_id,
-            name="EndSymbol",
-            type="symbol",
-            raw_parameters={},
-            extracted_parameters={},
-            parameter_categories={},
-        )
-
-        disp_src, disp_tgt, log_ctx = get_display_ids_and_context(
-            end_node, dummy_end_symbol_node, params
-        )
-
-        link = f"{disp_src} {arrow} {end_symbol_id}"
         if disp_src != end_symbol_id:
-            start_end_connections.add(link)
-            logger.debug("Added end link (%s): %s", log_ctx, link)
+            edge = DiagramEdge(disp_src, end_symbol_id, N8N_CONNECTION_TYPE_MAIN, "")
+            start_end_connections.setdefault(edge.key, edge)
+            logger.debug("Added end link: %s -> %s", disp_src, end_symbol_id)
         else:
             logger.debug(
                 "Skipped end link for %s as display source (%s) matches symbol "
@@ -229,7 +245,7 @@ def generate_start_end_connections(
                 end_id,
                 disp_src,
                 end_symbol_id,
-                params.subgraph_display_mode,
+                mode,
             )
 
-    return sorted(start_end_connections)
+    return start_end_connections
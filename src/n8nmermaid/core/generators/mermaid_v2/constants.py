@@ -4,6 +4,7 @@
 
 from n8nmermaid.core.analyzer_v2.constants import N8nConnectionLiteral
 from n8nmermaid.core.analyzer_v2.models import NodeGroupType
+from n8nmermaid.models_v2.request_v2_models import DiagramFormat, MermaidDirection
 
 MermaidShapeName = str
 
@@ -21,6 +22,55 @@ NODE_GROUP_TO_SHAPE: dict[NodeGroupType, MermaidShapeName] = {
 SHAPE_START: MermaidShapeName = "circle"
 SHAPE_STOP: MermaidShapeName = "doublecircle"
 
+# Classic bracket syntax of each shape, used by compact output: shorter than
+# an `@{shape: ..., label: ...}` block (classDef can only style nodes, not
+# set their shape or label)
+MERMAID_SHAPE_BRACKETS: dict[MermaidShapeName, tuple[str, str]] = {
+    "stadium": ("([", "])"),
+    "rect": ("[", "]"),
+    "diamond": ("{", "}"),
+    "subroutine": ("[[", "]]"),
+    "hexagon": ("{{", "}}"),
+    "trapezoid": ("[/", "\\]"),
+    "circle": ("((", "))"),
+    "doublecircle": ("(((", ")))"),
+}
+
+# Prefix of compact-mode node aliases, which keeps them from clashing with
+# Mermaid keywords such as 'end'
+COMPACT_ALIAS_PREFIX = "n"
+
+# Graphviz node attributes closest to each Mermaid shape
+MERMAID_SHAPE_TO_DOT: dict[MermaidShapeName, str] = {
+    "stadium": 'shape=box, style="rounded"',
+    "rect": "shape=box",
+    "diamond": "shape=diamond",
+    "subroutine": "shape=box, peripheries=2",
+    "hexagon": "shape=hexagon",
+    "trapezoid": "shape=trapezium",
+    "circle": "shape=circle",
+    "doublecircle": "shape=doublecircle",
+}
+
+# Graphviz has no top-down alias
+MERMAID_DIRECTION_TO_DOT: dict[MermaidDirection, str] = {
+    "TD": "TB",
+    "TB": "TB",
+    "LR": "LR",
+    "RL": "RL",
+    "BT": "BT",
+}
+
+DIAGRAM_FORMAT_SUFFIXES: dict[DiagramFormat, str] = {
+    "mermaid": ".mmd",
+    "dot": ".dot",
+    "json": ".json",
+    "alias_table": ".aliases.json",
+}
+
+# Version of the JSON graph format, bumped on incompatible changes
+JSON_GRAPH_VERSION = 1
+
 START_SYMBOL_SUFFIX = "_startsymbol"
 END_SYMBOL_SUFFIX = "_endsymbol"
 
@@ -2,54 +2,74 @@
 """Contains the MermaidGeneratorV2 class for creating V2 Mermaid diagrams."""
 
 import logging
-
-from n8nmermaid.core.analyzer_v2.models import (
-    AnalyzedNodeV2,
-    NodeGroupType,
-    WorkflowAnalysisV2,
+from collections.abc import Callable, Iterable, Iterator
+
+from n8nmermaid.core.analyzer_v2.graph import WorkflowGraph, as_workflow_graph
+from n8nmermaid.core.analyzer_v2.models import NodeGroupType, WorkflowAnalysisV2
+from n8nmermaid.core.analyzer_v2.planner import AnalysisField
+from n8nmermaid.models_v2.request_v2_models import (
+    DiagramFormat,
+    MermaidGenerationParamsV2,
+    SubgraphDisplayMode,
 )
-from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
 
 from .connection_definitions import (
+    generate_internal_connections,
     generate_node_connections,
     generate_start_end_connections,
 )
-from .constants import N8N_CONNECTION_TYPE_MAIN
-from .helpers import (
-    format_node_definition,
-    format_node_label,
-    get_connection_label_parts,
-    get_mermaid_shape,
-    sanitize_filename,
-)
+from .helpers import build_display_ids, sanitize_filename
+from .ir import DiagramIR, DiagramNode
 from .node_definitions import define_nodes_and_subgraphs, define_start_end_symbols
+from .render_dot import render_dot
+from .render_json import render_json
+from .render_mermaid import render_alias_table, render_mermaid
 
 logger = logging.getLogger(__name__)
 
+DiagramEmitter = Callable[[DiagramIR, MermaidGenerationParamsV2], Iterator[str]]
+
+
+_DIAGRAM_EMITTERS: dict[DiagramFormat, DiagramEmitter] = {
+    "mermaid": render_mermaid,
+    "dot": render_dot,
+    "json": render_json,
+    "alias_table": render_alias_table,
+}
+
 
 class MermaidGeneratorV2:
     """
-    Generates Mermaid flowchart syntax from a WorkflowAnalysisV2 object.
+    Generates Mermaid flowchart syntax from a V2 workflow analysis.
 
     Produces a dictionary containing the main diagram and potentially separate
     diagrams for individual clusters, based on generation parameters.
+
+    The diagrams are first compiled into an intermediate representation (see
+    ir.py) per subgraph display mode, which is kept: rendering the same
+    workflow with other directions, labels or output formats (see
+    generate_variants) reuses it instead of walking the analysis again. The
+    IR is rendered by the emitter of the `output_format` parameter: Mermaid
+    flowchart syntax, Graphviz DOT or a JSON node/edge graph.
     """
 
     def __init__(
         self,
-        analysis: WorkflowAnalysisV2,
+        analysis: WorkflowGraph | WorkflowAnalysisV2,
         params: MermaidGenerationParamsV2,
     ):
         """
         Initializes the V2 generator.
 
         Args:
-            analysis: The WorkflowAnalysisV2 object.
+            analysis: The WorkflowGraph (or its WorkflowAnalysisV2 view).
             params: The MermaidGenerationParamsV2 specifying diagram options.
         """
-        self.analysis = analysis
+        self.analysis = as_workflow_graph(analysis)
         self.params = params
-        self.handled_node_ids_main: set[str] = set()
+        self._compiled: dict[SubgraphDisplayMode, list[DiagramIR]] = {}
+        # Shared by all compiled modes and diagrams
+        self._node_cache: dict[str, DiagramNode] = {}
         logger.debug(
             "MermaidGeneratorV2 initialized. Main dir: %s, Subgraph dir: %s, "
             "Subgraph mode: %s",
@@ -58,223 +78,187 @@ class MermaidGeneratorV2:
             self.params.subgraph_display_mode,
         )
 
-    def generate(self) -> dict[str, str]:
+    @staticmethod
+    def required_fields(params: MermaidGenerationParamsV2) -> set[AnalysisField]:
         """
-        Assembles the final Mermaid flowchart output dictionary (V2).
+        Returns the analysis fields diagram generation reads for these params.
+
+        Args:
+            params: The MermaidGenerationParamsV2 that will be used.
 
         Returns:
-            A dictionary where keys are diagram identifiers ("main", sanitized
-            cluster root names) and values are the corresponding Mermaid diagram
-            strings.
+            A set of analysis field names for the analyzer's phase planner.
         """
-        logger.info(
-            "Generating V2 Mermaid output(s) for mode: %s",
-            self.params.subgraph_display_mode,
-        )
-        result: dict[str, str] = {}
+        fields: set[AnalysisField] = {"classification"}
+        if params.show_key_parameters:
+            fields.add("extracted_parameters")
+        return fields
+
+    def compile(self, mode: SubgraphDisplayMode | None = None) -> list[DiagramIR]:
+        """
+        Compiles (or returns the already compiled) diagrams for a mode.
 
+        Args:
+            mode: The subgraph display mode; defaults to the generator's.
+
+        Returns:
+            The main diagram followed, in 'separate_clusters' mode, by one
+            diagram per cluster root with members.
+        """
+        mode = mode or self.params.subgraph_display_mode
+        diagrams = self._compiled.get(mode)
+        if diagrams is None:
+            diagrams = self._compiled[mode] = self._compile(mode)
+        return diagrams
+
+    def _compile(self, mode: SubgraphDisplayMode) -> list[DiagramIR]:
+        """Compiles the main and cluster diagrams for a display mode."""
         if not self.analysis or not self.analysis.nodes:
             logger.warning("V2 Workflow analysis contains no processable nodes.")
-            result["main"] = (
-                f"flowchart {self.params.direction}\n"
-                f"    %% No processable nodes found\n"
+            return [DiagramIR("main", "empty")]
+
+        logger.debug("Compiling V2 main diagram for mode: %s", mode)
+        elements, trigger_ids, end_node_ids, visible_ids = (
+            define_nodes_and_subgraphs(self.analysis, mode, self._node_cache)
+        )
+        logger.debug(
+            "Main diagram handles %d visible elements.", len(visible_ids)
+        )
+        display_ids = build_display_ids(self.analysis.nodes, mode)
+        edges = generate_node_connections(
+            self.analysis, mode, visible_ids, display_ids
+        )
+        edges.update(
+            generate_start_end_connections(
+                self.analysis, mode, trigger_ids, end_node_ids, display_ids
             )
-            return result
-
-        logger.debug("Generating V2 main diagram content...")
-        main_diagram_string = self._generate_main_diagram()
-        result["main"] = main_diagram_string
-        logger.info("V2 Main diagram generation complete.")
-
-        if self.params.subgraph_display_mode == "separate_clusters":
-            logger.debug("Generating separate diagrams for V2 clusters...")
-            cluster_roots = [
-                node
-                for node in self.analysis.nodes.values()
-                if node.classification.group_type == NodeGroupType.CLUSTER_ROOT
-            ]
-            if cluster_roots:
-                logger.info(
-                    "Found %d V2 cluster roots to generate diagrams for.",
-                    len(cluster_roots),
-                )
-                used_keys: dict[str, int] = {}
-                for root_node in cluster_roots:
-                    base_key = sanitize_filename(root_node.name)
-                    final_key = base_key
-                    count = used_keys.get(base_key, 0)
-                    if count > 0:
-                        final_key = f"{base_key}_{count}"
-                    used_keys[base_key] = count + 1
-
-                    cluster_diagram = self._generate_single_cluster_diagram(
-                        root_node
-                    )
-                    if cluster_diagram:
-                        result[final_key] = cluster_diagram
-                        logger.debug(
-                            "Generated separate diagram for V2 cluster %s (key: %s)",
-                            root_node.id,
-                            final_key,
-                        )
-                    else:
-                        logger.warning(
-                            "Failed to generate separate diagram for V2 cluster %s",
-                            root_node.id,
-                        )
-            else:
-                logger.info(
-                    "No V2 cluster roots found, no separate diagrams needed."
-                )
+        )
+        diagrams = [
+            DiagramIR(
+                "main",
+                "main",
+                elements=elements,
+                symbols=define_start_end_symbols(trigger_ids, end_node_ids),
+                edges=[edges[edge_key] for edge_key in sorted(edges)],
+            )
+        ]
+
+        if mode != "separate_clusters":
+            return diagrams
+
+        logger.debug("Compiling separate diagrams for V2 clusters...")
+        cluster_roots = self.analysis.index.nodes_in_group(NodeGroupType.CLUSTER_ROOT)
+        if not cluster_roots:
+            logger.info("No V2 cluster roots found, no separate diagrams needed.")
+            return diagrams
 
         logger.info(
-            "V2 Mermaid generation complete. Returning %d diagram(s).",
-            len(result),
+            "Found %d V2 cluster roots to generate diagrams for.",
+            len(cluster_roots),
         )
-        return result
+        cluster_members = self.analysis.index.cluster_members
+        used_keys: dict[str, int] = {}
+        for root_node in cluster_roots:
+            base_key = sanitize_filename(root_node.name)
+            final_key = base_key
+            count = used_keys.get(base_key, 0)
+            if count > 0:
+                final_key = f"{base_key}_{count}"
+            used_keys[base_key] = count + 1
+
+            members = cluster_members.get(root_node.id)
+            if not members:
+                logger.warning(
+                    "V2 Cluster root %s has no associated nodes. No separate "
+                    "diagram generated.",
+                    root_node.id,
+                )
+                continue
+            logger.debug(
+                "Compiling separate diagram for V2 cluster %s (key: %s)",
+                root_node.id,
+                final_key,
+            )
+            member_ids = {node.id for node in members}
+            diagrams.append(
+                DiagramIR(
+                    final_key,
+                    "cluster",
+                    elements=[
+                        DiagramNode.from_record(
+                            self.analysis.nodes[node_id], self._node_cache
+                        )
+                        for node_id in sorted(member_ids)
+                    ],
+                    edges=generate_internal_connections(self.analysis, member_ids),
+                    root=DiagramNode.from_record(root_node, self._node_cache),
+                )
+            )
+        return diagrams
 
-    def _generate_main_diagram(self) -> str:
+    def generate(
+        self, params: MermaidGenerationParamsV2 | None = None
+    ) -> dict[str, str]:
         """
-        Generates the primary Mermaid diagram string based on V2 analysis.
+        Assembles the final diagram output dictionary (V2).
+
+        Args:
+            params: Parameters to render with instead of the generator's.
 
         Returns:
-            A string containing the Mermaid syntax for the main diagram.
+            A dictionary where keys are diagram identifiers ("main", sanitized
+            cluster root names) and values are the corresponding diagrams, as
+            text in the params' output format (Mermaid by default).
         """
-        logger.debug("Assembling V2 main Mermaid string...")
-        (
-            node_defs,
-            trigger_ids,
-            end_node_ids,
-            self.handled_node_ids_main,
-        ) = define_nodes_and_subgraphs(self.analysis, self.params)
+        result = {key: "".join(lines) for key, lines in self.iter_diagrams(params)}
         logger.info(
-            "V2 Main diagram: Generated %d node/subgraph lines. "
-            "Handled elements: %d",
-            len(node_defs),
-            len(self.handled_node_ids_main),
-        )
-
-        symbol_defs = define_start_end_symbols(trigger_ids, end_node_ids)
-
-        connection_defs = generate_node_connections(
-            self.analysis, self.params, self.handled_node_ids_main
-        )
-        start_end_conns = generate_start_end_connections(
-            self.analysis, self.params, trigger_ids, end_node_ids
+            "V2 Mermaid generation complete. Returning %d diagram(s).",
+            len(result),
         )
+        return result
 
-        output_lines = [f"flowchart {self.params.direction}"]
-        all_node_defs = node_defs + symbol_defs
-        if all_node_defs:
-            output_lines.append("")
-            output_lines.append("%% Nodes, Subgraphs & Symbols (Main V2)")
-            output_lines.extend(
-                [
-                    f"    {line}" if line != "end" and line else line
-                    for line in all_node_defs
-                ]
-            )
-
-        all_connections = sorted(set(connection_defs + start_end_conns))
-        if all_connections:
-            output_lines.append("")
-            output_lines.append("%% Connections (Main V2)")
-            output_lines.extend(
-                [f"    {conn.strip()}" for conn in all_connections]
-            )
-        else:
-            output_lines.append("")
-            output_lines.append("    %% No connections generated (Main V2)")
-
-        return "\n".join(output_lines).strip() + "\n"
-
-    def _generate_single_cluster_diagram(
-        self, root_node: AnalyzedNodeV2
-    ) -> str | None:
+    def generate_variants(
+        self, variants: Iterable[MermaidGenerationParamsV2]
+    ) -> list[dict[str, str]]:
         """
-        Generates a self-contained Mermaid diagram for a single V2 cluster.
+        Renders the diagrams for several parameter sets.
+
+        Each subgraph display mode among the variants is compiled once; the
+        variants only differ in rendering.
 
         Args:
-            root_node: The AnalyzedNodeV2 object representing the cluster root.
+            variants: The parameter sets to render.
 
         Returns:
-            A string containing the Mermaid syntax for the cluster, or None.
+            One diagram dictionary (as returned by generate()) per variant,
+            in the same order.
         """
-        logger.debug(
-            "Generating diagram for V2 cluster root: %s", root_node.id
-        )
-        cluster_node_ids = {
-            n.id
-            for n in self.analysis.nodes.values()
-            if n.cluster.cluster_root_id == root_node.id
-        }
-
-        if not cluster_node_ids:
-            logger.warning(
-                "V2 Cluster root %s has no associated nodes.", root_node.id
-            )
-            return None
-
-        node_defs: list[str] = []
-        for node_id in sorted(cluster_node_ids):
-            node = self.analysis.nodes[node_id]
-            node_label = format_node_label(node, self.params)
-            shape = get_mermaid_shape(node)
-            node_defs.append(
-                format_node_definition(node_id, node_label, shape)
-            )
+        return [self.generate(params) for params in variants]
 
-        connection_defs: set[str] = set()
-        for source_id in cluster_node_ids:
-            source_node = self.analysis.nodes[source_id]
-
-            for connection in source_node.connectivity.outgoing_connections:
-                target_id = connection.target_node_id
-                if target_id in cluster_node_ids:
-                    arrow = (
-                        "-->"
-                        if connection.connection_type
-                        == N8N_CONNECTION_TYPE_MAIN
-                        else "-.->"
-                    )
-                    label_parts = get_connection_label_parts(
-                        source_node, connection
-                    )
-                    label_str = (
-                        f'|"{" ".join(label_parts)}"|' if label_parts else ""
-                    )
-                    link = f"{source_id} {arrow}{label_str} {target_id}"
-                    if link not in connection_defs:
-                        connection_defs.add(link)
-                        logger.debug(
-                            "Cluster %s: Added internal link (%s): %s",
-                            root_node.id,
-                            connection.connection_type,
-                            link,
-                        )
+    def iter_diagrams(
+        self, params: MermaidGenerationParamsV2 | None = None
+    ) -> Iterator[tuple[str, Iterator[str]]]:
+        """
+        Yields the diagrams for streaming output, one line at a time.
 
-        output_lines = [f"flowchart {self.params.subgraph_direction}"]
+        The diagrams are compiled when iteration starts and rendered lazily
+        while their lines are consumed, so a writer never holds the diagram
+        text in memory. Joining the lines gives exactly the strings returned
+        by generate().
 
-        if node_defs:
-            output_lines.append("")
-            output_lines.append(
-                f"%% Nodes (Cluster V2: {root_node.name} / {root_node.id})"
-            )
-            output_lines.extend([f"    {line}" for line in node_defs])
-
-        if connection_defs:
-            output_lines.append("")
-            output_lines.append(
-                f"%% Connections (Cluster V2: {root_node.name} / {root_node.id})"
-            )
-            output_lines.extend(
-                [f"    {conn.strip()}" for conn in sorted(connection_defs)]
-            )
-        else:
-            output_lines.append("")
-            output_lines.append(
-                f"    %% No internal connections found "
-                f"(Cluster V2: {root_node.name} / {root_node.id})"
-            )
+        Args:
+            params: Parameters to render with instead of the generator's.
 
-        return "\n".join(output_lines).strip() + "\n"
+        Yields:
+            Tuples of (diagram key, iterator of newline-terminated lines):
+            "main" first, then one per cluster in 'separate_clusters' mode.
+        """
+        params = params or self.params
+        logger.info(
+            "Generating V2 %s output(s) for mode: %s",
+            params.output_format,
+            params.subgraph_display_mode,
+        )
+        emit = _DIAGRAM_EMITTERS[params.output_format]
+        for diagram in self.compile(params.subgraph_display_mode):
+            yield diagram.key, emit(diagram, params)
@@ -3,16 +3,16 @@
 
 import logging
 import re
+from collections.abc import Mapping
 from typing import Any, Literal
 
-from n8nmermaid.core.analyzer_v2.models import (
-    AnalyzedNodeV2,
-    ConnectionDetail,
-    NodeGroupType,
-)
-from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
+from n8nmermaid.core.analyzer_v2.graph import EdgeRecord, NodeRecord
+from n8nmermaid.core.analyzer_v2.models import NodeGroupType
+from n8nmermaid.models_v2.request_v2_models import SubgraphDisplayMode
 
 from .constants import (
+    COMPACT_ALIAS_PREFIX,
+    MERMAID_SHAPE_BRACKETS,
     N8N_CONNECTION_TYPE_MAIN,
     NODE_GROUP_TO_SHAPE,
     SHAPE_START,
@@ -61,13 +61,13 @@ def sanitize_filename(name: str, default: str = "unnamed_cluster") -> str:
 
 
 def get_mermaid_shape(
-    node: AnalyzedNodeV2 | None, is_symbol: Literal["start", "end"] | None = None
+    node: NodeRecord | None, is_symbol: Literal["start", "end"] | None = None
 ) -> MermaidShapeName:
     """
     Gets the Mermaid shape name based on V2 node group type or symbol type.
 
     Args:
-        node: The AnalyzedNodeV2 object, or None if getting a symbol shape.
+        node: The NodeRecord object, or None if getting a symbol shape.
         is_symbol: Specify 'start' or 'end' to get the dedicated symbol shape.
 
     Returns:
@@ -82,7 +82,7 @@ def get_mermaid_shape(
         logger.warning("get_mermaid_shape called with None node and no symbol type.")
         return "rect"
 
-    group_type = node.classification.group_type
+    group_type = node.group_type
     shape_name = NODE_GROUP_TO_SHAPE.get(group_type, "rect")
     logger.debug(
         "Node %s: Group '%s' -> Shape '%s'",
@@ -93,47 +93,62 @@ def get_mermaid_shape(
     return shape_name
 
 
-def format_node_label(node: AnalyzedNodeV2, params: MermaidGenerationParamsV2) -> str:
+def get_credential_names(node: NodeRecord) -> list[str]:
     """
-    Constructs the display label for a V2 node, applying formatting options.
+    Lists the credential names shown on a V2 node with show_credentials.
 
     Args:
-        node: The AnalyzedNodeV2 object.
-        params: Mermaid generation parameters (V2) controlling label content.
+        node: The NodeRecord object.
 
     Returns:
-        The formatted and sanitized label string for the node definition.
+        The credential names (or shortened IDs for unnamed credentials).
     """
-    base_label = node.name
-    extra_info = []
-
-    if params.show_credentials and node.credentials.has_credentials:
-        cred_names = [
-            details.name or f"ID:{details.id[:8]}..."
-            for details in node.credentials.details.values()
-            if details.name or details.id
-        ]
-        if cred_names:
-            extra_info.append(f"Creds: {', '.join(cred_names)}")
-
-    if params.show_key_parameters:
-        model_val = (
-            node.extracted_parameters.get("model")
-            or node.extracted_parameters.get("modelId")
-            or node.extracted_parameters.get("model_identifier")
-        )
-        if model_val:
-            model_str = str(model_val)
-            if len(model_str) > 30:
-                model_str = model_str[:27] + "..."
-            extra_info.append(f"Model: {model_str}")
-
-    if extra_info:
-        safe_base = sanitize_mermaid_label(base_label)
-        safe_extras = [sanitize_mermaid_label(info) for info in extra_info]
-        return f'{safe_base}<br/>{"<br/>".join(safe_extras)}'
-    else:
-        return sanitize_mermaid_label(base_label)
+    if not node.has_credentials:
+        return []
+    return [
+        details.name or f"ID:{details.id[:8]}..."
+        for details in node.credentials.values()
+        if details.name or details.id
+    ]
+
+
+def get_key_parameter(node: NodeRecord) -> str | None:
+    """
+    Gets the key parameter (the AI model) shown with show_key_parameters.
+
+    Args:
+        node: The NodeRecord object.
+
+    Returns:
+        The model name, shortened to 30 characters, or None if not set.
+    """
+    model_val = (
+        node.extracted_parameters.get("model")
+        or node.extracted_parameters.get("modelId")
+        or node.extracted_parameters.get("model_identifier")
+    )
+    if not model_val:
+        return None
+    model_str = str(model_val)
+    if len(model_str) > 30:
+        model_str = model_str[:27] + "..."
+    return model_str
+
+
+def format_node_label(label_lines: list[str]) -> str:
+    """
+    Constructs the display label for a node from its label lines.
+
+    Args:
+        label_lines: The node name followed by optional extra lines (see
+            DiagramNode.label_lines).
+
+    Returns:
+        The sanitized label string for the node definition.
+    """
+    if len(label_lines) == 1:
+        return sanitize_mermaid_label(label_lines[0])
+    return "<br/>".join([sanitize_mermaid_label(line) for line in label_lines])
 
 
 def format_node_definition(
@@ -156,219 +171,148 @@ def format_node_definition(
     return definition
 
 
-def get_connection_label_parts(
-    source_node: AnalyzedNodeV2, connection: ConnectionDetail
-) -> list[str]:
+def format_compact_node_definition(
+    node_id: str, label: str, shape_name: MermaidShapeName
+) -> str:
     """
-    Determines the label parts for a connection edge based on V2 detail.
+    Constructs a node definition in the classic bracket syntax (compact mode).
 
     Args:
-        source_node: The node originating the connection.
-        connection: The ConnectionDetail object for the specific link.
+        node_id: The node's identifier (alias) in the diagram.
+        label: The pre-formatted and sanitized display label for the node.
+        shape_name: The Mermaid shape name.
 
     Returns:
-        A list of strings to be joined for the connection label. Empty if no
-        specific label is needed.
+        The node definition string, e.g. `n1{"Switch"}`.
     """
-    label_parts = []
-    conn_type = connection.connection_type
-    source_port = connection.source_port_name
-    source_group_type = source_node.classification.group_type
-
-    if conn_type == N8N_CONNECTION_TYPE_MAIN:
-        if (
-            source_group_type == NodeGroupType.ROUTER
-            and source_port.startswith("main_")
-        ):
-            try:
-                port_index_str = source_port.split("_")[-1]
-                port_index = int(port_index_str)
-                label_parts.append(f"({port_index})")
-            except (ValueError, IndexError, AttributeError):
-                label_parts.append(f"({source_port})")
-
-    elif conn_type != N8N_CONNECTION_TYPE_MAIN:
-        ai_label = conn_type.replace("ai_", "")
-        label_parts.append(f"({ai_label})")
-
-    return [sanitize_mermaid_label(part) for part in label_parts]
-
-
-def _get_display_ids_subgraph_mode(
-    source_node: AnalyzedNodeV2, target_node: AnalyzedNodeV2
-) -> tuple[str, str, str]:
+    opening, closing = MERMAID_SHAPE_BRACKETS.get(shape_name, ("[", "]"))
+    return f'{node_id}{opening}"{label}"{closing}'
+
+
+def compact_alias(index: int) -> str:
     """
-    Helper to determine display IDs for 'subgraph' mode.
+    Returns the compact-mode alias of the element with the given index.
 
     Args:
-        source_node: The source node.
-        target_node: The target node.
+        index: The element's position in the diagram's alias order.
 
     Returns:
-        A tuple of (display_source_id, display_target_id, log_context).
+        COMPACT_ALIAS_PREFIX followed by the index in base 36 (n0, n1, ...,
+        nz, n10, ...).
     """
-    source_id = source_node.id
-    target_id = target_node.id
-    source_is_clustered = source_node.cluster.is_clustered
-    target_is_clustered = target_node.cluster.is_clustered
-    source_root_id = source_node.cluster.cluster_root_id
-    target_root_id = target_node.cluster.cluster_root_id
-
-    display_source_id = source_id
-    display_target_id = target_id
-    log_context = "standard"
-
-    if (
-        source_is_clustered
-        and target_is_clustered
-        and source_root_id != target_root_id
-        and source_root_id
-        and target_root_id
-    ):
-        display_source_id = f"{source_root_id}_graph"
-        display_target_id = f"{target_root_id}_graph"
-        log_context = "cross_cluster_subgraph"
-    elif source_is_clustered and not target_is_clustered and source_root_id:
-        display_source_id = f"{source_root_id}_graph"
-        log_context = "exit_cluster_subgraph"
-    elif not source_is_clustered and target_is_clustered and target_root_id:
-        display_target_id = f"{target_root_id}_graph"
-        log_context = "enter_cluster_subgraph"
-    elif (
-        source_is_clustered
-        and target_is_clustered
-        and source_root_id == target_root_id
-    ):
-        log_context = "internal_cluster_subgraph"
+    digits = "0123456789abcdefghijklmnopqrstuvwxyz"
+    encoded = ""
+    while True:
+        index, remainder = divmod(index, 36)
+        encoded = digits[remainder] + encoded
+        if not index:
+            return f"{COMPACT_ALIAS_PREFIX}{encoded}"
 
-    return display_source_id, display_target_id, log_context
 
-
-def _get_display_ids_simple_mode(
-    source_node: AnalyzedNodeV2, target_node: AnalyzedNodeV2
-) -> tuple[str, str, str]:
+def get_connection_label(source_node: NodeRecord, connection: EdgeRecord) -> str:
     """
-    Helper to determine display IDs for 'simple_node'/'separate_clusters'.
+    Determines the label for a connection edge based on V2 detail.
 
     Args:
-        source_node: The source node.
-        target_node: The target node.
+        source_node: The node originating the connection.
+        connection: The EdgeRecord object for the specific link.
 
     Returns:
-        A tuple of (display_source_id, display_target_id, log_context).
+        The raw (unsanitized) label: the output index of a router's main
+        connection or the kind of an AI connection. Empty if no specific
+        label is needed.
     """
-    source_id = source_node.id
-    target_id = target_node.id
-    source_is_clustered = source_node.cluster.is_clustered
-    target_is_clustered = target_node.cluster.is_clustered
-    source_root_id = source_node.cluster.cluster_root_id
-    target_root_id = target_node.cluster.cluster_root_id
-    source_is_root = (
-        source_node.classification.group_type == NodeGroupType.CLUSTER_ROOT
-    )
-    target_is_root = (
-        target_node.classification.group_type == NodeGroupType.CLUSTER_ROOT
-    )
+    conn_type = connection.connection_type
+    source_port = connection.source_port_name
 
-    display_source_id = source_id
-    display_target_id = target_id
-    log_context = "standard"
-
-    is_source_sub_node = source_is_clustered and not source_is_root
-    is_target_sub_node = target_is_clustered and not target_is_root
-
-    if is_source_sub_node and source_root_id:
-        display_source_id = source_root_id
-        log_context = "source_rerouted_from_sub"
-    if is_target_sub_node and target_root_id:
-        display_target_id = target_root_id
-        log_context = (
-            f"{log_context}_target_rerouted_from_sub"
-            if log_context != "standard"
-            else "target_rerouted_from_sub"
-        )
-
-    if display_source_id == source_node.id:
-        is_final_source_cluster_rep = source_is_root
-    elif display_source_id == source_root_id:
-        is_final_source_cluster_rep = True
-    else:
-        is_final_source_cluster_rep = False
+    if conn_type != N8N_CONNECTION_TYPE_MAIN:
+        return f"({conn_type.replace('ai_', '')})"
 
-    if display_target_id == target_node.id:
-        is_final_target_cluster_rep = target_is_root
-    elif display_target_id == target_root_id:
-        is_final_target_cluster_rep = True
-    else:
-        is_final_target_cluster_rep = False
+    if source_node.group_type == NodeGroupType.ROUTER and source_port.startswith(
+        "main_"
+    ):
+        try:
+            port_index = int(source_port.split("_")[-1])
+            return f"({port_index})"
+        except (ValueError, IndexError, AttributeError):
+            return f"({source_port})"
+    return ""
+
+
+def format_edge_definition(
+    source_id: str,
+    target_id: str,
+    connection_type: str,
+    label: str,
+    separator: str = " ",
+) -> str:
+    """
+    Constructs the Mermaid link syntax string for a connection.
 
-    is_same_cluster_root = (
-        is_final_source_cluster_rep
-        and is_final_target_cluster_rep
-        and display_source_id == display_target_id
-    )
+    Main connections are drawn as solid arrows, all others (AI connections)
+    as dotted arrows.
 
-    if is_same_cluster_root:
-        log_context = "internal_cluster_simple_selfloop"
-    elif is_final_source_cluster_rep and is_final_target_cluster_rep:
-        log_context = "cross_cluster_simple"
-    elif is_final_source_cluster_rep and not is_final_target_cluster_rep:
-        log_context = "exit_cluster_simple"
-    elif not is_final_source_cluster_rep and is_final_target_cluster_rep:
-        log_context = "enter_cluster_simple"
+    Args:
+        source_id: The diagram ID of the source element.
+        target_id: The diagram ID of the target element.
+        connection_type: The n8n connection type (e.g. "main", "ai_tool").
+        label: The raw connection label, or an empty string.
+        separator: Placed around the arrow (empty in compact mode).
 
-    return display_source_id, display_target_id, log_context
+    Returns:
+        The complete link definition string.
+    """
+    arrow = "-->" if connection_type == N8N_CONNECTION_TYPE_MAIN else "-.->"
+    label_str = f'|"{sanitize_mermaid_label(label)}"|' if label else ""
+    return f"{source_id}{separator}{arrow}{label_str}{separator}{target_id}"
 
 
-def get_display_ids_and_context(
-    source_node: AnalyzedNodeV2,
-    target_node: AnalyzedNodeV2,
-    params: MermaidGenerationParamsV2,
-) -> tuple[str, str, str]:
+def build_display_ids(
+    nodes: Mapping[str, NodeRecord], mode: SubgraphDisplayMode
+) -> tuple[dict[str, str], set[str]]:
     """
-    Determines the source/target IDs for linking in the main diagram (V2).
+    Maps each node to the element representing it in the main diagram (V2).
 
-    Handles subgraph boundaries or simplified nodes based on display mode.
+    In 'subgraph' mode, clustered nodes are represented by their cluster's
+    subgraph ('<root_id>_graph'). In 'simple_node' and 'separate_clusters'
+    modes, sub-nodes are represented by their cluster root. Other nodes
+    represent themselves. Built once per diagram, so that connections are
+    resolved by lookup; a connection whose ends resolve to the same element
+    (e.g. one within a cluster) is not drawn in the main diagram.
 
     Args:
-        source_node: The source node (AnalyzedNodeV2).
-        target_node: The target node (AnalyzedNodeV2).
-        params: Mermaid generation parameters (V2).
+        nodes: The analyzed nodes, by ID.
+        mode: The subgraph display mode.
 
     Returns:
         A tuple containing:
-        - Effective source ID for Mermaid link.
-        - Effective target ID for Mermaid link.
-        - Logging context string.
+        - Dictionary mapping node IDs to display element IDs.
+        - Set of the display element IDs that are subgraphs.
     """
-    mode = params.subgraph_display_mode
+    display_ids: dict[str, str] = {}
+    subgraph_ids: set[str] = set()
 
     if mode == "subgraph":
-        display_source_id, display_target_id, log_context = (
-            _get_display_ids_subgraph_mode(source_node, target_node)
-        )
-    elif mode in ["simple_node", "separate_clusters"]:
-        display_source_id, display_target_id, log_context = (
-            _get_display_ids_simple_mode(source_node, target_node)
-        )
+        for node_id, node in nodes.items():
+            root_id = node.cluster_root_id
+            if root_id:
+                display_id = f"{root_id}_graph"
+                subgraph_ids.add(display_id)
+            else:
+                display_id = node_id
+            display_ids[node_id] = display_id
     else:
-        logger.warning("Invalid subgraph_display_mode '%s'. Falling back.", mode)
-        display_source_id = source_node.id
-        display_target_id = target_node.id
-        log_context = "standard_fallback"
-
-    is_visual_self_loop = display_source_id == display_target_id
-    original_ids_different = source_node.id != target_node.id
-    is_subgraph_self_link = mode == "subgraph" and "_graph" in display_source_id
-
-    if is_visual_self_loop and (original_ids_different or is_subgraph_self_link):
-        logger.debug(
-            "Visual self-loop detected for '%s' in mode '%s'. "
-            "Original: %s -> %s. Will be skipped by caller.",
-            display_source_id,
-            mode,
-            source_node.id,
-            target_node.id,
-        )
-
-    return display_source_id, display_target_id, log_context
+        for node_id, node in nodes.items():
+            root_id = node.cluster_root_id
+            if root_id and node.group_type != NodeGroupType.CLUSTER_ROOT:
+                display_ids[node_id] = root_id
+            else:
+                display_ids[node_id] = node_id
+
+    logger.debug(
+        "Resolved display IDs of %d nodes for mode %s (%d subgraphs).",
+        len(display_ids),
+        mode,
+        len(subgraph_ids),
+    )
+    return display_ids, subgraph_ids
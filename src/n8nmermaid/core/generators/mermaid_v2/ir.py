@@ -0,0 +1,165 @@
+# src/n8nmermaid/core/generators/mermaid_v2/ir.py
+"""
+Intermediate representation of V2 diagrams.
+
+A diagram is compiled once per subgraph display mode into plain `__slots__`
+records: its elements (nodes and subgraphs with their members), Start/End
+symbols and resolved edges, with raw label fragments. Everything else in
+MermaidGenerationParamsV2 (directions, credential and key parameter labels)
+only affects rendering, so any number of parameter variants can be rendered
+from one compiled diagram without walking the analysis again.
+"""
+
+from typing import Literal
+
+from n8nmermaid.core.analyzer_v2.graph import NodeRecord
+
+from .helpers import (
+    format_edge_definition,
+    get_credential_names,
+    get_key_parameter,
+    get_mermaid_shape,
+)
+
+DiagramKind = Literal["main", "cluster", "empty"]
+
+
+class DiagramNode:
+    """A node or Start/End symbol of a diagram, with its label fragments."""
+
+    __slots__ = ("id", "name", "shape", "group", "credential_names", "model")
+
+    def __init__(
+        self,
+        id: str,
+        name: str,
+        shape: str,
+        group: str,
+        credential_names: tuple[str, ...] = (),
+        model: str | None = None,
+    ):
+        self.id = id
+        self.name = name
+        self.shape = shape
+        self.group = group
+        self.credential_names = credential_names
+        self.model = model
+
+    @classmethod
+    def from_record(
+        cls, node: NodeRecord, cache: dict[str, "DiagramNode"] | None = None
+    ) -> "DiagramNode":
+        """
+        Builds the diagram node of an analyzed workflow node.
+
+        Args:
+            node: The NodeRecord object.
+            cache: Diagram nodes already built, by ID. A node found here is
+                reused; a new one is added.
+
+        Returns:
+            The DiagramNode.
+        """
+        if cache is not None:
+            cached = cache.get(node.id)
+            if cached is not None:
+                return cached
+        diagram_node = cls(
+            node.id,
+            node.name,
+            get_mermaid_shape(node),
+            node.group_type.value,
+            tuple(get_credential_names(node)),
+            get_key_parameter(node),
+        )
+        if cache is not None:
+            cache[node.id] = diagram_node
+        return diagram_node
+
+    def label_lines(
+        self, show_credentials: bool, show_key_parameters: bool
+    ) -> list[str]:
+        """
+        Returns the raw lines of the node's label.
+
+        Args:
+            show_credentials: Add a line with the node's credential names.
+            show_key_parameters: Add a line with the node's AI model.
+
+        Returns:
+            The node name, followed by the requested extra lines (if any).
+        """
+        lines = [self.name]
+        if show_credentials and self.credential_names:
+            lines.append(f"Creds: {', '.join(self.credential_names)}")
+        if show_key_parameters and self.model:
+            lines.append(f"Model: {self.model}")
+        return lines
+
+
+class DiagramEdge:
+    """
+    A resolved connection between two diagram elements.
+
+    `key` is the edge's Mermaid link text, which identifies it (two
+    connections drawn identically are one edge) and orders the edges.
+    """
+
+    __slots__ = ("source", "target", "connection_type", "label", "key")
+
+    def __init__(self, source: str, target: str, connection_type: str, label: str):
+        self.source = source
+        self.target = target
+        self.connection_type = connection_type
+        self.label = label
+        self.key = format_edge_definition(source, target, connection_type, label)
+
+
+class DiagramSubgraph:
+    """A cluster drawn as a subgraph, with its member nodes and edges."""
+
+    __slots__ = ("id", "label", "nodes", "edges")
+
+    def __init__(
+        self,
+        id: str,
+        label: str,
+        nodes: list[DiagramNode],
+        edges: list[DiagramEdge],
+    ):
+        self.id = id
+        self.label = label
+        self.nodes = nodes
+        self.edges = edges
+
+
+class DiagramIR:
+    """
+    A compiled diagram.
+
+    'main' diagrams hold top-level nodes and subgraphs in layout order, the
+    Start/End symbols and the edges between top-level elements. 'cluster'
+    diagrams (separate_clusters mode) hold the members of one cluster and
+    their edges, with `root` set to the cluster root. An 'empty' diagram
+    stands for an analysis without processable nodes. Edges are kept in the
+    order of their keys (Mermaid link text), the order diagrams have always
+    used.
+    """
+
+    __slots__ = ("key", "kind", "elements", "symbols", "edges", "root")
+
+    def __init__(
+        self,
+        key: str,
+        kind: DiagramKind,
+        elements: list[DiagramNode | DiagramSubgraph] | None = None,
+        symbols: list[DiagramNode] | None = None,
+        edges: list[DiagramEdge] | None = None,
+        root: DiagramNode | None = None,
+    ):
+        self.key = key
+        self.kind = kind
+        self.elements = elements if elements is not None else []
+        self.symbols = symbols if symbols is not None else []
+        self.edges = edges if edges is not None else []
+        self.root = root
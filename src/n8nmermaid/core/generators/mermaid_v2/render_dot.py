@@ -0,0 +1,147 @@
+# src/n8nmermaid/core/generators/mermaid_v2/render_dot.py
+"""Renders compiled V2 diagrams (see ir.py) as Graphviz DOT."""
+
+from collections.abc import Iterator
+
+from n8nmermaid.models_v2.request_v2_models import (
+    MermaidDirection,
+    MermaidGenerationParamsV2,
+)
+
+from .constants import (
+    MERMAID_DIRECTION_TO_DOT,
+    MERMAID_SHAPE_TO_DOT,
+    N8N_CONNECTION_TYPE_MAIN,
+)
+from .ir import DiagramEdge, DiagramIR, DiagramNode, DiagramSubgraph
+
+
+def _quote(text: str) -> str:
+    """Quotes a DOT ID or label, escaping backslashes, quotes and newlines."""
+    escaped = text.replace("\\", "\\\\").replace('"', '\\"').replace("\n", "\\n")
+    return f'"{escaped}"'
+
+
+def _graph_header(diagram: DiagramIR, direction: MermaidDirection) -> Iterator[str]:
+    """Yields the opening lines of a DOT digraph."""
+    yield f"digraph {_quote(diagram.key)} {{\n"
+    yield f"    rankdir={MERMAID_DIRECTION_TO_DOT[direction]};\n"
+
+
+def _node_statement(node: DiagramNode, params: MermaidGenerationParamsV2) -> str:
+    """Formats a node statement with the labels the params ask for."""
+    label = "\n".join(
+        node.label_lines(params.show_credentials, params.show_key_parameters)
+    )
+    attributes = MERMAID_SHAPE_TO_DOT.get(node.shape, "shape=box")
+    return f"{_quote(node.id)} [label={_quote(label)}, {attributes}];"
+
+
+def _edge_statement(edge: DiagramEdge, anchors: dict[str, str]) -> str:
+    """
+    Formats an edge statement.
+
+    Graphviz can't connect clusters directly: an edge to or from a subgraph
+    is drawn to one of its nodes (its anchor) and clipped at the cluster
+    border with lhead/ltail.
+    """
+    attributes = []
+    source, target = edge.source, edge.target
+    if source in anchors:
+        attributes.append(f"ltail={_quote(f'cluster_{source}')}")
+        source = anchors[source]
+    if target in anchors:
+        attributes.append(f"lhead={_quote(f'cluster_{target}')}")
+        target = anchors[target]
+    if edge.connection_type != N8N_CONNECTION_TYPE_MAIN:
+        attributes.append("style=dashed")
+    if edge.label:
+        attributes.append(f"label={_quote(edge.label)}")
+    statement = f"{_quote(source)} -> {_quote(target)}"
+    if attributes:
+        statement += f" [{', '.join(attributes)}]"
+    return f"{statement};"
+
+
+def _render_subgraph(
+    subgraph: DiagramSubgraph, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """
+    Yields the lines of a cluster block in the main diagram.
+
+    Graphviz lays out clusters in the graph's direction, so
+    `subgraph_direction` has no DOT equivalent and is ignored.
+    """
+    yield f"    subgraph {_quote(f'cluster_{subgraph.id}')} {{\n"
+    yield f"        label={_quote(subgraph.label)};\n"
+    if not subgraph.nodes:
+        # Keeps an anchor for edges to the cluster
+        yield f"        {_quote(subgraph.id)} [shape=point, style=invis];\n"
+    for node in subgraph.nodes:
+        yield f"        {_node_statement(node, params)}\n"
+    for edge in subgraph.edges:
+        yield f"        {_edge_statement(edge, {})}\n"
+    yield "    }\n"
+
+
+def _render_main(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of the main diagram."""
+    yield from _graph_header(diagram, params.direction)
+    anchors = {
+        element.id: element.nodes[0].id if element.nodes else element.id
+        for element in diagram.elements
+        if isinstance(element, DiagramSubgraph)
+    }
+    if anchors:
+        yield "    compound=true;\n"
+    for element in diagram.elements:
+        if isinstance(element, DiagramSubgraph):
+            yield from _render_subgraph(element, params)
+        else:
+            yield f"    {_node_statement(element, params)}\n"
+    for symbol in diagram.symbols:
+        yield f"    {_node_statement(symbol, params)}\n"
+    for edge in diagram.edges:
+        yield f"    {_edge_statement(edge, anchors)}\n"
+    yield "}\n"
+
+
+def _render_cluster(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of a separate cluster diagram."""
+    yield from _graph_header(diagram, params.subgraph_direction)
+    if diagram.root:
+        yield f"    label={_quote(f'Cluster: {diagram.root.name}')};\n"
+    for node in diagram.elements:
+        if isinstance(node, DiagramNode):
+            yield f"    {_node_statement(node, params)}\n"
+    for edge in diagram.edges:
+        yield f"    {_edge_statement(edge, {})}\n"
+    yield "}\n"
+
+
+def render_dot(diagram: DiagramIR, params: MermaidGenerationParamsV2) -> Iterator[str]:
+    """
+    Renders a compiled diagram as a Graphviz DOT digraph.
+
+    Nodes get the Graphviz shape closest to their Mermaid shape, AI
+    connections are dashed, and subgraphs become clusters.
+
+    Args:
+        diagram: The compiled diagram.
+        params: The diagram generation parameters.
+
+    Yields:
+        The lines of the digraph, each ending in a newline.
+    """
+    if diagram.kind == "main":
+        yield from _render_main(diagram, params)
+    elif diagram.kind == "cluster":
+        yield from _render_cluster(diagram, params)
+    else:
+        yield from _graph_header(diagram, params.direction)
+        yield "    // No processable nodes found\n"
+        yield "}\n"
@@ -0,0 +1,116 @@
+# src/n8nmermaid/core/generators/mermaid_v2/render_json.py
+"""Renders compiled V2 diagrams (see ir.py) as a compact JSON graph."""
+
+from collections.abc import Iterator
+from typing import Any
+
+from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
+from n8nmermaid.utils import json_codec
+
+from .constants import JSON_GRAPH_VERSION
+from .ir import DiagramEdge, DiagramIR, DiagramNode, DiagramSubgraph
+
+
+def _node_object(
+    node: DiagramNode, params: MermaidGenerationParamsV2, parent: str | None = None
+) -> dict[str, Any]:
+    """Builds the JSON object of a node; optional fields are left out if unset."""
+    obj: dict[str, Any] = {
+        "id": node.id,
+        "label": node.name,
+        "shape": node.shape,
+        "group": node.group,
+    }
+    if parent:
+        obj["parent"] = parent
+    if params.show_credentials and node.credential_names:
+        obj["credentials"] = list(node.credential_names)
+    if params.show_key_parameters and node.model:
+        obj["model"] = node.model
+    return obj
+
+
+def _edge_object(edge: DiagramEdge) -> dict[str, Any]:
+    """Builds the JSON object of an edge."""
+    obj: dict[str, Any] = {
+        "source": edge.source,
+        "target": edge.target,
+        "type": edge.connection_type,
+    }
+    if edge.label:
+        obj["label"] = edge.label
+    return obj
+
+
+def build_json_graph(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> dict[str, Any]:
+    """
+    Builds the JSON graph of a compiled diagram.
+
+    Nodes inside a subgraph reference it with `parent`; edges are listed
+    once, whether they run inside a subgraph or between top-level elements,
+    and may have a subgraph as source or target. `credentials` and `model`
+    are only included when the params ask for them.
+
+    Args:
+        diagram: The compiled diagram.
+        params: The diagram generation parameters.
+
+    Returns:
+        A JSON-serializable dictionary with version, key, kind, direction,
+        nodes, subgraphs and edges (plus `root` for cluster diagrams).
+    """
+    cluster = diagram.kind == "cluster"
+    graph: dict[str, Any] = {
+        "version": JSON_GRAPH_VERSION,
+        "key": diagram.key,
+        "kind": diagram.kind,
+        "direction": params.subgraph_direction if cluster else params.direction,
+    }
+    if cluster and diagram.root:
+        graph["root"] = diagram.root.id
+
+    nodes: list[dict[str, Any]] = []
+    subgraphs: list[dict[str, Any]] = []
+    edges: list[dict[str, Any]] = []
+    for element in diagram.elements:
+        if isinstance(element, DiagramSubgraph):
+            subgraphs.append(
+                {
+                    "id": element.id,
+                    "label": element.label,
+                    "direction": params.subgraph_direction,
+                }
+            )
+            nodes.extend(
+                _node_object(node, params, element.id) for node in element.nodes
+            )
+            edges.extend(_edge_object(edge) for edge in element.edges)
+        else:
+            nodes.append(_node_object(element, params))
+    nodes.extend(_node_object(symbol, params) for symbol in diagram.symbols)
+    edges.extend(_edge_object(edge) for edge in diagram.edges)
+
+    graph["nodes"] = nodes
+    graph["subgraphs"] = subgraphs
+    graph["edges"] = edges
+    return graph
+
+
+def render_json(diagram: DiagramIR, params: MermaidGenerationParamsV2) -> Iterator[str]:
+    """
+    Renders a compiled diagram as a compact JSON node/edge graph.
+
+    The whole graph is serialized as one line (see build_json_graph), so
+    unlike the text formats it is held in memory while being written.
+
+    Args:
+        diagram: The compiled diagram.
+        params: The diagram generation parameters.
+
+    Yields:
+        The JSON document, followed by a newline.
+    """
+    yield json_codec.dumps(build_json_graph(diagram, params), ensure_ascii=False)
+    yield "\n"
@@ -0,0 +1,230 @@
+# src/n8nmermaid/core/generators/mermaid_v2/render_mermaid.py
+"""
+Renders compiled V2 diagrams (see ir.py) as Mermaid flowchart syntax.
+
+Besides the regular output there is a compact mode for large diagrams: IDs
+are replaced by short aliases (see mermaid_aliases), nodes use the classic
+bracket shapes instead of `@{ shape: ... }` and comments, blank lines and
+indentation are left out. The alias_table format maps the aliases back to
+the original IDs.
+"""
+
+from collections.abc import Iterator
+
+from n8nmermaid.models_v2.request_v2_models import MermaidGenerationParamsV2
+from n8nmermaid.utils import json_codec
+
+from .helpers import (
+    compact_alias,
+    format_compact_node_definition,
+    format_edge_definition,
+    format_node_definition,
+    format_node_label,
+    sanitize_mermaid_label,
+)
+from .ir import DiagramEdge, DiagramIR, DiagramNode, DiagramSubgraph
+
+
+def _node_definition(node: DiagramNode, params: MermaidGenerationParamsV2) -> str:
+    """Formats a node definition with the labels the params ask for."""
+    label = format_node_label(
+        node.label_lines(params.show_credentials, params.show_key_parameters)
+    )
+    return format_node_definition(node.id, label, node.shape)
+
+
+def _render_subgraph(
+    subgraph: DiagramSubgraph, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of a subgraph block in the main diagram."""
+    yield f'    subgraph {subgraph.id} ["{sanitize_mermaid_label(subgraph.label)}"]\n'
+    yield f"        direction {params.subgraph_direction}\n"
+    for node in subgraph.nodes:
+        yield f"        {_node_definition(node, params)}\n"
+    if subgraph.edges:
+        yield "\n"
+        yield "        %% Internal Connections\n"
+        for edge in subgraph.edges:
+            yield f"        {edge.key}\n"
+    yield "end\n"
+    yield "\n"
+
+
+def _render_main(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of the main diagram."""
+    yield f"flowchart {params.direction}\n"
+    if diagram.elements or diagram.symbols:
+        yield "\n"
+        yield "%% Nodes, Subgraphs & Symbols (Main V2)\n"
+        for element in diagram.elements:
+            if isinstance(element, DiagramSubgraph):
+                yield from _render_subgraph(element, params)
+            else:
+                yield f"    {_node_definition(element, params)}\n"
+        if diagram.symbols:
+            yield "\n"
+            yield "    %% Start/End Symbols\n"
+            for symbol in diagram.symbols:
+                yield f"    {_node_definition(symbol, params)}\n"
+
+    yield "\n"
+    if diagram.edges:
+        yield "%% Connections (Main V2)\n"
+        for edge in diagram.edges:
+            yield f"    {edge.key.strip()}\n"
+    else:
+        yield "    %% No connections generated (Main V2)\n"
+
+
+def _render_cluster(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of a separate cluster diagram."""
+    root = diagram.root
+    title = f"Cluster V2: {root.name} / {root.id}" if root else "Cluster V2"
+    yield f"flowchart {params.subgraph_direction}\n"
+    if diagram.elements:
+        yield "\n"
+        yield f"%% Nodes ({title})\n"
+        for node in diagram.elements:
+            if isinstance(node, DiagramNode):
+                yield f"    {_node_definition(node, params)}\n"
+
+    yield "\n"
+    if diagram.edges:
+        yield f"%% Connections ({title})\n"
+        for edge in diagram.edges:
+            yield f"    {edge.key.strip()}\n"
+    else:
+        yield f"    %% No internal connections found ({title})\n"
+
+
+def mermaid_aliases(diagram: DiagramIR) -> dict[str, str]:
+    """
+    Assigns a short alias to every ID in a compiled diagram.
+
+    Aliases are numbered in the order elements are drawn (each subgraph is
+    followed by its members, then come the Start/End symbols), so the same
+    workflow and display mode always get the same aliases.
+
+    Args:
+        diagram: The compiled diagram.
+
+    Returns:
+        A dictionary mapping original IDs to aliases, in alias order.
+    """
+    aliases: dict[str, str] = {}
+
+    def assign(element_id: str) -> None:
+        if element_id not in aliases:
+            aliases[element_id] = compact_alias(len(aliases))
+
+    for element in diagram.elements:
+        assign(element.id)
+        if isinstance(element, DiagramSubgraph):
+            for node in element.nodes:
+                assign(node.id)
+    for symbol in diagram.symbols:
+        assign(symbol.id)
+    for edge in diagram.edges:
+        assign(edge.source)
+        assign(edge.target)
+    return aliases
+
+
+def _compact_node_definition(
+    node: DiagramNode, params: MermaidGenerationParamsV2, aliases: dict[str, str]
+) -> str:
+    """Formats a compact node definition with the labels the params ask for."""
+    label = format_node_label(
+        node.label_lines(params.show_credentials, params.show_key_parameters)
+    )
+    return format_compact_node_definition(aliases[node.id], label, node.shape)
+
+
+def _compact_edge(edge: DiagramEdge, aliases: dict[str, str]) -> str:
+    """Formats a compact link definition between two aliased elements."""
+    return format_edge_definition(
+        aliases[edge.source],
+        aliases[edge.target],
+        edge.connection_type,
+        edge.label,
+        separator="",
+    )
+
+
+def _render_compact(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """Yields the lines of a diagram in compact mode."""
+    cluster = diagram.kind == "cluster"
+    yield f"flowchart {params.subgraph_direction if cluster else params.direction}\n"
+    aliases = mermaid_aliases(diagram)
+    for element in diagram.elements:
+        if isinstance(element, DiagramSubgraph):
+            label = sanitize_mermaid_label(element.label)
+            yield f'subgraph {aliases[element.id]}["{label}"]\n'
+            yield f"direction {params.subgraph_direction}\n"
+            for node in element.nodes:
+                yield f"{_compact_node_definition(node, params, aliases)}\n"
+            for edge in element.edges:
+                yield f"{_compact_edge(edge, aliases)}\n"
+            yield "end\n"
+        else:
+            yield f"{_compact_node_definition(element, params, aliases)}\n"
+    for symbol in diagram.symbols:
+        yield f"{_compact_node_definition(symbol, params, aliases)}\n"
+    for edge in diagram.edges:
+        yield f"{_compact_edge(edge, aliases)}\n"
+
+
+def render_alias_table(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """
+    Renders the alias table of a compiled diagram's compact Mermaid output.
+
+    Args:
+        diagram: The compiled diagram.
+        params: The diagram generation parameters (unused: aliases only
+            depend on the compiled diagram).
+
+    Yields:
+        A JSON object mapping each alias to its original ID, followed by a
+        newline.
+    """
+    table = {
+        alias: element_id for element_id, alias in mermaid_aliases(diagram).items()
+    }
+    yield json_codec.dumps(table, ensure_ascii=False)
+    yield "\n"
+
+
+def render_mermaid(
+    diagram: DiagramIR, params: MermaidGenerationParamsV2
+) -> Iterator[str]:
+    """
+    Renders a compiled diagram as Mermaid flowchart syntax.
+
+    Only the rendering parameters are used: the directions, the credential
+    and key parameter labels and compact mode. The display mode is fixed
+    when the diagram is compiled.
+
+    Args:
+        diagram: The compiled diagram.
+        params: The Mermaid generation parameters.
+
+    Yields:
+        The lines of the diagram, each ending in a newline.
+    """
+    if params.compact:
+        yield from _render_compact(diagram, params)
+    elif diagram.kind == "main":
+        yield from _render_main(diagram, params)
+    elif diagram.kind == "cluster":
+        yield from _render_cluster(diagram, params)
+    else:
+        yield f"flowchart {params.direction}\n"
+        yield "    %% No processable nodes found\n"
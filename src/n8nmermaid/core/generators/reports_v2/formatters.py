@@ -6,12 +6,13 @@ Provides functions to convert V2 report data models into human-readable
 text formats.
 """
 
-import json
 import logging
 from typing import Any
 
 from pydantic import BaseModel
 
+from n8nmermaid.utils import json_codec
+
 from .models import (
     AgentsReportData,
     CredentialsReportData,
@@ -131,8 +132,8 @@ def _format_node_parameters_report_text(data: NodeParametersReportData) -> str:
             )
             if node_detail.raw_parameters:
                 try:
-                    params_str = json.dumps(
-                        node_detail.raw_parameters, indent=2, sort_keys=True
+                    params_str = json_codec.dumps(
+                        node_detail.raw_parameters, indent=True, sort_keys=True
                     )
                     indented_params = "\n".join(
                         f"    {line}" for line in params_str.splitlines()
@@ -192,7 +193,7 @@ def format_report(
         )
         if isinstance(data, BaseModel):
             try:
-                return data.model_dump_json(indent=2)
+                return json_codec.dumps_model(data, indent=True)
             except Exception as json_err:
                 logger.error(
                     "Failed to dump Pydantic model to JSON for fallback: %s", json_err
@@ -200,6 +201,6 @@ def format_report(
                 return str(data)
         else:
             try:
-                return json.dumps(data, indent=2)
+                return json_codec.dumps(data, indent=True)
             except TypeError:
                 return str(data)
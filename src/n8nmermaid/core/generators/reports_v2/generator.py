@@ -11,7 +11,9 @@ from collections.abc import Callable
 
 from pydantic import BaseModel
 
+from n8nmermaid.core.analyzer_v2.graph import WorkflowGraph, as_workflow_graph
 from n8nmermaid.core.analyzer_v2.models import WorkflowAnalysisV2
+from n8nmermaid.core.analyzer_v2.planner import AnalysisField
 from n8nmermaid.models_v2.request_v2_models import (
     ReportGenerationParamsV2,
     ReportType,
@@ -32,7 +34,7 @@ class ReportGeneratorError(Exception):
     pass
 
 
-ReportDataGeneratorV2 = Callable[[WorkflowAnalysisV2], BaseModel]
+ReportDataGeneratorV2 = Callable[[WorkflowGraph], BaseModel]
 
 
 _REPORT_GENERATORS_V2: dict[ReportType, ReportDataGeneratorV2] = {
@@ -42,6 +44,15 @@ _REPORT_GENERATORS_V2: dict[ReportType, ReportDataGeneratorV2] = {
     "node_parameters": generate_node_parameters_data_v2,
 }
 
+# Analysis fields each report reads; None means the full analysis
+_REPORT_REQUIRED_FIELDS: dict[ReportType, frozenset[AnalysisField] | None] = {
+    "stats": frozenset({"classification"}),
+    "credentials": frozenset({"nodes"}),
+    "agents": frozenset({"classification", "extracted_parameters"}),
+    "node_parameters": frozenset({"nodes"}),
+    "analysis_json": None,
+}
+
 
 class ReportGeneratorV2:
     """
@@ -50,23 +61,45 @@ class ReportGeneratorV2:
 
     def __init__(
         self,
-        analysis: WorkflowAnalysisV2,
+        analysis: WorkflowGraph | WorkflowAnalysisV2,
         params: ReportGenerationParamsV2,
     ):
         """
         Initializes the ReportGeneratorV2.
 
         Args:
-            analysis: The completed WorkflowAnalysisV2 object.
+            analysis: The completed WorkflowGraph (or its WorkflowAnalysisV2 view).
             params: The ReportGenerationParamsV2 specifying report type(s) and format.
         """
-        self.analysis = analysis
+        self.analysis = as_workflow_graph(analysis)
         self.params = params
         logger.debug(
             "ReportGeneratorV2 initialized for report types: %s",
             self.params.report_types,
         )
 
+    @staticmethod
+    def required_fields(
+        params: ReportGenerationParamsV2,
+    ) -> set[AnalysisField] | None:
+        """
+        Returns the analysis fields the requested report types read.
+
+        Args:
+            params: The ReportGenerationParamsV2 that will be used.
+
+        Returns:
+            A set of analysis field names for the analyzer's phase planner, or
+            None if the full analysis is needed.
+        """
+        fields: set[AnalysisField] = set()
+        for report_type in params.report_types:
+            report_fields = _REPORT_REQUIRED_FIELDS.get(report_type)
+            if report_fields is None:
+                return None
+            fields |= report_fields
+        return fields
+
     def generate(self) -> str:
         """
         Generates the requested combined report string from V2 analysis.
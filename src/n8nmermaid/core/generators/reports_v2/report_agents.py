@@ -3,11 +3,8 @@
 
 import logging
 
-from n8nmermaid.core.analyzer_v2.models import (
-    AnalyzedNodeV2,
-    NodeGroupType,
-    WorkflowAnalysisV2,
-)
+from n8nmermaid.core.analyzer_v2.graph import NodeRecord, WorkflowGraph
+from n8nmermaid.core.analyzer_v2.models import NodeGroupType
 
 from .models import AgentDetail, AgentsReportData, ModelCredentialInfo
 
@@ -15,7 +12,7 @@ logger = logging.getLogger(__name__)
 
 
 def _find_connected_llm_details(
-    agent_node: AnalyzedNodeV2, analysis_nodes: dict[str, AnalyzedNodeV2]
+    agent_node: NodeRecord, analysis_nodes: dict[str, NodeRecord]
 ) -> tuple[str | None, list[ModelCredentialInfo] | None]:
     """
     Finds connected LLM node and extracts model identifier and credentials.
@@ -36,9 +33,8 @@ def _find_connected_llm_details(
     llm_node_id: str | None = None
     connected_llm_ids: list[str] = []
 
-    for conn in agent_node.connectivity.incoming_connections:
-        if conn.connection_type == "ai_languageModel":
-            connected_llm_ids.append(conn.source_node_id)
+    for conn in agent_node.incoming_of_type("ai_languageModel"):
+        connected_llm_ids.append(conn.source_node_id)
 
     if not connected_llm_ids:
         logger.debug("Agent '%s' has no ai_languageModel input.", agent_node.name)
@@ -61,9 +57,9 @@ def _find_connected_llm_details(
         or llm_node.extracted_parameters.get("model_identifier")
     )
 
-    if llm_node.credentials.has_credentials:
+    if llm_node.has_credentials:
         model_creds = []
-        for cred_type, details in llm_node.credentials.details.items():
+        for cred_type, details in llm_node.credentials.items():
             model_creds.append(
                 ModelCredentialInfo(type=cred_type, name=details.name, id=details.id)
             )
@@ -87,7 +83,7 @@ def _find_connected_llm_details(
 
 
 def _find_connected_tools(
-    agent_node: AnalyzedNodeV2, analysis_nodes: dict[str, AnalyzedNodeV2]
+    agent_node: NodeRecord, analysis_nodes: dict[str, NodeRecord]
 ) -> list[str]:
     """
     Finds tools connected to the agent node via 'ai_tool' connections.
@@ -104,12 +100,10 @@ def _find_connected_tools(
     tools_list: list[str] = []
     connected_tool_ids: list[str] = []
 
-    for conn in agent_node.connectivity.incoming_connections:
-        if conn.connection_type == "ai_tool":
-            connected_tool_ids.append(conn.source_node_id)
-    for conn in agent_node.connectivity.outgoing_connections:
-        if conn.connection_type == "ai_tool":
-            connected_tool_ids.append(conn.target_node_id)
+    for conn in agent_node.incoming_of_type("ai_tool"):
+        connected_tool_ids.append(conn.source_node_id)
+    for conn in agent_node.outgoing_of_type("ai_tool"):
+        connected_tool_ids.append(conn.target_node_id)
 
     unique_tool_ids = set(connected_tool_ids)
 
@@ -127,7 +121,7 @@ def _find_connected_tools(
     return sorted(tools_list)
 
 
-def _find_system_message(agent_node: AnalyzedNodeV2) -> str | None:
+def _find_system_message(agent_node: NodeRecord) -> str | None:
     """
     Finds the system message from the agent's extracted parameters.
 
@@ -146,7 +140,7 @@ def _find_system_message(agent_node: AnalyzedNodeV2) -> str | None:
     return None
 
 
-def generate_agents_data_v2(analysis: WorkflowAnalysisV2) -> AgentsReportData:
+def generate_agents_data_v2(analysis: WorkflowGraph) -> AgentsReportData:
     """
     Generates the structured data for the Agents report from V2 analysis.
 
@@ -154,7 +148,7 @@ def generate_agents_data_v2(analysis: WorkflowAnalysisV2) -> AgentsReportData:
     LLM, model credentials, system message, and connected tools.
 
     Args:
-        analysis: The completed WorkflowAnalysisV2 object.
+        analysis: The completed WorkflowGraph object.
 
     Returns:
         An AgentsReportData object listing the identified agents and their details.
@@ -164,23 +158,22 @@ def generate_agents_data_v2(analysis: WorkflowAnalysisV2) -> AgentsReportData:
         logger.warning("V2 Agents report: No nodes found in analysis.")
         return AgentsReportData(agents=agents_list)
 
-    for node in analysis.nodes.values():
-        if node.classification.group_type == NodeGroupType.CLUSTER_ROOT:
-            agent_model, model_creds = _find_connected_llm_details(
-                node, analysis.nodes
-            )
-            tools_list = _find_connected_tools(node, analysis.nodes)
-            system_message = _find_system_message(node)
-
-            agent_info = AgentDetail(
-                node_id=node.id,
-                node_name=node.name,
-                model=agent_model,
-                model_credentials=model_creds,
-                system_message=system_message,
-                tools_used=tools_list,
-            )
-            agents_list.append(agent_info)
+    for node in analysis.index.nodes_in_group(NodeGroupType.CLUSTER_ROOT):
+        agent_model, model_creds = _find_connected_llm_details(
+            node, analysis.nodes
+        )
+        tools_list = _find_connected_tools(node, analysis.nodes)
+        system_message = _find_system_message(node)
+
+        agent_info = AgentDetail(
+            node_id=node.id,
+            node_name=node.name,
+            model=agent_model,
+            model_credentials=model_creds,
+            system_message=system_message,
+            tools_used=tools_list,
+        )
+        agents_list.append(agent_info)
 
     logger.info("Generated V2 agents data: Found %d agents.", len(agents_list))
     return AgentsReportData(agents=agents_list)
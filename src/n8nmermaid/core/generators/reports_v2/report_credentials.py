@@ -3,7 +3,7 @@
 
 import logging
 
-from n8nmermaid.core.analyzer_v2.models import WorkflowAnalysisV2
+from n8nmermaid.core.analyzer_v2.graph import WorkflowGraph
 
 from .models import CredentialsReportData, CredentialUsageInfo
 
@@ -11,41 +11,36 @@ logger = logging.getLogger(__name__)
 
 
 def generate_credentials_data_v2(
-    analysis: WorkflowAnalysisV2,
+    analysis: WorkflowGraph,
 ) -> CredentialsReportData:
     """
     Generates the structured data for the Credentials report from V2 analysis.
 
-    Scans all nodes in the analysis for credential usage, aggregates the
-    information, and returns a structured list of unique credentials found.
+    Lists the unique credentials found on the analysis's nodes (from the
+    graph's credential index) with the nodes using each of them.
 
     Args:
-        analysis: The completed WorkflowAnalysisV2 object.
+        analysis: The completed WorkflowGraph object.
 
     Returns:
         A CredentialsReportData object listing the used credentials and the
         nodes using them.
     """
-    creds_map: dict[tuple[str, str | None, str | None], CredentialUsageInfo] = {}
-
     if not analysis or not analysis.nodes:
         logger.warning("V2 Credentials report: No nodes found in analysis.")
         return CredentialsReportData()
 
-    for node in analysis.nodes.values():
-        if node.credentials.has_credentials:
-            for cred_type, details in node.credentials.details.items():
-                key = (cred_type, details.name, details.id)
-                if key not in creds_map:
-                    creds_map[key] = CredentialUsageInfo(
-                        credential_type=cred_type,
-                        credential_name=details.name,
-                        credential_id=details.id,
-                        used_by_nodes=[],
-                    )
-                creds_map[key].used_by_nodes.append(f"{node.name} ({node.id})")
-
-    cred_list = list(creds_map.values())
+    cred_list = [
+        CredentialUsageInfo(
+            credential_type=cred_type,
+            credential_name=cred_name,
+            credential_id=cred_id,
+            used_by_nodes=[f"{node.name} ({node.id})" for node in nodes],
+        )
+        for (cred_type, cred_name, cred_id), nodes in (
+            analysis.index.by_credential.items()
+        )
+    ]
     logger.info(
         "Generated V2 credentials data: Found %d unique credentials.", len(cred_list)
     )
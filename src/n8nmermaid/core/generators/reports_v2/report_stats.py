@@ -2,16 +2,16 @@
 """Generates structured data for the V2 workflow statistics report."""
 
 import logging
-from collections import Counter
 
-from n8nmermaid.core.analyzer_v2.models import NodeGroupType, WorkflowAnalysisV2
+from n8nmermaid.core.analyzer_v2.graph import WorkflowGraph
+from n8nmermaid.core.analyzer_v2.models import NodeGroupType
 
 from .models import NodeCountByType, StatsReportData
 
 logger = logging.getLogger(__name__)
 
 
-def generate_stats_data_v2(analysis: WorkflowAnalysisV2) -> StatsReportData:
+def generate_stats_data_v2(analysis: WorkflowGraph) -> StatsReportData:
     """
     Generates the structured data for the Statistics report from V2 analysis.
 
@@ -19,7 +19,7 @@ def generate_stats_data_v2(analysis: WorkflowAnalysisV2) -> StatsReportData:
     usage, disabled status, cluster presence, and analysis warnings.
 
     Args:
-        analysis: The completed WorkflowAnalysisV2 object.
+        analysis: The completed WorkflowGraph object.
 
     Returns:
         A StatsReportData object containing the calculated statistics.
@@ -28,30 +28,28 @@ def generate_stats_data_v2(analysis: WorkflowAnalysisV2) -> StatsReportData:
         logger.warning("V2 Stats report: No nodes found in analysis.")
         return StatsReportData(total_nodes=0)
 
-    nodes = list(analysis.nodes.values())
-    node_types = Counter(node.type for node in nodes)
-    node_groups = Counter(node.classification.group_type.value for node in nodes)
+    nodes = analysis.nodes.values()
+    index = analysis.index
 
-    nodes_with_creds = sum(1 for node in nodes if node.credentials.has_credentials)
+    nodes_with_creds = sum(1 for node in nodes if node.has_credentials)
     disabled_nodes = sum(1 for node in nodes if node.is_disabled)
-    cluster_roots = sum(
-        1
-        for node in nodes
-        if node.classification.group_type == NodeGroupType.CLUSTER_ROOT
-    )
+    cluster_roots = len(index.nodes_in_group(NodeGroupType.CLUSTER_ROOT))
 
     nodes_by_type_list = [
-        NodeCountByType(node_type=nt, count=c) for nt, c in node_types.items()
+        NodeCountByType(node_type=nt, count=len(typed))
+        for nt, typed in index.by_type.items()
     ]
 
     stats_data = StatsReportData(
         total_nodes=len(nodes),
         nodes_by_type=nodes_by_type_list,
-        nodes_by_role=dict(node_groups),
+        nodes_by_role={
+            group.value: len(grouped) for group, grouped in index.by_group_type.items()
+        },
         nodes_with_credentials=nodes_with_creds,
         disabled_nodes=disabled_nodes,
         cluster_roots=cluster_roots,
-        total_warnings=len(analysis.analysis_warnings),
+        total_warnings=len(analysis.warnings),
     )
     logger.info("Generated V2 stats data: %d nodes processed.", len(nodes))
     return stats_data
@@ -7,8 +7,10 @@ in V2 models.
 """
 
 import logging
+from collections.abc import Iterator
 
-from n8nmermaid.core.analyzer_v2 import WorkflowAnalysisV2, WorkflowAnalyzerV2
+from n8nmermaid.core.analysis_cache import AnalysisCache, get_analysis_cache
+from n8nmermaid.core.analyzer_v2 import AnalysisField, WorkflowGraph
 from n8nmermaid.core.generators.mermaid_v2 import MermaidGeneratorV2
 from n8nmermaid.core.generators.reports_v2 import (
     ReportGeneratorError,
@@ -16,9 +18,11 @@ from n8nmermaid.core.generators.reports_v2 import (
 )
 from n8nmermaid.models_v2.request_v2_models import (
     AnalysisRequestV2,
+    CombinedResultV2,
     ReportGenerationParamsV2,
     RequestCommand,
 )
+from n8nmermaid.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
@@ -37,13 +41,17 @@ class OrchestratorV2:
     data within the request.
     """
 
-    def __init__(self, request: AnalysisRequestV2):
+    def __init__(
+        self, request: AnalysisRequestV2, cache: AnalysisCache | None = None
+    ):
         """
         Initializes the OrchestratorV2.
 
         Args:
             request: The AnalysisRequestV2 containing workflow data (as dict)
                     and command parameters. Uses V2 parameter models.
+            cache: The analysis cache to use. Defaults to the shared
+                    process-wide cache (see get_analysis_cache).
 
         Raises:
             TypeError: If request is not an AnalysisRequestV2 object.
@@ -52,40 +60,145 @@ class OrchestratorV2:
             raise TypeError("OrchestratorV2 requires an AnalysisRequestV2 object.")
 
         self.request = request
+        self.cache = cache if cache is not None else get_analysis_cache()
         logger.debug(
             "OrchestratorV2 initialized with command: %s", self.request.command
         )
 
-    def process_request(self) -> str | dict[str, str]:
+    def _required_fields(self) -> set[AnalysisField] | None:
         """
-        Executes the V2 analysis and generation steps defined in the request.
+        Determines which analysis fields the requested command will read.
 
         Returns:
-            For 'generate_mermaid', a dictionary where keys are diagram
-            identifiers ("main", cluster root names) and values are Mermaid
-            diagram strings.
-            For 'generate_report', a string containing the report content or
-            serialized V2 analysis data.
+            The analysis fields for the phase planner, or None to run the
+            full analysis (also used when the request can't be planned).
+        """
+        match self.request.command:
+            case "generate_mermaid":
+                fields = MermaidGeneratorV2.required_fields(
+                    self.request.mermaid_params
+                )
+                for params in self.request.mermaid_variants:
+                    fields |= MermaidGeneratorV2.required_fields(params)
+                return fields
+            case "generate_report" if self.request.report_params:
+                return ReportGeneratorV2.required_fields(self.request.report_params)
+            case "generate_combined" if self.request.report_params:
+                mermaid_fields = MermaidGeneratorV2.required_fields(
+                    self.request.mermaid_params
+                )
+                report_fields = ReportGeneratorV2.required_fields(
+                    self.request.report_params
+                )
+                if mermaid_fields is None or report_fields is None:
+                    return None
+                return mermaid_fields | report_fields
+            case _:
+                return None
+
+    def _generate_mermaid(self, analysis_result: WorkflowGraph) -> dict[str, str]:
+        """
+        Generates the Mermaid diagrams for the request.
+
+        Args:
+            analysis_result: The analyzed workflow graph.
+
+        Returns:
+            The diagrams keyed by identifier ("main", cluster root names).
+        """
+        logger.debug("Instantiating MermaidGeneratorV2...")
+        generator = MermaidGeneratorV2(
+            analysis=analysis_result, params=self.request.mermaid_params
+        )
+        logger.debug("Generating V2 Mermaid output...")
+        return generator.generate()
+
+    def _generate_report(self, analysis_result: WorkflowGraph) -> str:
+        """
+        Generates the report(s) requested in the report parameters.
+
+        Args:
+            analysis_result: The analyzed workflow graph.
+
+        Returns:
+            The report content, or the serialized analysis for 'analysis_json'.
 
         Raises:
-            OrchestratorErrorV2: If a critical step fails. # <-- Docstring bijgewerkt
+            OrchestratorErrorV2: If report parameters are missing or invalid,
+                or report generation fails.
         """
-        logger.info("Processing V2 request command: %s", self.request.command)
+        report_params: ReportGenerationParamsV2 | None = self.request.report_params
+        if not report_params:
+            logger.error(
+                "Command '%s' requires 'report_params'.", self.request.command
+            )
+            raise OrchestratorErrorV2(
+                f"Missing report parameters for '{self.request.command}'."
+            )
+
+        requested_types = report_params.report_types
+        output_format = report_params.output_format
+
+        logger.info(
+            "Processing report types: %s with format: %s",
+            ", ".join(requested_types),
+            output_format,
+        )
+
+        if "analysis_json" in requested_types:
+            if len(requested_types) > 1:
+                logger.error("Report type 'analysis_json' cannot be combined.")
+                raise OrchestratorErrorV2(
+                    "Report type 'analysis_json' cannot be combined."
+                )
+            logger.debug("Serializing WorkflowAnalysisV2 object to JSON...")
+            return json_codec.dumps_model(analysis_result.to_analysis(), indent=True)
 
-        analysis_result: WorkflowAnalysisV2
         try:
-            logger.debug("Instantiating WorkflowAnalyzerV2...")
-            analyzer = WorkflowAnalyzerV2(workflow_data=self.request.workflow_data)
-            logger.debug("Running V2 workflow analysis...")
-            analysis_result = analyzer.analyze()
+            logger.debug("Instantiating ReportGeneratorV2...")
+            report_generator = ReportGeneratorV2(
+                analysis=analysis_result, params=report_params
+            )
+            logger.debug("Generating combined V2 report string...")
+            return report_generator.generate()
+        except ReportGeneratorError as rge:
+            logger.error("ReportGeneratorV2 failed: %s", rge)
+            raise OrchestratorErrorV2(str(rge)) from rge
+        except Exception as e:
+            logger.exception("Unexpected error during V2 report generation.")
+            raise OrchestratorErrorV2(
+                "Unexpected error generating V2 combined report."
+            ) from e
 
-            if analysis_result.analysis_warnings:
+    def analyze(self) -> WorkflowGraph:
+        """
+        Runs (or fetches from the cache) the analysis the request needs.
+
+        Returns:
+            The analyzed workflow graph, with at least one node.
+
+        Raises:
+            OrchestratorErrorV2: If the analysis fails or finds no nodes.
+        """
+        analysis_result: WorkflowGraph
+        try:
+            required_fields = self._required_fields()
+            logger.debug(
+                "Running V2 workflow analysis for fields: %s",
+                sorted(required_fields) if required_fields is not None else "all",
+            )
+            analysis_result = self.cache.analyze(
+                self.request.workflow_data,
+                required_fields,
+                trusted=self.request.trusted_input,
+            )
+
+            if analysis_result.warnings:
+                # Individual messages are logged (at debug level) by the analyzer
                 logger.warning(
-                    "V2 Analysis completed with %d warnings:",
-                    len(analysis_result.analysis_warnings),
+                    "V2 Analysis completed with %d warnings.",
+                    len(analysis_result.warnings),
                 )
-                for warning in analysis_result.analysis_warnings:
-                    logger.warning("  - %s", warning)
 
         except Exception as e:
             logger.exception("Critical error during V2 workflow analysis phase.")
@@ -96,74 +209,99 @@ class OrchestratorV2:
             raise OrchestratorErrorV2(
                 "V2 Workflow analysis yielded no processable nodes."
             )
+        return analysis_result
+
+    def stream_mermaid(self) -> list[tuple[str, Iterator[str]]]:
+        """
+        Analyzes the workflow and returns its diagrams for streaming output.
+
+        The analysis and the diagram compilation (see
+        MermaidGeneratorV2.compile) run immediately, so their cost and errors
+        stay with the caller; only the lines are rendered while the caller
+        consumes them.
+
+        Returns:
+            A list of (diagram key, iterator of diagram lines).
+
+        Raises:
+            OrchestratorErrorV2: If the analysis or the compilation fails.
+        """
+        analysis_result = self.analyze()
+        try:
+            generator = MermaidGeneratorV2(
+                analysis=analysis_result, params=self.request.mermaid_params
+            )
+            # iter_diagrams() compiles when iterated; the renderers are lazy
+            return list(generator.iter_diagrams())
+        except Exception as e:
+            logger.exception("Critical error during V2 Mermaid diagram compilation.")
+            raise OrchestratorErrorV2(
+                f"Output generation failed for Mermaid stream: {e}"
+            ) from e
+
+    def generate_mermaid_variants(self) -> list[dict[str, str]]:
+        """
+        Analyzes the workflow once and renders every requested diagram variant.
+
+        Returns:
+            One diagram dictionary per entry of the request's
+            `mermaid_variants`, in order, or a single one for its
+            `mermaid_params` if no variants are given.
+
+        Raises:
+            OrchestratorErrorV2: If the analysis or the generation fails.
+        """
+        variants = self.request.mermaid_variants or [self.request.mermaid_params]
+        logger.info("Processing V2 request for %d Mermaid variant(s).", len(variants))
+        analysis_result = self.analyze()
+        try:
+            generator = MermaidGeneratorV2(
+                analysis=analysis_result, params=self.request.mermaid_params
+            )
+            return generator.generate_variants(variants)
+        except Exception as e:
+            logger.exception("Critical error during V2 Mermaid variant generation.")
+            raise OrchestratorErrorV2(
+                f"Output generation failed for Mermaid variants: {e}"
+            ) from e
+
+    def process_request(self) -> str | dict[str, str] | CombinedResultV2:
+        """
+        Executes the V2 analysis and generation steps defined in the request.
+
+        Returns:
+            For 'generate_mermaid', a dictionary where keys are diagram
+            identifiers ("main", cluster root names) and values are Mermaid
+            diagram strings.
+            For 'generate_report', a string containing the report content or
+            serialized V2 analysis data.
+            For 'generate_combined', a CombinedResultV2 holding both, generated
+            from a single analysis.
+
+        Raises:
+            OrchestratorErrorV2: If a critical step fails. # <-- Docstring bijgewerkt
+        """
+        logger.info("Processing V2 request command: %s", self.request.command)
+        analysis_result = self.analyze()
 
         command: RequestCommand = self.request.command
-        output: str | dict[str, str]
+        output: str | dict[str, str] | CombinedResultV2
 
         try:
             logger.debug("Selecting V2 generator for command '%s'...", command)
             match command:
                 case "generate_mermaid":
-                    logger.debug("Instantiating MermaidGeneratorV2...")
-                    generator = MermaidGeneratorV2(
-                        analysis=analysis_result, params=self.request.mermaid_params
-                    )
-                    logger.debug("Generating V2 Mermaid output...")
-                    output = generator.generate()
+                    output = self._generate_mermaid(analysis_result)
 
                 case "generate_report":
-                    report_params: ReportGenerationParamsV2 | None = (
-                        self.request.report_params
-                    )
-                    if not report_params:
-                        logger.error(
-                            "Command 'generate_report' requires 'report_params'."
-                        )
-                        raise OrchestratorErrorV2(
-                            "Missing report parameters for 'generate_report'."
-                        )
-
-                    requested_types = report_params.report_types
-                    output_format = report_params.output_format
-
-                    logger.info(
-                        "Processing report types: %s with format: %s",
-                        ", ".join(requested_types),
-                        output_format,
-                    )
+                    output = self._generate_report(analysis_result)
 
-                    if "analysis_json" in requested_types:
-                        if len(requested_types) > 1:
-                            logger.error(
-                                "Report type 'analysis_json' cannot be combined."
-                            )
-                            raise OrchestratorErrorV2(
-                                "Report type 'analysis_json' cannot be combined."
-                            )
-                        logger.debug(
-                            "Serializing WorkflowAnalysisV2 object to JSON..."
-                        )
-                        output = analysis_result.model_dump_json(indent=2)
-                    else:
-                        try:
-                            logger.debug("Instantiating ReportGeneratorV2...")
-                            report_generator = ReportGeneratorV2(
-                                analysis=analysis_result, params=report_params
-                            )
-                            logger.debug(
-                                "Generating combined V2 report string..."
-                            )
-                            output = report_generator.generate()
-                        except ReportGeneratorError as rge:
-                            logger.error("ReportGeneratorV2 failed: %s", rge)
-                            raise OrchestratorErrorV2(str(rge)) from rge
-                        except Exception as e:
-                            logger.exception(
-                                "Unexpected error during V2 report generation."
-                            )
-                            raise OrchestratorErrorV2(
-                                "Unexpected error generating V2 combined report."
-                            ) from e
+                case "generate_combined":
+                    # One analysis fanned out to both generators
+                    output = CombinedResultV2(
+                        diagrams=self._generate_mermaid(analysis_result),
+                        report=self._generate_report(analysis_result),
+                    )
 
                 case _:
                     logger.error("Unsupported command received: %s", command)
@@ -185,7 +323,67 @@ class OrchestratorV2:
         return output
 
 
-def process_v2(request: AnalysisRequestV2) -> str | dict[str, str]:
+def stream_mermaid_v2(
+    request: AnalysisRequestV2, cache: AnalysisCache | None = None
+) -> list[tuple[str, Iterator[str]]]:
+    """
+    Functional interface to analyze a workflow and stream its diagrams.
+
+    Writers (files, sockets, streaming HTTP responses) can emit the diagram
+    lines as they are generated instead of holding whole diagram strings;
+    joining each diagram's lines gives the same text as process_v2. The
+    analysis and the diagram compilation run before this returns.
+
+    Args:
+        request: The AnalysisRequestV2 (its command is not checked; the
+                 Mermaid parameters are used).
+        cache: The analysis cache to use (see OrchestratorV2).
+
+    Returns:
+        A list of (diagram key, iterator of newline-terminated lines).
+
+    Raises:
+        OrchestratorErrorV2: If the analysis or the compilation fails.
+        TypeError: If input types are incorrect.
+    """
+    try:
+        return OrchestratorV2(request=request, cache=cache).stream_mermaid()
+    except (TypeError, OrchestratorErrorV2) as e:
+        logger.error("Failed to stream V2 Mermaid diagrams: %s", e)
+        raise
+
+
+def process_mermaid_variants_v2(
+    request: AnalysisRequestV2, cache: AnalysisCache | None = None
+) -> list[dict[str, str]]:
+    """
+    Functional interface to render several Mermaid variants of one workflow.
+
+    The workflow is analyzed once and its diagrams are compiled once per
+    subgraph display mode, whatever the number of variants.
+
+    Args:
+        request: The AnalysisRequestV2 (its command is not checked; the
+                 variants come from `mermaid_variants`).
+        cache: The analysis cache to use (see OrchestratorV2).
+
+    Returns:
+        One diagram dictionary per variant, in the order requested.
+
+    Raises:
+        OrchestratorErrorV2: If the analysis or the generation fails.
+        TypeError: If input types are incorrect.
+    """
+    try:
+        return OrchestratorV2(request=request, cache=cache).generate_mermaid_variants()
+    except (TypeError, OrchestratorErrorV2) as e:
+        logger.error("Failed to generate V2 Mermaid variants: %s", e)
+        raise
+
+
+def process_v2(
+    request: AnalysisRequestV2, cache: AnalysisCache | None = None
+) -> str | dict[str, str] | CombinedResultV2:
     """
     Functional interface to run the V2 orchestration process.
 
@@ -194,16 +392,20 @@ def process_v2(request: AnalysisRequestV2) -> str | dict[str, str]:
     Args:
         request: The AnalysisRequestV2 object containing V2 workflow data
                  and parameters.
+        cache: The analysis cache to use (see OrchestratorV2). One-shot
+                 callers can pass a disabled cache to skip hashing the
+                 workflow.
 
     Returns:
-        The generated output (Mermaid diagram dict, report string, etc.).
+        The generated output (Mermaid diagram dict, report string, or
+        CombinedResultV2).
 
     Raises:
         OrchestratorErrorV2: If the orchestration process fails. # <-- Docstring bijgewerkt
         TypeError: If input types are incorrect.
     """
     try:
-        orchestrator = OrchestratorV2(request=request)
+        orchestrator = OrchestratorV2(request=request, cache=cache)
         return orchestrator.process_request()
     except (TypeError, OrchestratorErrorV2) as e:
         logger.error(
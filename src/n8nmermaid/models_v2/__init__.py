@@ -2,6 +2,12 @@
 """Initializes the V2 models package, exporting key data structures."""
 
 from n8nmermaid.core.analyzer_v2.constants import N8nConnectionLiteral
+from n8nmermaid.core.analyzer_v2.graph import (
+    CredentialRef,
+    EdgeRecord,
+    NodeRecord,
+    WorkflowGraph,
+)
 from n8nmermaid.core.analyzer_v2.models import (
     AnalyzedNodeV2,
     ClusterInfoV2,
@@ -29,6 +35,8 @@ from n8nmermaid.core.generators.reports_v2.models import (
 
 from .request_v2_models import (
     AnalysisRequestV2,
+    CombinedResultV2,
+    DiagramFormat,
     MermaidDirection,
     MermaidGenerationParamsV2,
     ReportFormat,
@@ -42,6 +50,7 @@ from .request_v2_models import (
 __all__ = [
     # V2 Request Models & Types
     "AnalysisRequestV2",
+    "CombinedResultV2",
     "MermaidGenerationParamsV2",
     "ReportGenerationParamsV2",
     "RequestCommand",
@@ -49,6 +58,7 @@ __all__ = [
     "ReportFormat",
     "SubgraphDisplayMode",
     "MermaidDirection",
+    "DiagramFormat",
     # V2 Analysis Result Models & Types
     "AnalyzedNodeV2",
     "WorkflowAnalysisV2",
@@ -61,6 +71,11 @@ __all__ = [
     "ClusterInfoV2",
     "ClusterRole",
     "N8nConnectionLiteral",
+    # V2 Compact Analysis Graph
+    "WorkflowGraph",
+    "NodeRecord",
+    "EdgeRecord",
+    "CredentialRef",
     "StatsReportData",
     "CredentialsReportData",
     "AgentsReportData",
@@ -6,7 +6,7 @@ from typing import Any, Literal
 from pydantic import BaseModel, Field, field_validator
 
 MermaidDirection = Literal["TD", "LR", "TB", "RL", "BT"]
-RequestCommand = Literal["generate_mermaid", "generate_report"]
+RequestCommand = Literal["generate_mermaid", "generate_report", "generate_combined"]
 ReportType = Literal[
     "stats",
     "credentials",
@@ -16,6 +16,7 @@ ReportType = Literal[
 ]
 ReportFormat = Literal["text", "markdown", "json"]
 SubgraphDisplayMode = Literal["subgraph", "simple_node", "separate_clusters"]
+DiagramFormat = Literal["mermaid", "dot", "json", "alias_table"]
 
 DEFAULT_DIRECTION_V2: MermaidDirection = "LR"
 DEFAULT_SUBGRAPH_DIRECTION_V2: MermaidDirection = "BT"
@@ -29,6 +30,11 @@ class MermaidGenerationParamsV2(BaseModel):
     show_credentials: bool = False
     show_key_parameters: bool = False
     subgraph_display_mode: SubgraphDisplayMode = "subgraph"
+    # Mermaid flowchart, Graphviz DOT, a JSON node/edge graph, or the
+    # alias -> node ID table of compact Mermaid output
+    output_format: DiagramFormat = "mermaid"
+    # Mermaid output with short node aliases and no comments or indentation
+    compact: bool = False
 
     class Config:
         """Pydantic configuration"""
@@ -58,6 +64,16 @@ class ReportGenerationParamsV2(BaseModel):
         extra = "forbid"
 
 
+class CombinedResultV2(BaseModel):
+    """
+    Output of a 'generate_combined' request: the diagrams and the report
+    generated from a single analysis of the workflow.
+    """
+
+    diagrams: dict[str, str]
+    report: str
+
+
 class AnalysisRequestV2(BaseModel):
     """
     Represents a V2 request to analyze and process an n8n workflow.
@@ -69,6 +85,37 @@ class AnalysisRequestV2(BaseModel):
         default_factory=MermaidGenerationParamsV2
     )
     report_params: ReportGenerationParamsV2 | None = None
+    # Extra parameter sets rendered from one analysis and one compiled diagram
+    # per display mode (see process_mermaid_variants_v2)
+    mermaid_variants: list[MermaidGenerationParamsV2] = Field(default_factory=list)
+    # Known-good input (e.g. from our own export pipeline) skips Phase 1
+    # per-field validation
+    trusted_input: bool = False
+
+    @classmethod
+    def from_workflow(
+        cls, workflow_data: dict[str, Any], **fields: Any
+    ) -> "AnalysisRequestV2":
+        """
+        Builds a request around already-loaded workflow data.
+
+        The other fields are validated as usual, but the workflow dict is
+        neither validated nor copied: the request holds a reference to it.
+        Use this when the data comes from a JSON parser (a dict of plain
+        JSON values) and must not be duplicated.
+
+        Args:
+            workflow_data: The parsed n8n workflow, used as is.
+            **fields: The remaining AnalysisRequestV2 fields.
+
+        Returns:
+            The AnalysisRequestV2.
+        """
+        validated = cls(workflow_data={}, **fields)
+        return cls.model_construct(
+            _fields_set=validated.model_fields_set | {"workflow_data"},
+            **{**dict(validated), "workflow_data": workflow_data},
+        )
 
     class Config:
         """Pydantic configuration"""
@@ -0,0 +1,49 @@
+# src/n8nmermaid/utils/env.py
+"""Helpers for reading numeric settings from environment variables."""
+
+import logging
+import os
+
+logger = logging.getLogger(__name__)
+
+
+def env_int(name: str, default: int) -> int:
+    """
+    Reads a non-negative integer from the environment.
+
+    Args:
+        name: The environment variable name.
+        default: Value used when the variable is unset, empty or invalid.
+
+    Returns:
+        The parsed value, clamped to zero or more.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return max(int(value), 0)
+    except ValueError:
+        logger.warning("Invalid %s '%s'. Defaulting to %d.", name, value, default)
+        return default
+
+
+def env_float(name: str, default: float) -> float:
+    """
+    Reads a non-negative float from the environment.
+
+    Args:
+        name: The environment variable name.
+        default: Value used when the variable is unset, empty or invalid.
+
+    Returns:
+        The parsed value, clamped to zero or more.
+    """
+    value = os.getenv(name)
+    if value is None or value.strip() == "":
+        return default
+    try:
+        return max(float(value), 0.0)
+    except ValueError:
+        logger.warning("Invalid %s '%s'. Defaulting to %s.", name, value, default)
+        return default
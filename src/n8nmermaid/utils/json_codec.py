@@ -0,0 +1,222 @@
+# src/n8nmermaid/utils/json_codec.py
+"""
+JSON encoding and decoding with the fastest available backend.
+
+Uses orjson when it is installed (`pip install n8nmermaid[speedups]`) and
+falls back to the standard library otherwise. The backend can be forced with
+the N8NMERMAID_JSON_BACKEND environment variable ('auto', 'orjson' or 'json')
+or with set_backend().
+
+Both backends produce the same text for JSON data, with one exception: orjson
+writes floats in exponent notation without padding ('1e-7' instead of the
+standard library's '1e-07').
+
+Parsing differs on input at the edges of JSON: orjson reads integers outside
+the range of 64-bit integers (below -2**63 or above 2**64 - 1) as floats,
+losing precision, where the standard library keeps them exact; and it
+rejects the non-standard NaN/Infinity literals, numbers that overflow a
+float and unpaired surrogate escapes, which the standard library accepts.
+Use the 'json' backend when such values must round-trip exactly.
+"""
+
+import json
+import logging
+import os
+import re
+from collections.abc import Callable
+from typing import Any
+
+from pydantic import BaseModel
+
+logger = logging.getLogger(__name__)
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+# Raised by loads() for invalid JSON; orjson's error is a subclass
+JSONDecodeError = json.JSONDecodeError
+
+JSON_BACKENDS = ("auto", "orjson", "json")
+
+# Characters the standard library escapes with ensure_ascii (DEL included)
+_NON_ASCII = re.compile(r"[^\x00-\x7e]")
+
+_orjson: Any = None
+BACKEND = "json"
+
+
+def set_backend(name: str) -> str:
+    """
+    Selects the JSON backend.
+
+    Args:
+        name: 'auto' (orjson if installed, else json), 'orjson' or 'json'.
+
+    Returns:
+        The name of the backend now in use.
+
+    Raises:
+        ValueError: If the name is unknown or orjson is requested but not
+            installed.
+    """
+    global _orjson, BACKEND
+    if name not in JSON_BACKENDS:
+        raise ValueError(f"Unknown JSON backend: '{name}'")
+    if name == "orjson" and orjson is None:
+        raise ValueError("JSON backend 'orjson' requested but it is not installed.")
+    _orjson = orjson if name != "json" else None
+    BACKEND = "orjson" if _orjson is not None else "json"
+    return BACKEND
+
+
+def _backend_from_env() -> None:
+    """Applies N8NMERMAID_JSON_BACKEND, falling back to 'auto'."""
+    name = os.getenv("N8NMERMAID_JSON_BACKEND", "auto").strip().lower()
+    try:
+        set_backend(name)
+    except ValueError as e:
+        logger.warning("%s Defaulting to auto.", e)
+        set_backend("auto")
+
+
+def _escape_non_ascii(match: re.Match[str]) -> str:
+    """Escapes a character as the standard library does with ensure_ascii."""
+    code = ord(match.group())
+    if code < 0x10000:
+        return f"\\u{code:04x}"
+    code -= 0x10000
+    return f"\\u{0xD800 | (code >> 10):04x}\\u{0xDC00 | (code & 0x3FF):04x}"
+
+
+def loads(data: bytes | bytearray | memoryview | str) -> Any:
+    """
+    Parses a JSON document.
+
+    Args:
+        data: The JSON document, as UTF-8 bytes (preferred, avoids a decoded
+            str copy with orjson) or str.
+
+    Returns:
+        The parsed Python object. With orjson, integers outside the 64-bit
+        range come back as floats (see the module docstring).
+
+    Raises:
+        JSONDecodeError: If the document is not valid JSON (or, with orjson,
+            uses NaN/Infinity, overflowing numbers or unpaired surrogates).
+    """
+    if _orjson is not None:
+        return _orjson.loads(data)
+    if isinstance(data, memoryview):
+        data = data.tobytes()
+    return json.loads(data)
+
+
+def dumps(
+    obj: Any,
+    *,
+    indent: bool = False,
+    sort_keys: bool = False,
+    ensure_ascii: bool = True,
+) -> str:
+    """
+    Serializes an object to JSON text.
+
+    The output matches `json.dumps(obj, indent=2 if indent else None,
+    sort_keys=sort_keys, ensure_ascii=ensure_ascii)`, except that compact
+    output uses no whitespace after separators. Objects orjson can't encode
+    (non-string keys, integers beyond 64 bits) go to the standard library.
+
+    Args:
+        obj: The object to serialize.
+        indent: Indent nested values by two spaces.
+        sort_keys: Sort dictionary keys.
+        ensure_ascii: Escape non-ASCII characters as \\uXXXX sequences.
+
+    Returns:
+        The JSON text.
+
+    Raises:
+        TypeError: If the object is not JSON serializable.
+    """
+    if _orjson is not None:
+        option = (_orjson.OPT_INDENT_2 if indent else 0) | (
+            _orjson.OPT_SORT_KEYS if sort_keys else 0
+        )
+        try:
+            text = _orjson.dumps(obj, option=option).decode("utf-8")
+        except _orjson.JSONEncodeError:
+            pass
+        else:
+            if ensure_ascii:
+                text = _NON_ASCII.sub(_escape_non_ascii, text)
+            return text
+    return json.dumps(
+        obj,
+        indent=2 if indent else None,
+        separators=None if indent else (",", ":"),
+        sort_keys=sort_keys,
+        ensure_ascii=ensure_ascii,
+    )
+
+
+def dumps_bytes(
+    obj: Any,
+    *,
+    sort_keys: bool = False,
+    default: Callable[[Any], Any] | None = None,
+) -> bytes:
+    """
+    Serializes an object to compact UTF-8 JSON, e.g. for content hashing.
+
+    Args:
+        obj: The object to serialize.
+        sort_keys: Sort dictionary keys.
+        default: Called for objects that aren't JSON serializable; returns a
+            serializable replacement. orjson natively encodes some types
+            (dataclasses, datetimes, enums) the standard library passes here,
+            so the output for such objects differs between backends.
+
+    Returns:
+        The JSON document as UTF-8 bytes, without ASCII escaping.
+
+    Raises:
+        TypeError: If the object is not JSON serializable.
+    """
+    if _orjson is not None:
+        try:
+            return _orjson.dumps(
+                obj,
+                default=default,
+                option=_orjson.OPT_SORT_KEYS if sort_keys else 0,
+            )
+        except _orjson.JSONEncodeError:
+            pass
+    return json.dumps(
+        obj,
+        separators=(",", ":"),
+        sort_keys=sort_keys,
+        ensure_ascii=False,
+        default=default,
+    ).encode("utf-8")
+
+
+def dumps_model(model: BaseModel, *, indent: bool = False) -> str:
+    """
+    Serializes a Pydantic model to JSON text.
+
+    Pydantic's own serializer is native code and faster than dumping the
+    model to a dict for orjson, so it is used with either backend.
+
+    Args:
+        model: The model to serialize.
+        indent: Indent nested values by two spaces.
+
+    Returns:
+        The JSON text, with non-ASCII characters unescaped.
+    """
+    return model.model_dump_json(indent=2 if indent else None)
+
+
+_backend_from_env()
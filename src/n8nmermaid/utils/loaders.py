@@ -4,24 +4,194 @@ Functions for loading n8n workflow JSON. # Updated Docstring
 Handles file reading, JSON parsing, and basic validation.
 """
 
-import json
+import codecs
+import gzip
 import logging
+import mmap
+import os
+import re
+import tarfile
+import zipfile
+from collections.abc import Collection, Iterator
 from pathlib import Path
-from typing import Any
+from typing import IO, Any
+
+from n8nmermaid.utils import json_codec
 
 logger = logging.getLogger(__name__)
 
+# Smallest file for which load_workflow_from_file scans for the requested keys
+# instead of parsing everything: below it, materializing the unused fields is
+# cheap and a full parse is faster than the regex-driven scan
+SELECTIVE_PARSE_MIN_BYTES = 1024 * 1024
+
+# Files iter_workflow_documents can read, and the workflow files it reads
+# from archives
+ARCHIVE_SUFFIXES = (
+    ".zip", ".tar", ".tar.gz", ".tgz", ".tar.bz2", ".tbz2", ".tar.xz", ".txz"
+)
+JSON_SUFFIXES = (".json", ".json.gz")
+WORKFLOW_FILE_SUFFIXES = JSON_SUFFIXES + ARCHIVE_SUFFIXES
+
+# Read size of streamed (compressed or archived) workflow documents
+_STREAM_READ_SIZE = 1024 * 1024
+
+_WHITESPACE = re.compile(rb'[ \t\n\r]*')
+_STRING_PATTERN = rb'"(?:[^"\\]++|\\.)*+"'
+_STRING = re.compile(_STRING_PATTERN, re.DOTALL)
+# A string or a bare scalar (number, true, false, null). A bare scalar never
+# starts with a quote, so an unterminated string doesn't match at all
+_SCALAR = re.compile(
+    _STRING_PATTERN + rb'|[^",}\] \t\n\r][^,}\] \t\n\r]*', re.DOTALL
+)
+
+
+def _bracket_skip_pattern(levels: int) -> re.Pattern[bytes]:
+    """
+    Builds a regex consuming everything up to the next unmatched bracket.
+
+    Strings are consumed whole (they may contain brackets), and so are
+    bracketed groups nested up to `levels` deep, leaving only deeper or
+    closing brackets to the caller.
+    """
+    flat = rb'[^"\[\]{}]++|' + _STRING_PATTERN
+    inner = flat
+    for _ in range(levels):
+        inner = flat + rb'|[\[{](?:' + inner + rb')*+[\]}]'
+    return re.compile(rb'(?:' + inner + rb')*+', re.DOTALL)
+
+
+_TO_BRACKET = _bracket_skip_pattern(5)
+
+
+class _ScanError(ValueError):
+    """Raised when the top-level scan can't make sense of a document."""
+
+    pass
+
+
+def _value_end(buf: Any, pos: int) -> int:
+    """Returns the offset just past the JSON value starting at `pos`."""
+    if buf[pos:pos + 1] not in (b'{', b'['):
+        match = _SCALAR.match(buf, pos)
+        if match is None:
+            if buf[pos:pos + 1] == b'"':
+                raise _ScanError(f"Unterminated string at offset {pos}")
+            raise _ScanError(f"Expected a value at offset {pos}")
+        return match.end()
+
+    # Only brackets nested deeper than _TO_BRACKET's levels need a
+    # Python-level step; everything else is consumed by the regex engine
+    depth = 1
+    pos += 1
+    size = len(buf)
+    while True:
+        pos = _TO_BRACKET.match(buf, pos).end()
+        if pos >= size:
+            raise _ScanError("Unterminated object or array")
+        if buf[pos] == ord('"'):
+            raise _ScanError(f"Unterminated string at offset {pos}")
+        depth += 1 if buf[pos] in b'[{' else -1
+        pos += 1
+        if depth == 0:
+            return pos
+
+
+def _scan_top_level(buf: Any, keys: Collection[str]) -> dict[str, Any]:
+    """
+    Parses only the given top-level keys of a JSON object document.
+
+    Values of other keys are stepped over without being parsed, so they are
+    neither validated nor materialized.
+
+    Args:
+        buf: The document as bytes or a memory-mapped file.
+        keys: The top-level keys to parse.
+
+    Returns:
+        A dictionary of the parsed keys present in the document.
+
+    Raises:
+        _ScanError: If the document is not a JSON object the scan can follow.
+        json_codec.JSONDecodeError: If a parsed value is invalid JSON.
+    """
+    pos = len(codecs.BOM_UTF8) if buf[:3] == codecs.BOM_UTF8 else 0
+    pos = _WHITESPACE.match(buf, pos).end()
+    if buf[pos:pos + 1] != b'{':
+        raise _ScanError("Document is not a JSON object")
+    pos = _WHITESPACE.match(buf, pos + 1).end()
+
+    result: dict[str, Any] = {}
+    separator = buf[pos:pos + 1]
+    if separator == b'}':
+        pos += 1
+    while separator != b'}':
+        match = _STRING.match(buf, pos)
+        if match is None:
+            raise _ScanError(f"Expected a key at offset {pos}")
+        key = json_codec.loads(match.group())
+        pos = _WHITESPACE.match(buf, match.end()).end()
+        if buf[pos:pos + 1] != b':':
+            raise _ScanError(f"Expected ':' at offset {pos}")
+        start = _WHITESPACE.match(buf, pos + 1).end()
+        end = _value_end(buf, start)
+        if key in keys:
+            result[key] = json_codec.loads(buf[start:end])
+        pos = _WHITESPACE.match(buf, end).end()
+        separator = buf[pos:pos + 1]
+        if separator not in (b',', b'}'):
+            raise _ScanError(f"Expected ',' or '}}' at offset {pos}")
+        pos = _WHITESPACE.match(buf, pos + 1).end()
+
+    pos = _WHITESPACE.match(buf, pos).end()
+    if pos != len(buf):
+        raise _ScanError(f"Unexpected data after the object at offset {pos}")
+    return result
+
+
+def _parse_workflow_bytes(buf: Any, keys: Collection[str] | None) -> Any:
+    """Parses a workflow document, optionally limited to top-level `keys`."""
+    if keys is not None and len(buf) >= SELECTIVE_PARSE_MIN_BYTES:
+        try:
+            return _scan_top_level(buf, keys)
+        except (_ScanError, json_codec.JSONDecodeError) as e:
+            # A full parse reports the precise error, or succeeds on input
+            # the scan is too strict for
+            logger.debug("Selective parse failed (%s), parsing whole file.", e)
+
+    with memoryview(buf) as view:
+        if view[:3] == codecs.BOM_UTF8:
+            with view[3:] as content:
+                document = json_codec.loads(content)
+        else:
+            document = json_codec.loads(view)
+    if keys is not None and isinstance(document, dict):
+        document = {k: v for k, v in document.items() if k in keys}
+    return document
 
 
-def load_workflow_from_file(filepath: Path) -> dict[str, Any] | None:
+def load_workflow_from_file(
+    filepath: Path, keys: Collection[str] | None = None
+) -> dict[str, Any] | None:
     """
     Loads and parses the n8n workflow JSON file from the given path.
 
     Handles file not found, JSON decoding errors, and checks if the top-level
     element is a dictionary. Removes UTF-8 BOM if present.
 
+    Gzipped files, archives and JSON arrays (see iter_workflow_documents) are
+    read with iter_workflows_from_path and must hold exactly one workflow;
+    use iter_workflows_from_path (the CLI batch command) for larger exports.
+
+    A plain JSON file is memory-mapped and parsed from bytes. With `keys`,
+    only those top-level fields are returned (e.g. the analyzer's
+    WORKFLOW_INPUT_KEYS). In plain files of at least SELECTIVE_PARSE_MIN_BYTES
+    the other fields, such as large 'pinData' or 'staticData' blocks, are
+    skipped without being decoded, validated or materialized.
+
     Args:
         filepath: The path to the workflow JSON file.
+        keys: The top-level keys to load, or None to load the whole workflow.
 
     Returns:
         A dictionary representing the workflow, or None if loading or parsing fails.
@@ -31,14 +201,19 @@ def load_workflow_from_file(filepath: Path) -> dict[str, Any] | None:
         logger.error("Workflow file not found at: %s", filepath)
         return None
 
+    if filepath.name.lower().endswith((".gz",) + ARCHIVE_SUFFIXES):
+        return _load_single_workflow(filepath, keys)
+
     try:
-        # Ensure correct encoding and handle potential BOM
-        with open(filepath, encoding='utf-8-sig') as f:
-            # Read the entire content first (though for large files consider streaming)
-            content = f.read()
-            # Now parse the content using json.loads
-            workflow = json.loads(content)
+        with open(filepath, 'rb') as f:
+            if os.fstat(f.fileno()).st_size == 0:
+                workflow = _parse_workflow_bytes(b'', keys)
+            else:
+                with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+                    workflow = _parse_workflow_bytes(buf, keys)
 
+            if isinstance(workflow, list):
+                return _load_single_workflow(filepath, keys)
             if not isinstance(workflow, dict):
                 logger.error(
                     "Error: Expected JSON object at the top level in %s, got %s.",
@@ -51,7 +226,7 @@ def load_workflow_from_file(filepath: Path) -> dict[str, Any] | None:
                 workflow.get('name', 'Unnamed'), filepath
             )
             return workflow
-    except json.JSONDecodeError as e:
+    except json_codec.JSONDecodeError as e:
         logger.error("Error: Invalid JSON in %s. Details: %s", filepath, e)
         return None
     except FileNotFoundError: # Should be caught by is_file, but good practice
@@ -60,3 +235,223 @@ def load_workflow_from_file(filepath: Path) -> dict[str, Any] | None:
     except Exception as e: # Catch other potential errors like permission issues
         logger.exception("Unexpected error loading workflow %s: %s", filepath, e)
         return None
+
+
+def _load_single_workflow(
+    filepath: Path, keys: Collection[str] | None
+) -> dict[str, Any] | None:
+    """Loads the only workflow of a gzipped file, archive or JSON array."""
+    workflows = iter_workflows_from_path(filepath, keys)
+    try:
+        first = next(workflows, None)
+        if first is None:
+            logger.error("Error: No workflow found in %s.", filepath)
+            return None
+        label, workflow = first
+        if workflow is None:
+            return None
+        second = next(workflows, None)
+        if second is not None:
+            logger.error(
+                "Error: %s holds more than one workflow (%s, %s, ...). "
+                "Use the batch command to process them all.",
+                filepath, label, second[0]
+            )
+            return None
+    finally:
+        workflows.close()
+
+    logger.info(
+        "Successfully loaded workflow '%s' from %s",
+        workflow.get('name', 'Unnamed'), filepath
+    )
+    return workflow
+
+
+def is_workflow_file(path: Path | str) -> bool:
+    """True if the file name has one of the WORKFLOW_FILE_SUFFIXES."""
+    return str(path).lower().endswith(WORKFLOW_FILE_SUFFIXES)
+
+
+def _iter_stream_documents(
+    stream: IO[bytes], label: str
+) -> Iterator[tuple[str, bytes]]:
+    """
+    Yields the JSON documents of a stream: the value itself, or each element
+    of a top-level array, read incrementally.
+
+    Raises:
+        ValueError: If a top-level array is malformed or truncated.
+    """
+    buffer = bytearray(stream.read(_STREAM_READ_SIZE))
+    eof = not buffer
+
+    def read_more() -> bool:
+        nonlocal eof
+        # Grow reads with the buffer, so rescanning a large element after
+        # each read stays linear overall
+        chunk = stream.read(max(_STREAM_READ_SIZE, len(buffer)))
+        buffer.extend(chunk)
+        eof = not chunk
+        return not eof
+
+    def skip_whitespace(pos: int) -> int:
+        pos = _WHITESPACE.match(buffer, pos).end()
+        while pos == len(buffer) and read_more():
+            pos = _WHITESPACE.match(buffer, pos).end()
+        return pos
+
+    pos = len(codecs.BOM_UTF8) if buffer[:3] == codecs.BOM_UTF8 else 0
+    pos = skip_whitespace(pos)
+    if buffer[pos:pos + 1] != b'[':
+        # A single document (normally a workflow object) is read whole
+        buffer.extend(stream.read())
+        yield label, bytes(memoryview(buffer)[pos:])
+        return
+
+    pos = skip_whitespace(pos + 1)
+    index = 0
+    where = f" of '{label}'" if label else ""
+    while buffer[pos:pos + 1] != b']':
+        if index:
+            if buffer[pos:pos + 1] != b',':
+                raise ValueError(
+                    f"Expected ',' after element {index - 1} of the JSON "
+                    f"array{where}"
+                )
+            pos = skip_whitespace(pos + 1)
+        while True:
+            try:
+                end = _value_end(buffer, pos)
+                if end < len(buffer) or eof:
+                    break
+            except _ScanError as e:
+                if eof:
+                    raise ValueError(
+                        f"Invalid or truncated element {index} of the JSON "
+                        f"array{where}: {e}"
+                    ) from e
+            read_more()
+        yield f"{label}[{index}]", bytes(memoryview(buffer)[pos:end])
+        index += 1
+        del buffer[:end]
+        pos = skip_whitespace(0)
+        if pos == len(buffer):
+            raise ValueError(f"Truncated JSON array{where}")
+
+
+def _iter_member_documents(stream: IO[bytes], name: str) -> Iterator[tuple[str, bytes]]:
+    """Yields the documents of an archive member, decompressing '.gz' ones."""
+    if name.lower().endswith(".gz"):
+        with gzip.GzipFile(fileobj=stream) as unzipped:
+            yield from _iter_stream_documents(unzipped, name)
+    else:
+        yield from _iter_stream_documents(stream, name)
+
+
+def iter_workflow_documents(path: Path) -> Iterator[tuple[str, bytes]]:
+    """
+    Lazily yields the raw JSON workflow documents stored in a file.
+
+    Reads plain and gzipped JSON files holding one workflow or an array of
+    workflows (as written by `n8n export:workflow --all`), and the '.json'
+    and '.json.gz' members of zip and tar archives, without extracting them
+    to disk. Arrays are split element by element as they are read, so memory
+    stays bounded by the largest single workflow.
+
+    Args:
+        path: A file with one of the WORKFLOW_FILE_SUFFIXES.
+
+    Yields:
+        Tuples of (label, document bytes). The label is '' for a file holding
+        a single workflow; otherwise it names the archive member and/or array
+        index, e.g. 'team/flows.json[3]'.
+
+    Raises:
+        ValueError: If the file type is unsupported or the file is corrupt.
+        OSError: If the file can't be read.
+    """
+    lower = path.name.lower()
+    try:
+        if lower.endswith(".zip"):
+            with zipfile.ZipFile(path) as archive:
+                for info in archive.infolist():
+                    if not info.is_dir() and info.filename.lower().endswith(
+                        JSON_SUFFIXES
+                    ):
+                        with archive.open(info) as member:
+                            yield from _iter_member_documents(member, info.filename)
+        elif lower.endswith(ARCHIVE_SUFFIXES):
+            # Stream mode reads the archive strictly sequentially
+            with tarfile.open(path, mode="r|*") as archive:
+                for info in archive:
+                    if info.isfile() and info.name.lower().endswith(JSON_SUFFIXES):
+                        member = archive.extractfile(info)
+                        if member is not None:
+                            with member:
+                                yield from _iter_member_documents(member, info.name)
+        elif lower.endswith(".gz"):
+            with gzip.open(path, "rb") as stream:
+                yield from _iter_stream_documents(stream, "")
+        elif lower.endswith(".json"):
+            with open(path, "rb") as stream:
+                yield from _iter_stream_documents(stream, "")
+        else:
+            raise ValueError(f"Unsupported workflow file type: {path.name}")
+    except (zipfile.BadZipFile, tarfile.TarError, EOFError) as e:
+        raise ValueError(f"Could not read archive {path}: {e}") from e
+
+
+def parse_workflow(data: bytes, keys: Collection[str] | None = None) -> dict[str, Any]:
+    """
+    Parses one workflow document, e.g. from iter_workflow_documents.
+
+    Args:
+        data: The workflow JSON as bytes.
+        keys: The top-level keys to keep, or None for the whole workflow (see
+            load_workflow_from_file).
+
+    Returns:
+        The workflow dictionary.
+
+    Raises:
+        ValueError: If the document is invalid JSON or not a JSON object.
+    """
+    workflow = _parse_workflow_bytes(data, keys)
+    if not isinstance(workflow, dict):
+        raise ValueError(
+            "Expected a JSON object holding a workflow, "
+            f"got {type(workflow).__name__}."
+        )
+    return workflow
+
+
+def iter_workflows_from_path(
+    path: Path, keys: Collection[str] | None = None
+) -> Iterator[tuple[str, dict[str, Any] | None]]:
+    """
+    Lazily yields the workflows stored in a file, parsing each as it's read.
+
+    See iter_workflow_documents for the supported files and labels. Errors
+    are logged, like in load_workflow_from_file: a document that can't be
+    parsed yields None, and a corrupt or unreadable file yields ('', None)
+    and ends the iteration.
+
+    Args:
+        path: A file with one of the WORKFLOW_FILE_SUFFIXES.
+        keys: The top-level keys to load, or None to load whole workflows.
+
+    Yields:
+        Tuples of (label, workflow dictionary or None).
+    """
+    try:
+        for label, data in iter_workflow_documents(path):
+            try:
+                yield label, parse_workflow(data, keys)
+            except ValueError as e:
+                logger.error("Error: Invalid workflow %s in %s: %s", label, path, e)
+                yield label, None
+    except (ValueError, OSError) as e:
+        logger.error("Error: Could not read workflows from %s: %s", path, e)
+        yield "", None
+
@@ -0,0 +1,46 @@
+"""Tests for the shared analysis cache (core/analysis_cache.py)."""
+
+from n8nmermaid.core.analysis_cache import AnalysisCache
+from n8nmermaid.core.analyzer_v2 import WorkflowAnalyzerV2
+
+
+def _workflow() -> dict:
+    """A trigger followed by a Set node."""
+    return {
+        "nodes": [
+            {
+                "id": "a",
+                "name": "A",
+                "type": "n8n-nodes-base.manualTrigger",
+                "typeVersion": 1,
+                "position": [0, 0],
+                "parameters": {},
+            },
+            {
+                "id": "b",
+                "name": "B",
+                "type": "n8n-nodes-base.set",
+                "typeVersion": 3.4,
+                "position": [200, 0],
+                "parameters": {"mode": "raw", "jsonOutput": '{"step": 1}'},
+            },
+        ],
+        "connections": {"A": {"main": [[{"node": "B", "type": "main", "index": 0}]]}},
+    }
+
+
+def test_completing_phases_leaves_returned_graphs_untouched():
+    cache = AnalysisCache()
+    workflow = _workflow()
+
+    partial = cache.analyze(workflow, {"classification"})
+    partial_phases = set(partial.completed_phases)
+    full = cache.analyze(workflow)
+
+    assert full is not partial
+    assert partial.completed_phases == partial_phases
+    assert partial.nodes["b"].extracted_parameters == {}
+    assert partial.nodes["b"].incoming == full.nodes["b"].incoming
+    assert full.to_analysis() == WorkflowAnalyzerV2(workflow).analyze()
+    assert cache.analyze(workflow) is full
+    assert cache.analyze(workflow, {"classification"}) is full
@@ -0,0 +1,52 @@
+"""Tests for Phase 3 cluster detection (analyzer_v2/phase_3_cluster_analysis.py)."""
+
+from n8nmermaid.core.analyzer_v2 import WorkflowAnalyzerV2
+from n8nmermaid.core.analyzer_v2.models import ClusterRole
+
+
+def _node(node_id: str, node_type: str, x: int) -> dict:
+    return {
+        "id": node_id,
+        "name": node_id.title(),
+        "type": node_type,
+        "typeVersion": 1,
+        "position": [x, 0],
+        "parameters": {},
+    }
+
+
+def _shared_model_workflow() -> dict:
+    """Two chained agents that share one chat model."""
+    agent = "@n8n/n8n-nodes-langchain.agent"
+    return {
+        "nodes": [
+            _node("trigger", "n8n-nodes-base.manualTrigger", 0),
+            _node("first", agent, 200),
+            _node("second", agent, 400),
+            _node("model", "@n8n/n8n-nodes-langchain.lmChatOpenAi", 300),
+        ],
+        "connections": {
+            "Trigger": {"main": [[{"node": "First", "type": "main", "index": 0}]]},
+            "First": {"main": [[{"node": "Second", "type": "main", "index": 0}]]},
+            "Model": {
+                "ai_languageModel": [
+                    [
+                        {"node": "First", "type": "ai_languageModel", "index": 0},
+                        {"node": "Second", "type": "ai_languageModel", "index": 0},
+                    ]
+                ]
+            },
+        },
+    }
+
+
+def test_agents_sharing_a_sub_node_form_one_cluster_without_warnings():
+    graph = WorkflowAnalyzerV2(_shared_model_workflow()).analyze_graph({"clusters"})
+    nodes = graph.nodes
+
+    assert graph.warnings.messages() == []
+    assert nodes["first"].cluster_role == ClusterRole.ROOT
+    assert nodes["model"].cluster_role == ClusterRole.SUB_ROOT
+    assert nodes["second"].cluster_role == ClusterRole.SUB
+    assert {node.cluster_root_id for node in nodes.values()} == {None, "first"}
+    assert nodes["trigger"].cluster_root_id is None
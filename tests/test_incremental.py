@@ -0,0 +1,133 @@
+"""Tests for incremental re-analysis (analyzer_v2/incremental.py)."""
+
+import copy
+import logging
+
+import pytest
+
+from n8nmermaid.core.analyzer_v2 import WorkflowAnalyzerV2
+
+INCREMENTAL_LOGGER = "n8nmermaid.core.analyzer_v2.incremental"
+
+
+def _workflow() -> dict:
+    """A trigger, an agent with a chat model and a chain of Set nodes."""
+    nodes = [
+        {
+            "id": "trigger",
+            "name": "Trigger",
+            "type": "n8n-nodes-base.manualTrigger",
+            "typeVersion": 1,
+            "position": [0, 0],
+            "parameters": {},
+        },
+        {
+            "id": "agent",
+            "name": "Agent",
+            "type": "@n8n/n8n-nodes-langchain.agent",
+            "typeVersion": 1.7,
+            "position": [200, 0],
+            "parameters": {"text": "={{ $json.chatInput }}"},
+        },
+        {
+            "id": "model",
+            "name": "Model",
+            "type": "@n8n/n8n-nodes-langchain.lmChatOpenAi",
+            "typeVersion": 1,
+            "position": [200, 200],
+            "parameters": {"model": "gpt-4o-mini", "options": {}},
+        },
+    ]
+    connections: dict = {
+        "Trigger": {"main": [[{"node": "Agent", "type": "main", "index": 0}]]},
+        "Model": {
+            "ai_languageModel": [
+                [{"node": "Agent", "type": "ai_languageModel", "index": 0}]
+            ]
+        },
+    }
+    previous = "Agent"
+    for number in range(1, 7):
+        name = f"Set {number}"
+        nodes.append(
+            {
+                "id": f"set{number}",
+                "name": name,
+                "type": "n8n-nodes-base.set",
+                "typeVersion": 3.4,
+                "position": [200 + 200 * number, 0],
+                "parameters": {"mode": "raw", "jsonOutput": f'{{"step": {number}}}'},
+            }
+        )
+        connections[previous] = {"main": [[{"node": name, "type": "main", "index": 0}]]}
+        previous = name
+    return {"name": "Incremental test", "nodes": nodes, "connections": connections}
+
+
+def _dump(graph) -> dict:
+    return graph.to_analysis().model_dump()
+
+
+def test_detects_in_place_edits_after_an_incremental_analysis(caplog):
+    workflow = _workflow()
+    first = WorkflowAnalyzerV2(copy.deepcopy(workflow)).analyze_graph()
+    # Incremental results are fingerprinted right after parsing
+    previous = WorkflowAnalyzerV2(workflow).analyze_incremental(first)
+
+    # The caller edits the same dict the previous analysis was parsed from
+    workflow["nodes"][2]["parameters"]["model"] = "gpt-4o"
+    with caplog.at_level(logging.INFO, logger=INCREMENTAL_LOGGER):
+        graph = WorkflowAnalyzerV2(workflow).analyze_incremental(previous)
+
+    assert "falling back" not in caplog.text
+    assert "1 edited" in caplog.text
+    assert graph.nodes["model"].extracted_parameters == (
+        WorkflowAnalyzerV2(workflow).analyze_graph().nodes["model"].extracted_parameters
+    )
+    assert _dump(graph) == _dump(WorkflowAnalyzerV2(workflow).analyze_graph())
+
+
+def test_in_place_edits_of_an_unfingerprinted_analysis_are_recomputed():
+    workflow = _workflow()
+    previous = WorkflowAnalyzerV2(workflow).analyze_graph()
+    assert not any(node.has_fingerprint for node in previous.nodes.values())
+
+    workflow["nodes"][2]["parameters"]["model"] = "gpt-4o"
+    graph = WorkflowAnalyzerV2(workflow).analyze_incremental(previous)
+
+    assert _dump(graph) == _dump(WorkflowAnalyzerV2(workflow).analyze_graph())
+
+
+@pytest.mark.parametrize("edit", ["rename", "disable", "credentials"])
+def test_reuses_a_previous_pydantic_analysis(caplog, edit):
+    workflow = _workflow()
+    previous = WorkflowAnalyzerV2(copy.deepcopy(workflow)).analyze()
+
+    node = workflow["nodes"][4]
+    connections = workflow["connections"]
+    if edit == "rename":
+        node["name"] = "Set renamed"
+        connections["Set renamed"] = connections.pop("Set 2")
+        connections["Set 1"]["main"][0][0]["node"] = "Set renamed"
+    elif edit == "disable":
+        node["disabled"] = True
+    else:
+        node["credentials"] = {"httpBasicAuth": {"id": "1", "name": "Basic"}}
+
+    with caplog.at_level(logging.INFO, logger=INCREMENTAL_LOGGER):
+        graph = WorkflowAnalyzerV2(workflow).analyze_incremental(previous)
+
+    assert "falling back" not in caplog.text
+    assert "Incremental analysis:" in caplog.text
+    assert _dump(graph) == _dump(WorkflowAnalyzerV2(workflow).analyze_graph())
+
+
+def test_unchanged_pydantic_analysis_recomputes_nothing(caplog):
+    workflow = _workflow()
+    previous = WorkflowAnalyzerV2(copy.deepcopy(workflow)).analyze()
+
+    with caplog.at_level(logging.INFO, logger=INCREMENTAL_LOGGER):
+        graph = WorkflowAnalyzerV2(workflow).analyze_incremental(previous)
+
+    assert "0 edited, 0 rewired, 0 removed" in caplog.text
+    assert _dump(graph) == _dump(WorkflowAnalyzerV2(workflow).analyze_graph())
@@ -0,0 +1,28 @@
+"""Tests for the documented parsing differences of the JSON backends."""
+
+import pytest
+
+from n8nmermaid.utils import json_codec
+
+BIG = 2**64
+
+
+@pytest.fixture
+def backend():
+    """Yields set_backend and restores the original backend afterwards."""
+    original = json_codec.BACKEND
+    yield json_codec.set_backend
+    json_codec.set_backend(original)
+
+
+def test_json_backend_keeps_integers_beyond_64_bits_exact(backend):
+    backend("json")
+    assert json_codec.loads(f"[{BIG}, {-(2**63) - 1}]") == [BIG, -(2**63) - 1]
+
+
+def test_orjson_backend_reads_integers_beyond_64_bits_as_floats(backend):
+    pytest.importorskip("orjson")
+    backend("orjson")
+    assert json_codec.loads(f"[{BIG - 1}, {BIG}]") == [BIG - 1, float(BIG)]
+    with pytest.raises(json_codec.JSONDecodeError):
+        json_codec.loads("[NaN]")
@@ -0,0 +1,63 @@
+"""Tests for loading single workflows from files (utils/loaders.py)."""
+
+import gzip
+import zipfile
+
+import pytest
+
+from n8nmermaid.utils import json_codec, loaders
+
+WORKFLOW = {
+    "name": "Loader test",
+    "nodes": [],
+    "connections": {},
+    "pinData": {"A": [{"json": {}}]},
+}
+
+
+def _write(path, workflows) -> None:
+    """Writes `workflows` (a workflow or list of them) in the file's format."""
+    name = path.name
+    if name.endswith(".zip"):
+        with zipfile.ZipFile(path, "w") as archive:
+            for index, workflow in enumerate(workflows):
+                archive.writestr(f"{index}.json", json_codec.dumps(workflow))
+    elif name.endswith(".gz"):
+        path.write_bytes(gzip.compress(json_codec.dumps_bytes(workflows)))
+    else:
+        path.write_bytes(json_codec.dumps_bytes(workflows))
+
+
+@pytest.mark.parametrize("name", ["flow.json.gz", "flow.zip", "flows.json"])
+def test_loads_the_only_workflow_of_a_gzip_archive_or_array(tmp_path, name):
+    path = tmp_path / name
+    _write(path, WORKFLOW if name == "flow.json.gz" else [WORKFLOW])
+
+    assert loaders.load_workflow_from_file(path) == WORKFLOW
+    assert loaders.load_workflow_from_file(path, keys={"name", "nodes"}) == {
+        "name": "Loader test",
+        "nodes": [],
+    }
+
+
+@pytest.mark.parametrize("name", ["flows.json.gz", "flows.zip", "flows.json"])
+def test_rejects_files_with_several_or_no_workflows(tmp_path, name):
+    path = tmp_path / name
+    _write(path, [WORKFLOW, WORKFLOW])
+    assert loaders.load_workflow_from_file(path) is None
+
+    _write(path, [])
+    assert loaders.load_workflow_from_file(path) is None
+
+
+@pytest.mark.parametrize("read_size", [1, 2, 3, 5, 8, 13])
+def test_array_elements_split_across_reads(tmp_path, monkeypatch, read_size):
+    monkeypatch.setattr(loaders, "_STREAM_READ_SIZE", read_size)
+    elements = [WORKFLOW, "a, b", 'c\\", d', 12345, WORKFLOW]
+    path = tmp_path / "flows.json"
+    _write(path, elements)
+
+    documents = list(loaders.iter_workflow_documents(path))
+
+    assert [label for label, _ in documents] == [f"[{i}]" for i in range(5)]
+    assert [json_codec.loads(data) for _, data in documents] == elements
@@ -0,0 +1,70 @@
+"""Tests for the trusted-input fast path of Phase 1 and its cache entries."""
+
+import pytest
+
+from n8nmermaid.core.analysis_cache import AnalysisCache
+from n8nmermaid.core.analyzer_v2 import WorkflowAnalyzerV2
+
+
+def _workflow(**fields) -> dict:
+    """Two connected nodes; `fields` override fields of the second one."""
+    second = {
+        "id": "b",
+        "name": "B",
+        "type": "n8n-nodes-base.set",
+        "typeVersion": 3.4,
+        "position": [200, 0],
+        "parameters": {},
+        **fields,
+    }
+    return {
+        "nodes": [
+            {
+                "id": "a",
+                "name": "A",
+                "type": "n8n-nodes-base.manualTrigger",
+                "typeVersion": 1,
+                "position": [0, 0],
+                "parameters": {},
+            },
+            second,
+        ],
+        "connections": {"A": {"main": [[{"node": "B", "type": "main", "index": 0}]]}},
+    }
+
+
+def _analyze(workflow: dict, trusted: bool) -> dict:
+    return WorkflowAnalyzerV2(workflow, trusted).analyze().model_dump()
+
+
+@pytest.mark.parametrize(
+    "fields",
+    [
+        {"typeVersion": "not a number"},
+        {"typeVersion": [1]},
+        {"position": "12"},
+        {"position": 12},
+        {"position": [0, "x"]},
+        {"disabled": "true"},
+        {"disabled": 1},
+        {"disabled": "maybe"},
+        {"notes": 42},
+        {"credentials": {"httpBasicAuth": {"id": 1, "name": 2}}},
+        {"credentials": {"httpBasicAuth": {"id": "1", "name": ["Basic"]}}},
+    ],
+)
+def test_trusted_parse_matches_validated_parse(fields):
+    workflow = _workflow(**fields)
+    assert _analyze(workflow, trusted=True) == _analyze(workflow, trusted=False)
+
+
+def test_trusted_and_validated_analyses_are_cached_separately():
+    cache = AnalysisCache()
+    workflow = _workflow(disabled="true")
+
+    trusted = cache.analyze(workflow, trusted=True)
+    validated = cache.analyze(workflow, trusted=False)
+
+    assert trusted is not validated
+    assert cache.stats()["entries"] == 2
+    assert cache.analyze(workflow, trusted=True) is trusted